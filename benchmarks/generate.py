@@ -0,0 +1,142 @@
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from utils import float_or_none, validate_date, validate_positive_int
+
+
+METHODS = ("GET", "GET", "GET", "POST", "PUT", "DELETE")
+STATUSES = (200, 200, 200, 200, 201, 301, 404, 500)
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Mozilla/5.0 (X11; Linux x86_64)",
+    "python-requests/2.32.3",
+    "curl/8.7.1",
+)
+
+
+def generate_lines(
+    lines: int,
+    urls: int = 1000,
+    malformed: float = 0.0,
+    days: int = 1,
+    start: str = "2025-06-22",
+    seed: int = 0,
+) -> Iterator[str]:
+    """Генерирует строки синтетического лога (с переводом строки).
+
+    Одинаковые параметры дают одинаковые строки. Записи идут по
+    времени равномерно на протяжении days суток начиная с даты start
+    (UTC). url выбираются из urls различных значений с перекосом:
+    url с меньшим номером встречаются чаще (как в реальных логах).
+    Доля malformed строк испорчена: обрезанный JSON или не JSON вовсе.
+    """
+    rng = random.Random(seed)
+    begin = datetime.fromisoformat(start).replace(tzinfo=timezone.utc)
+    step = days * 86400 / lines
+    for i in range(lines):
+        if malformed and rng.random() < malformed:
+            if rng.random() < 0.5:
+                yield "not a json line\n"
+            else:
+                yield '{"@timestamp": "2025-\n'
+            continue
+        timestamp = begin + timedelta(seconds=int(i * step))
+        # Перекошенное распределение: номер url ~ urls ** U(0, 1)
+        url = int(urls ** rng.random()) - 1
+        record = {
+            "@timestamp": timestamp.isoformat(),
+            "status": rng.choice(STATUSES),
+            "url": f"/api/v1/resource/{url}",
+            "request_method": rng.choice(METHODS),
+            "response_time": round(rng.expovariate(10), 3),
+            "http_user_agent": rng.choice(USER_AGENTS),
+        }
+        yield json.dumps(record) + "\n"
+
+
+def write_log(path: str, lines: int, **params) -> None:
+    """Пишет синтетический лог в файл path (см. generate_lines)."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(generate_lines(lines, **params))
+
+
+def validate_share(value: str) -> float:
+    """Валидирует долю от 0 до 1 включительно при вводе в CLI"""
+    number = float_or_none(value)
+    if number is None or not 0 <= number <= 1:
+        print(
+            f"Указана некорректная доля {value}, ожидается число от 0 до 1",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return number
+
+
+def add_generator_arguments(args_parser: argparse.ArgumentParser) -> None:
+    """Аргументы CLI с параметрами генератора."""
+    args_parser.add_argument(
+        "--lines",
+        type=validate_positive_int,
+        default=200000,
+        help="Кол-во строк (по умолчанию 200000)",
+    )
+    args_parser.add_argument(
+        "--urls",
+        type=validate_positive_int,
+        default=1000,
+        help="Кол-во различных url (по умолчанию 1000)",
+    )
+    args_parser.add_argument(
+        "--malformed",
+        type=validate_share,
+        default=0.01,
+        help="Доля испорченных строк (по умолчанию 0.01)",
+    )
+    args_parser.add_argument(
+        "--days",
+        type=validate_positive_int,
+        default=1,
+        help="На сколько суток растянуты записи (по умолчанию 1)",
+    )
+    args_parser.add_argument(
+        "--start",
+        type=validate_date,
+        default="2025-06-22",
+        help="Дата первой записи в формате ГГГГ-ММ-ДД",
+    )
+    args_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Начальное значение генератора случайных чисел",
+    )
+
+
+def generator_params(args: argparse.Namespace) -> dict:
+    return {
+        "lines": args.lines,
+        "urls": args.urls,
+        "malformed": args.malformed,
+        "days": args.days,
+        "start": args.start,
+        "seed": args.seed,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Генерирует синтетический лог: python -m benchmarks.generate."""
+    args_parser = argparse.ArgumentParser(prog="python -m benchmarks.generate")
+    add_generator_arguments(args_parser)
+    args_parser.add_argument(
+        "--output", required=True, help="Файл, в который пишется лог"
+    )
+    args = args_parser.parse_args(argv)
+    write_log(args.output, **generator_params(args))
+
+
+if __name__ == "__main__":
+    main()
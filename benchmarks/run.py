@@ -0,0 +1,316 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr
+from multiprocessing import get_context
+from typing import Any, Callable
+
+from tabulate import tabulate
+
+from benchmarks.generate import (
+    add_generator_arguments,
+    generator_params,
+    validate_share,
+    write_log,
+)
+from decoders import get_decoder
+from filters import FilterPipeline
+from log_parser import LogParser
+from models import LogRecord
+from output import open_writer
+from reports.average import AverageReport
+from runner import build_report
+from utils import validate_positive_int
+
+
+STAGES = (
+    "read",
+    "decode",
+    "from_dict",
+    "filter",
+    "aggregate",
+    "render",
+    "end_to_end",
+)
+
+
+def _read(path: str) -> list[bytes]:
+    return list(LogParser._read_lines(path, 0, None, ()))
+
+
+def _decode(lines: list[bytes]) -> list[dict]:
+    data = []
+    for line in lines:
+        try:
+            data.append(json.loads(line))
+        except ValueError:
+            continue
+    return data
+
+
+def _records(path: str) -> list[LogRecord]:
+    return [LogRecord.from_dict(item) for item in _decode(_read(path))]
+
+
+def _pipeline(start: str) -> FilterPipeline:
+    # Фильтр по первому дню: при days > 1 часть записей отбрасывается
+    pipeline = FilterPipeline()
+    pipeline.add_contains("timestamp", start)
+    return pipeline
+
+
+def _accumulated(path: str) -> AverageReport:
+    report = AverageReport(iter([]))
+    report.accumulate_all(_records(path))
+    return report
+
+
+def _stage(
+    name: str, path: str, params: dict[str, Any]
+) -> tuple[Callable[[Any], Any], Callable[[], Any]]:
+    """Замеряемая функция этапа и функция, готовящая ее вход.
+
+    Вход готовится один раз и в замер не входит, замеряемая функция
+    не должна его менять.
+    """
+    output_format = params["output_format"]
+    if name == "read":
+        return lambda _: _read(path), lambda: None
+    if name == "decode":
+        return _decode, lambda: _read(path)
+    if name == "from_dict":
+        return (
+            lambda data: [LogRecord.from_dict(item) for item in data],
+            lambda: _decode(_read(path)),
+        )
+    if name == "filter":
+        pipeline = _pipeline(params["start"])
+        return (
+            lambda records: sum(1 for _ in pipeline.apply(iter(records))),
+            lambda: _records(path),
+        )
+    if name == "aggregate":
+
+        def aggregate(records: list[LogRecord]) -> AverageReport:
+            report = AverageReport(iter([]))
+            report.accumulate_all(records)
+            return report
+
+        return aggregate, lambda: _records(path)
+    if name == "render":
+
+        def render(report: AverageReport) -> None:
+            # Сбрасываем закешированные строки, чтобы каждый повтор
+            # заново строил их из состояния
+            report._rows = None
+            with open_writer(output_format, os.devnull) as writer:
+                report.print(writer)
+
+        return render, lambda: _accumulated(path)
+
+    def end_to_end(_: Any) -> None:
+        pipeline = _pipeline(params["start"])
+        parser = LogParser(
+            [path],
+            pipeline.raw_needles(),
+            decoder=get_decoder(params["decoder"]),
+        )
+        report = build_report(parser, "average", pipeline)
+        with open_writer(output_format, os.devnull) as writer:
+            report.print(writer)
+
+    return end_to_end, lambda: None
+
+
+def run_stage(
+    name: str, path: str, params: dict[str, Any], repeat: int
+) -> dict[str, float]:
+    """Замеряет этап name repeat раз и возвращает лучший результат.
+
+    Вызывается в отдельном процессе, поэтому пиковый RSS - пик
+    процесса, выполнявшего этап (вместе с подготовкой входа).
+    Сообщения об испорченных строках в std.err отбрасываются.
+    """
+    measure, prepare = _stage(name, path, params)
+    best = None
+    with open(os.devnull, "w") as devnull, redirect_stderr(devnull):
+        data = prepare()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            measure(data)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss - в КБ на Linux и в байтах на macOS
+    peak_mb = peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+    return {
+        "seconds": round(best, 4),
+        "lines_per_sec": round(params["lines"] / best),
+        "peak_rss_mb": round(peak_mb, 1),
+    }
+
+
+def run_benchmarks(
+    path: str, params: dict[str, Any], stages: list[str], repeat: int
+) -> dict[str, Any]:
+    """Замеряет этапы stages по логу path, каждый в новом процессе."""
+    results = {}
+    context = get_context("spawn")
+    for name in stages:
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            results[name] = pool.submit(
+                run_stage, name, path, params, repeat
+            ).result()
+    return {
+        "params": params,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stages": results,
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Этапы, которые медленнее baseline больше чем на долю tolerance."""
+    regressions = []
+    for name, result in results["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            continue
+        ratio = result["lines_per_sec"] / base["lines_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{name}: {result['lines_per_sec']} строк/с против "
+                f"{base['lines_per_sec']} ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def format_results(
+    results: dict[str, Any], baseline: dict[str, Any] | None = None
+) -> str:
+    headers = ["stage", "seconds", "lines/sec", "peak RSS, MB"]
+    if baseline is not None:
+        headers.append("vs baseline")
+    rows = []
+    for name, result in results["stages"].items():
+        row = [
+            name,
+            result["seconds"],
+            result["lines_per_sec"],
+            result["peak_rss_mb"],
+        ]
+        if baseline is not None:
+            base = baseline["stages"].get(name)
+            row.append(
+                None
+                if base is None
+                else round(result["lines_per_sec"] / base["lines_per_sec"], 2)
+            )
+        rows.append(row)
+    return tabulate(rows, headers=headers)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Бенчмарки этапов обработки: python -m benchmarks.run.
+
+    Генерирует синтетический лог (или берет --log), замеряет этапы и
+    печатает таблицу. С --output сохраняет результаты в JSON, с
+    --baseline сравнивает с сохраненными результатами и завершается
+    с кодом 1, если какой-то этап медленнее больше чем на --tolerance.
+    """
+    args_parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    add_generator_arguments(args_parser)
+    args_parser.add_argument(
+        "--log",
+        help="Готовый лог вместо синтетического (параметры генератора "
+        "кроме --start игнорируются)",
+    )
+    args_parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=list(STAGES),
+        help="Замеряемые этапы (по умолчанию все)",
+    )
+    args_parser.add_argument(
+        "--repeat",
+        type=validate_positive_int,
+        default=3,
+        help="Кол-во повторов этапа, берется лучший (по умолчанию 3)",
+    )
+    args_parser.add_argument(
+        "--output-format",
+        default="table",
+        choices=["table", "jsonl", "csv"],
+        help="Формат вывода отчета в этапах render и end_to_end",
+    )
+    args_parser.add_argument(
+        "--decoder",
+        default="json",
+        choices=["auto", "json", "orjson", "msgspec"],
+        help="Декодер JSON в этапе end_to_end (по умолчанию json, как в "
+        "этапе decode)",
+    )
+    args_parser.add_argument(
+        "--output", help="Файл, в который сохраняются результаты в JSON"
+    )
+    args_parser.add_argument(
+        "--baseline", help="Файл с результатами для сравнения"
+    )
+    args_parser.add_argument(
+        "--tolerance",
+        type=validate_share,
+        default=0.1,
+        help="Допустимое замедление относительно baseline "
+        "(по умолчанию 0.1)",
+    )
+    args = args_parser.parse_args(argv)
+    params = generator_params(args)
+    params["output_format"] = args.output_format
+    params["decoder"] = args.decoder
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.log
+        if path is None:
+            path = os.path.join(tmp_dir, "bench.log")
+            write_log(path, **generator_params(args))
+        else:
+            with open(path, "rb") as file:
+                params["lines"] = sum(1 for _ in file)
+            params["log"] = os.path.abspath(path)
+        results = run_benchmarks(path, params, args.stages, args.repeat)
+
+    print(format_results(results, baseline))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if baseline is not None:
+        if baseline["params"] != params:
+            print(
+                "Параметры baseline отличаются от текущих, "
+                "сравнение может быть некорректным",
+                file=sys.stderr,
+            )
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Регрессии производительности:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
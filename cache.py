@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+from typing import Any
+
+from filters import FilterPipeline
+from reports.factory import ReportName, accepted_options
+
+
+# Меняется при несовместимом изменении формата состояний отчетов
+CACHE_VERSION = 1
+
+
+class AggregateCache:
+    """Кеш состояний отчетов по отдельным файлам логов на диске.
+
+    Ключ записи - идентичность файла (абсолютный путь, inode, размер,
+    mtime, опционально хеш содержимого), название и параметры отчета
+    и описание пайплайна фильтров. Поэтому измененный файл или другой набор
+    фильтров просто не находится в кеше.
+    Каждая запись хранится в отдельном JSON-файле в директории кеша,
+    имя файла - хеш ключа (метод key).
+    Метод get при попадании обновляет mtime записи, а put после записи
+    удаляет самые давно использованные записи, пока суммарный размер
+    кеша больше max_bytes.
+    Ошибки чтения и записи кеша не мешают построению отчета - запись
+    просто считается отсутствующей.
+    """
+
+    def __init__(
+        self, cache_dir: str, max_bytes: int, hash_content: bool = False
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        self._hashes: dict[tuple, str] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(
+        self,
+        path: str,
+        stat: os.stat_result,
+        report_name: ReportName,
+        pipeline: FilterPipeline,
+        report_options: dict[str, Any] | None = None,
+    ) -> str:
+        key = [
+            CACHE_VERSION,
+            os.path.abspath(path),
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+            self._content_hash(path, stat) if self.hash_content else None,
+            report_name,
+            accepted_options(report_name, report_options),
+            pipeline.describe(),
+        ]
+        return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        entry_path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(entry_path, encoding="utf-8") as file:
+                state = json.load(file)["state"]
+            os.utime(entry_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return state
+
+    def put(self, key: str, state: Any) -> None:
+        entry_path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"state": state}, file)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            return
+        self._evict()
+
+    def _content_hash(self, path: str, stat: os.stat_result) -> str:
+        # Один файл хешируется один раз, даже если он нужен нескольким
+        # отчетам
+        identity = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if identity not in self._hashes:
+            digest = hashlib.blake2b()
+            with open(path, "rb") as file:
+                while chunk := file.read(1024 * 1024):
+                    digest.update(chunk)
+            self._hashes[identity] = digest.hexdigest()
+        return self._hashes[identity]
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,268 @@
+import json
+import os
+import stat as stat_module
+import sys
+from typing import Any
+
+from decompress import detect_compression
+from engines import Engine
+from filters import FilterPipeline
+from log_parser import LogParser
+from reports.base import Report
+from reports.factory import ReportName, accepted_options, report_factory
+from utils import file_tail_hash
+
+
+# Меняется при несовместимом изменении формата чекпоинта
+CHECKPOINT_VERSION = 1
+# Размер блока при поиске конца последней полной строки
+TAIL_BLOCK = 64 * 1024
+
+
+class Checkpoint:
+    """Состояние инкрементальной обработки растущих файлов логов.
+
+    Для каждого файла хранит inode, смещение, до которого файл прочитан
+    (конец последней полной строки), хеш байт перед смещением и
+    состояние отчета по прочитанной части (см. Report). Метод update
+    читает только строки, дописанные с прошлого раза, сливает их
+    в состояние файла и строит отчет из состояний всех файлов.
+    Ротация файла:
+    - файл заменен (другой inode) - сначала дочитывается старый файл,
+      если он лежит в той же директории под другим именем (например,
+      access.log.1), затем новый файл читается с начала;
+    - файл обрезан или перезаписан (меньше смещения, либо байты перед
+      смещением изменились) - файл читается с начала.
+    Уже посчитанное состояние при ротации сохраняется.
+    Сжатые файлы не дописываются, поэтому измененный сжатый файл
+    читается целиком заново, а его состояние заменяется.
+    Если передан path, методы load и save читают и пишут чекпоинт
+    в этот файл. Чекпоинт другого отчета (или с другими параметрами)
+    или других фильтров не используется.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        report_name: ReportName,
+        pipeline: FilterPipeline,
+        report_options: dict[str, Any] | None = None,
+    ) -> None:
+        self.path = path
+        self.report_name = report_name
+        self.pipeline = pipeline
+        self.report_options = accepted_options(report_name, report_options)
+        self.files: dict[str, dict[str, Any]] = {}
+
+    def _new_report(self) -> Report:
+        return report_factory(self.report_name, iter([]), self.report_options)
+
+    def _report(self) -> Any:
+        # Описание отчета и фильтров в том виде, в каком оно читается
+        # из JSON
+        return json.loads(
+            json.dumps(
+                [
+                    self.report_name,
+                    self.report_options,
+                    self.pipeline.describe(),
+                ]
+            )
+        )
+
+    def load(self) -> None:
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+            same = (
+                data["version"] == CHECKPOINT_VERSION
+                and data["report"] == self._report()
+            )
+            files = data["files"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(
+                f"Чекпоинт {self.path} не удалось прочитать, ошибка {e!r}, "
+                "обработка начинается заново",
+                file=sys.stderr,
+            )
+            return
+        if not same:
+            print(
+                f"Чекпоинт {self.path} построен для другого отчета или "
+                "других фильтров, обработка начинается заново",
+                file=sys.stderr,
+            )
+            return
+        self.files = files
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "report": self._report(),
+            "files": self.files,
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(
+                f"Чекпоинт {self.path} не удалось сохранить, ошибка {e!r}",
+                file=sys.stderr,
+            )
+
+    def update(self, parser: LogParser, engine: Engine) -> Report:
+        """Дочитывает файлы parser.paths и строит отчет.
+
+        Обработка недоступных файлов такая же, как в LogParser.parse,
+        состояние недоступного файла с прошлых запусков остается в отчете.
+        """
+        ok_files = 0
+        for path in parser.paths:
+            try:
+                self._update_file(path, parser, engine)
+            except Exception as e:
+                print(
+                    f"Файл {path} не удалось прочитать, ошибка {e!r}",
+                    file=sys.stderr,
+                )
+                continue
+            ok_files += 1
+        if ok_files == 0:
+            print("Все файлы не существуют либо не читаются", file=sys.stderr)
+            sys.exit(1)
+
+        report = self._new_report()
+        for path in parser.paths:
+            entry = self.files.get(os.path.abspath(path))
+            if entry is not None:
+                report.merge(entry["state"])
+        return report
+
+    def _update_file(
+        self, path: str, parser: LogParser, engine: Engine
+    ) -> None:
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.files.get(key)
+        identity = {
+            "inode": stat.st_ino,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+        if detect_compression(path) is not None:
+            if entry is not None and all(
+                entry[name] == value for name, value in identity.items()
+            ):
+                return
+            state = self._read(parser, engine, path, None, 0, None)
+            self.files[key] = {
+                **identity,
+                "offset": stat.st_size,
+                "tail_hash": "",
+                "state": state,
+            }
+            return
+
+        if entry is None:
+            state = None
+            offset = 0
+        else:
+            state = entry["state"]
+            offset = entry["offset"]
+            if entry["inode"] != stat.st_ino:
+                rotated = self._find_rotated(path, entry)
+                if rotated is not None:
+                    state = self._read(
+                        parser, engine, rotated, state, offset, None
+                    )
+                offset = 0
+            elif (
+                stat.st_size < offset
+                or file_tail_hash(path, offset) != entry["tail_hash"]
+            ):
+                offset = 0
+
+        end = self._complete_end(path, stat.st_size)
+        if end > offset:
+            state = self._read(parser, engine, path, state, offset, end)
+            offset = end
+        if state is None:
+            state = self._new_report().state
+        self.files[key] = {
+            **identity,
+            "offset": offset,
+            "tail_hash": file_tail_hash(path, offset),
+            "state": state,
+        }
+
+    def _read(
+        self,
+        parser: LogParser,
+        engine: Engine,
+        path: str,
+        state: Any,
+        start: int,
+        end: int | None,
+    ) -> Any:
+        """Добавляет к состоянию state записи диапазона [start, end)."""
+        report = self._new_report()
+        if state is not None:
+            report.merge(state)
+        if parser.stats is None:
+            engine.accumulate(
+                report, self.pipeline, parser.parse_file(path, start, end)
+            )
+            return report.state
+        stats = parser.stats.file(path)
+        stats.accumulate(
+            engine,
+            report,
+            self.pipeline,
+            parser.parse_file(path, start, end, stats),
+        )
+        return report.state
+
+    @staticmethod
+    def _find_rotated(path: str, entry: dict[str, Any]) -> str | None:
+        """Ищет в директории файла path прежний файл (по inode).
+
+        Файл подходит, только если он все еще начинается с уже
+        прочитанной части.
+        """
+        directory = os.path.dirname(path) or "."
+        for name in sorted(os.listdir(directory)):
+            candidate = os.path.join(directory, name)
+            try:
+                stat = os.stat(candidate)
+                if (
+                    stat.st_ino == entry["inode"]
+                    and stat_module.S_ISREG(stat.st_mode)
+                    and stat.st_size >= entry["offset"]
+                    and file_tail_hash(candidate, entry["offset"])
+                    == entry["tail_hash"]
+                ):
+                    return candidate
+            except OSError:
+                continue
+        return None
+
+    @staticmethod
+    def _complete_end(path: str, size: int) -> int:
+        """Конец последней полной строки (с переводом строки) файла."""
+        with open(path, "rb") as file:
+            end = size
+            while end > 0:
+                start = max(0, end - TAIL_BLOCK)
+                file.seek(start)
+                newline = file.read(end - start).rfind(b"\n")
+                if newline != -1:
+                    return start + newline + 1
+                end = start
+        return 0
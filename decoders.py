@@ -0,0 +1,126 @@
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+
+from models import LogRecord
+from utils import float_or_none, int_or_none
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class Decoder(ABC):
+    """Абстрактный декодер строки лога в LogRecord.
+
+    Метод decode принимает сырую строку (bytes) и возвращает LogRecord
+    с той же семантикой, что и LogRecord.from_dict: лишние поля
+    игнорируются, некорректные status и response_time заменяются на None.
+    В атрибуте errors - исключения, означающие, что строку не удалось
+    декодировать (LogParser пропускает такие строки).
+    Если decode - это LogRecord.from_dict(loads(line)), в атрибуте loads
+    хранится функция разбора JSON, чтобы --stats замерял эти шаги
+    по отдельности (см. stats.py).
+    """
+
+    name: str
+    errors: tuple[type[Exception], ...]
+    loads: Callable[[bytes], Any] | None = None
+
+    @abstractmethod
+    def decode(self, line: bytes) -> LogRecord: ...  # noqa: E704
+
+
+class JsonDecoder(Decoder):
+    """Декодер на стандартном модуле json."""
+
+    name = "json"
+    # AttributeError - строка не JSON-объект
+    errors = (ValueError, AttributeError)
+    loads = staticmethod(json.loads)
+
+    def decode(self, line: bytes) -> LogRecord:
+        return LogRecord.from_dict(json.loads(line))
+
+
+class OrjsonDecoder(Decoder):
+    """Декодер на orjson (в несколько раз быстрее json)."""
+
+    name = "orjson"
+    errors = (ValueError, AttributeError)
+
+    def decode(self, line: bytes) -> LogRecord:
+        return LogRecord.from_dict(orjson.loads(line))
+
+    def loads(self, line: bytes) -> Any:
+        return orjson.loads(line)
+
+
+if msgspec is not None:
+
+    class _MsgspecRecord(msgspec.Struct, rename={"timestamp": "@timestamp"}):
+        """Поля строки лога в том виде, в каком они лежат в JSON."""
+
+        timestamp: Any = None
+        status: Any = None
+        url: Any = None
+        request_method: Any = None
+        response_time: Any = None
+        http_user_agent: Any = None
+
+    _msgspec_decoder = msgspec.json.Decoder(_MsgspecRecord)
+
+
+class MsgspecDecoder(Decoder):
+    """Декодер на msgspec.
+
+    Декодирует строку сразу в структуру без промежуточного словаря,
+    неизвестные поля пропускаются парсером. Типы полей не проверяются,
+    приведение status и response_time такое же, как в from_dict.
+    """
+
+    name = "msgspec"
+    errors = (msgspec.DecodeError,) if msgspec is not None else ()
+
+    def decode(self, line: bytes) -> LogRecord:
+        raw = _msgspec_decoder.decode(line)
+        return LogRecord(
+            timestamp=raw.timestamp,
+            status=int_or_none(raw.status),
+            url=raw.url,
+            request_method=raw.request_method,
+            response_time=float_or_none(raw.response_time),
+            http_user_agent=raw.http_user_agent,
+        )
+
+
+def get_decoder(name: str = "auto") -> Decoder:
+    """Возвращает декодер по названию.
+
+    'auto' выбирает самый быстрый из установленных:
+    msgspec, затем orjson, затем json.
+    Если запрошенный декодер не установлен - выходит из программы и
+    пишет в std.err.
+    """
+    available: dict[str, type[Decoder]] = {"json": JsonDecoder}
+    if orjson is not None:
+        available["orjson"] = OrjsonDecoder
+    if msgspec is not None:
+        available["msgspec"] = MsgspecDecoder
+    if name == "auto":
+        for candidate in ("msgspec", "orjson", "json"):
+            if candidate in available:
+                return available[candidate]()
+    decoder_class = available.get(name)
+    if decoder_class is None:
+        print(f"Декодер {name} недоступен", file=sys.stderr)
+        sys.exit(1)
+    return decoder_class()
@@ -0,0 +1,106 @@
+import bz2
+import gzip
+import lzma
+import queue
+import threading
+from typing import BinaryIO, Iterator
+
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Размер блока, которым читаются распакованные данные
+READ_SIZE = 1024 * 1024
+# На сколько блоков поток распаковки может опередить парсер
+QUEUE_BLOCKS = 8
+
+# Сигнатуры (magic bytes) в начале сжатых файлов
+MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+
+def detect_compression(path: str) -> str | None:
+    """Определяет сжатие файла по сигнатуре в его начале.
+
+    Возвращает gzip, bz2, xz, zstd или None для несжатого файла.
+    Если файл не читается, тоже возвращает None - ошибка будет
+    при чтении файла.
+    """
+    try:
+        with open(path, "rb") as file:
+            head = file.read(6)
+    except OSError:
+        return None
+    for magic, compression in MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_decompressed(path: str, compression: str) -> BinaryIO:
+    """Открывает сжатый файл как поток распакованных байт."""
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "bz2":
+        return bz2.open(path, "rb")
+    if compression == "xz":
+        return lzma.open(path, "rb")
+    if zstandard is None:
+        raise OSError("Для чтения файлов zstd нужен пакет zstandard")
+    return zstandard.ZstdDecompressor().stream_reader(
+        open(path, "rb"),
+        read_size=READ_SIZE,
+        read_across_frames=True,
+        closefd=True,
+    )
+
+
+def read_lines(path: str, compression: str) -> Iterator[bytes]:
+    """Возвращает строки (с переводом строки) сжатого файла.
+
+    Файл распаковывается в отдельном потоке блоками по READ_SIZE байт:
+    zlib, bz2, lzma и zstandard отпускают GIL на время распаковки,
+    поэтому распаковка идет параллельно с разбором строк. Поток
+    опережает разбор не больше чем на QUEUE_BLOCKS блоков и
+    останавливается, если строки перестали читать.
+    """
+    blocks: queue.Queue = queue.Queue(QUEUE_BLOCKS)
+    stop = threading.Event()
+
+    def read_blocks(file: BinaryIO) -> None:
+        try:
+            while not stop.is_set():
+                block = file.read(READ_SIZE)
+                blocks.put(block)
+                if not block:
+                    return
+        except Exception as e:
+            blocks.put(e)
+
+    with open_decompressed(path, compression) as file:
+        reader = threading.Thread(target=read_blocks, args=(file,))
+        reader.start()
+        try:
+            tail = b""
+            while block := blocks.get():
+                if isinstance(block, Exception):
+                    raise block
+                lines = (tail + block).split(b"\n")
+                tail = lines.pop()
+                for line in lines:
+                    yield line + b"\n"
+            if tail:
+                yield tail
+        finally:
+            stop.set()
+            # Освобождаем место в очереди, чтобы поток не завис на put
+            while not blocks.empty():
+                blocks.get_nowait()
+            reader.join()
@@ -0,0 +1,201 @@
+import sys
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator
+
+from filters import FilterPipeline
+from models import DictColumn, LogBatch, LogRecord
+from reports.average import AverageReport
+from reports.base import Report
+from reports.multi import MultiReport
+
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Engine(ABC):
+    """Абстрактный движок обработки записей.
+
+    Движок определяет, как записи проходят через пайплайн фильтров
+    и попадают в состояние отчета.
+    """
+
+    name: str
+
+    @abstractmethod
+    def accumulate(
+        self,
+        report: Report,
+        pipeline: FilterPipeline,
+        logs: Iterator[LogRecord],
+    ) -> None:
+        """Добавляет прошедшие фильтры записи logs в состояние report."""
+
+
+class PythonEngine(Engine):
+    """Обрабатывает записи по одной на чистом Python."""
+
+    name = "python"
+
+    def accumulate(
+        self,
+        report: Report,
+        pipeline: FilterPipeline,
+        logs: Iterator[LogRecord],
+    ) -> None:
+        report.accumulate_all(pipeline.apply(logs))
+
+
+class NumpyEngine(Engine):
+    """Обрабатывает записи пачками на NumPy.
+
+    Записи собираются в пачки LogBatch по batch_size штук (только
+    колонки, нужные фильтрам и отчету), фильтры
+    вычисляются как булевы маски по колонкам (для колонок со словарным
+    кодированием - один раз на каждое различное значение), а отчеты,
+    для которых есть векторная реализация (без нормализации url и top),
+    агрегируют пачку целиком.
+    Остальные отчеты получают отфильтрованную пачку в accumulate_batch.
+    Суммы в average накапливаются через np.add.at строго в порядке строк,
+    начиная с уже накопленных сумм, поэтому округление и порядок строк
+    отчета такие же, как у PythonEngine.
+    """
+
+    name = "numpy"
+
+    def __init__(self, batch_size: int = 65536) -> None:
+        self.batch_size = batch_size
+
+    def accumulate(
+        self,
+        report: Report,
+        pipeline: FilterPipeline,
+        logs: Iterator[LogRecord],
+    ) -> None:
+        checks = pipeline.column_checks()
+        # Отчеты из MultiReport обрабатываются по отдельности, а маска
+        # фильтров считается один раз на пачку
+        reports = (
+            list(report.reports.values())
+            if isinstance(report, MultiReport)
+            else [report]
+        )
+        accumulators = []
+        # Собираем только колонки, нужные фильтрам и отчетам (отчетам
+        # без векторной реализации нужны все колонки)
+        fields = {key for key, _ in checks}
+        all_fields = False
+        for sub_report in reports:
+            if type(sub_report) in self._accumulators and sub_report.plain:
+                report_fields, accumulate_masked = self._accumulators[
+                    type(sub_report)
+                ]
+                fields.update(report_fields)
+                accumulators.append((sub_report, accumulate_masked))
+            else:
+                all_fields = True
+                accumulators.append((sub_report, None))
+        batches = LogBatch.batches(
+            logs, self.batch_size, None if all_fields else fields
+        )
+        for batch in batches:
+            mask = self._mask(checks, batch)
+            taken = None
+            for sub_report, accumulate_masked in accumulators:
+                if accumulate_masked is not None:
+                    accumulate_masked(sub_report, batch, mask)
+                    continue
+                if taken is None:
+                    taken = batch.take(np.flatnonzero(mask))
+                sub_report.accumulate_batch(taken)
+
+    @staticmethod
+    def _mask(
+        checks: list[tuple[str, Callable]], batch: LogBatch
+    ) -> "np.ndarray":
+        mask = np.ones(len(batch), dtype=bool)
+        for key, check in checks:
+            column = getattr(batch, key)
+            if isinstance(column, DictColumn):
+                passed = np.fromiter(
+                    (check(attr) for attr in column.values),
+                    dtype=bool,
+                    count=len(column.values),
+                )
+                mask &= passed[_codes(column)]
+            else:
+                mask &= np.fromiter(
+                    (check(attr) for attr in column),
+                    dtype=bool,
+                    count=len(column),
+                )
+        return mask
+
+    @staticmethod
+    def _accumulate_average(
+        report: AverageReport, batch: LogBatch, mask: "np.ndarray"
+    ) -> None:
+        urls = batch.url.values
+        response_times = batch.response_time
+        url_ok = np.fromiter(
+            (url is not None for url in urls), dtype=bool, count=len(urls)
+        )
+        codes = _codes(batch.url)
+        mask = (
+            mask
+            & url_ok[codes]
+            & np.frombuffer(response_times.valid, dtype=np.uint8).astype(bool)
+        )
+        codes = codes[mask]
+        if not len(codes):
+            return
+        values = np.frombuffer(response_times.values, dtype=np.float64)[mask]
+
+        counts = np.bincount(codes, minlength=len(urls))
+        # Коды в порядке первого появления - в таком же порядке
+        # новые url попадают в состояние у PythonEngine
+        unique, first = np.unique(codes, return_index=True)
+        order = unique[np.argsort(first)].tolist()
+
+        groups = report.state
+        sums = np.zeros(len(urls), dtype=np.float64)
+        for code in order:
+            group = groups.get(urls[code])
+            if group is not None:
+                sums[code] = group[1]
+        np.add.at(sums, codes, values)
+        for code in order:
+            key = urls[code]
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [int(counts[code]), float(sums[code])]
+            else:
+                group[0] += int(counts[code])
+                group[1] = float(sums[code])
+
+    # Векторные реализации отчетов и нужные им колонки
+    _accumulators = {
+        AverageReport: (("url", "response_time"), _accumulate_average),
+    }
+
+
+def _codes(column: DictColumn) -> "np.ndarray":
+    return np.frombuffer(column.codes, dtype=np.uint32)
+
+
+def get_engine(name: str = "python") -> Engine:
+    """Возвращает движок по названию.
+
+    Если для движка numpy не установлен NumPy - пишет предупреждение
+    в std.err и возвращает движок на чистом Python.
+    """
+    if name == "numpy":
+        if np is not None:
+            return NumpyEngine()
+        print(
+            "NumPy не установлен, используется движок python",
+            file=sys.stderr,
+        )
+    return PythonEngine()
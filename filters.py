@@ -1,44 +1,304 @@
-from functools import partial
-from typing import Any, Callable, Iterator
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Iterator
 
-from models import LogRecord
+from models import DictColumn, LogBatch, LogRecord
+from utils import parse_timestamp
+
+
+class TimeRangeCheck:
+    """Проверка, что время из лога лежит в полуинтервале [low, high).
+
+    Границы - секунды от начала эпохи (None - граница не задана).
+    Время в логах обычно в формате ГГГГ-ММ-ДДTЧЧ:ММ:СС+ЧЧ:ММ. Для такого
+    времени границы один раз переводятся в строки того же формата с тем
+    же смещением, и дальше время сравнивается как строка, без разбора.
+    Время в других форматах разбирается через parse_timestamp.
+    Время, которое не удалось разобрать, проверку не проходит.
+    """
+
+    __slots__ = ("low", "high", "_bounds")
+
+    def __init__(self, low: float | None, high: float | None) -> None:
+        self.low = low
+        self.high = high
+        self._bounds: dict[str, tuple[str | None, str | None] | None] = {}
+
+    def __call__(self, value: Any) -> bool:
+        if type(value) is str and len(value) == 25 and value[10] == "T":
+            suffix = value[19:]
+            if suffix in self._bounds:
+                bounds = self._bounds[suffix]
+            else:
+                bounds = self._bounds[suffix] = self._render_bounds(suffix)
+            if bounds is not None:
+                low, high = bounds
+                return (low is None or low <= value) and (
+                    high is None or value < high
+                )
+        timestamp = parse_timestamp(value)
+        return (
+            timestamp is not None
+            and (self.low is None or self.low <= timestamp)
+            and (self.high is None or timestamp < self.high)
+        )
+
+    def _render_bounds(
+        self, suffix: str
+    ) -> tuple[str | None, str | None] | None:
+        if suffix[0] not in "+-" or suffix[3] != ":":
+            return None
+        offset = parse_timestamp(f"1970-01-01T00:00:00{suffix}")
+        if offset is None:
+            return None
+        tz = timezone(timedelta(seconds=-offset))
+        # Время в логах с точностью до секунд, поэтому
+        # t >= low <=> t >= ceil(low), t < high <=> t < ceil(high)
+        return tuple(
+            (
+                None
+                if bound is None
+                else datetime.fromtimestamp(math.ceil(bound), tz).isoformat()
+            )
+            for bound in (self.low, self.high)
+        )
 
 
 class FilterPipeline:
     """Создает пайплайн из фильтров.
 
-    Фильтры добавляются через один из методов add.
-    Метод add_equal добавляет в пайплайн фильтр по
-    значению атрибута key, он проверяется на равенство
-    значению value.
-    На данный момент add_equal не используется,
-    но может быть использован в дальнейшем для расширения
-    возможностей фильтрации.
-    Метод add_contains добавляет в пайплайн фильтр по
-    значению атрибута key, он проверяется на вхождение value
-    в значение атрибута key.
+    Фильтры добавляются через один из методов add, каждый фильтр
+    проверяет значение атрибута key записи:
+    - add_equal - равенство значению value;
+    - add_contains - вхождение value в значение атрибута;
+    - add_prefix - значение атрибута начинается с prefix;
+    - add_in - значение атрибута входит в набор values;
+    - add_range - low <= значение атрибута <= high (None - граница
+      не задана), записи без значения атрибута не проходят;
+    - add_regex - в значении атрибута находится регулярное выражение
+      pattern (оно компилируется один раз при добавлении);
+    - add_time_range - время из атрибута (по умолчанию timestamp) лежит
+      в полуинтервале [start, end), границы - секунды от начала эпохи
+      (см. TimeRangeCheck).
+    Метод time_upper_bound возвращает самую раннюю верхнюю границу
+    фильтров по времени - записи позже нее фильтры не пройдут,
+    а time_lower_bound - самую позднюю нижнюю границу.
     Метод apply применяет все переданные в пайплайн фильтры
-    к итератору и возвращает итератор.
+    к итератору и возвращает итератор. Для этого фильтры компилируются
+    в одну функцию-предикат (без вызова функции на каждый фильтр),
+    а проверки упорядочиваются так, чтобы первыми шли самые избирательные
+    и дешевые (равенство, набор, префикс), а последними - дорогие
+    (подстрока, регулярное выражение).
+    Метод describe возвращает JSON-сериализуемое описание фильтров
+    (вид, атрибут, значение), например для ключа кеша.
+    Метод raw_needles возвращает подстроки (bytes), которые обязаны
+    встречаться в сырой строке лога, чтобы запись прошла фильтры.
+    LogParser отбрасывает строки без них еще до декодирования JSON.
+    Это только грубая проверка - прошедшие ее записи все равно
+    проверяются фильтрами в apply. Поэтому подстрока берется только из
+    строковых значений, которые в JSON не могут быть экранированы.
+    Метод column_checks возвращает фильтры в виде пар (атрибут, проверка
+    значения атрибута) - для обработки колонок LogBatch.
+    Метод apply_batch применяет фильтры к пачке LogBatch и возвращает
+    пачку из прошедших строк. Для колонок со словарным кодированием
+    фильтр проверяется один раз на каждое различное значение.
     """
 
+    # Порядок проверки видов фильтров в скомпилированном предикате
+    _order = {
+        "equal": 0,
+        "in": 1,
+        "prefix": 2,
+        "range": 3,
+        "time_range": 3,
+        "contains": 4,
+        "regex": 5,
+    }
+
+    # Выражения проверок для компиляции: {a} - значение атрибута,
+    # {v} - значение фильтра
+    _expressions = {
+        "equal": "{a} == {v}",
+        "contains": '{v} in ({a} or "")',
+        "prefix": '({a} or "").startswith({v})',
+        "in": "{a} in {v}",
+        "regex": "isinstance({a}, str) and {v}({a}) is not None",
+        "time_range": "{v}({a})",
+    }
+
     def __init__(self) -> None:
-        self._filters: list[Callable[[LogRecord], bool]] = []
+        self._specs: list[tuple[str, str, Any]] = []
+        self._predicate: Callable[[LogRecord], bool] | None = None
+
+    def __getstate__(self) -> dict:
+        # Скомпилированный предикат не сериализуется (pickle) и
+        # пересобирается при первом вызове apply
+        return {"_specs": self._specs, "_predicate": None}
+
+    def add_equal(self, key: str, value: Any) -> None:
+        self._add("equal", key, value)
+
+    def add_contains(self, key: str, value: Any) -> None:
+        self._add("contains", key, value)
+
+    def add_prefix(self, key: str, prefix: str) -> None:
+        self._add("prefix", key, prefix)
+
+    def add_in(self, key: str, values: Iterable[Any]) -> None:
+        self._add("in", key, tuple(values))
+
+    def add_range(self, key: str, low: Any = None, high: Any = None) -> None:
+        self._add("range", key, (low, high))
+
+    def add_regex(self, key: str, pattern: str) -> None:
+        re.compile(pattern)
+        self._add("regex", key, pattern)
+
+    def add_time_range(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        key: str = "timestamp",
+    ) -> None:
+        self._add("time_range", key, (start, end))
+
+    def time_upper_bound(self) -> float | None:
+        return min(self._time_bounds(1), default=None)
+
+    def time_lower_bound(self) -> float | None:
+        return max(self._time_bounds(0), default=None)
+
+    def _time_bounds(self, i: int) -> list[float]:
+        return [
+            value[i]
+            for kind, key, value in self._specs
+            if kind == "time_range"
+            and key == "timestamp"
+            and value[i] is not None
+        ]
+
+    def _add(self, kind: str, key: str, value: Any) -> None:
+        if key not in LogRecord.__dataclass_fields__:
+            raise ValueError(f"Неизвестный атрибут записи: {key}")
+        self._specs.append((kind, key, value))
+        self._predicate = None
+
+    def describe(self) -> list[tuple[str, str, Any]]:
+        return list(self._specs)
+
+    def raw_needles(self) -> tuple[bytes, ...]:
+        return tuple(
+            value.encode()
+            for kind, _, value in self._specs
+            if kind in ("equal", "contains", "prefix")
+            and self._is_raw_safe(value)
+        )
 
     @staticmethod
-    def _equal(log: LogRecord, key: str, value: Any) -> bool:
-        return getattr(log, key) == value
+    def _is_raw_safe(value: Any) -> bool:
+        return (
+            isinstance(value, str)
+            and value != ""
+            and value.isascii()
+            and value.isprintable()
+            and not any(c in value for c in '"\\/')
+        )
+
+    def _ordered_specs(self) -> list[tuple[str, str, Any]]:
+        # Среди подстрок длинные обычно избирательнее коротких
+        return sorted(
+            self._specs,
+            key=lambda spec: (
+                self._order[spec[0]],
+                -len(spec[2]) if isinstance(spec[2], str) else 0,
+            ),
+        )
 
     @staticmethod
-    def _contains(log: LogRecord, key: str, value: Any) -> bool:
-        return value in (getattr(log, key) or "")
+    def _value_check(kind: str, value: Any) -> Callable[[Any], bool]:
+        """Проверка значения атрибута для фильтра вида kind."""
+        if kind == "equal":
+            return lambda attr: attr == value
+        if kind == "contains":
+            return lambda attr: value in (attr or "")
+        if kind == "prefix":
+            return lambda attr: (attr or "").startswith(value)
+        if kind == "in":
+            values = frozenset(value)
+            return lambda attr: attr in values
+        if kind == "time_range":
+            return TimeRangeCheck(*value)
+        if kind == "range":
+            low, high = value
+            return lambda attr: (
+                attr is not None
+                and (low is None or low <= attr)
+                and (high is None or attr <= high)
+            )
+        search = re.compile(value).search
+        return lambda attr: isinstance(attr, str) and search(attr) is not None
 
-    def add_equal(self, key: str, value: Any) -> None:
-        self._filters.append(partial(self._equal, key=key, value=value))
+    def _compile(self) -> Callable[[LogRecord], bool]:
+        """Собирает из фильтров одну функцию-предикат.
 
-    def add_contains(self, key: str, value: Any) -> None:
-        self._filters.append(partial(self._contains, key=key, value=value))
+        Проверки подставляются в текст функции выражениями над атрибутами
+        записи, значения фильтров передаются через пространство имен
+        функции (в текст попадают только имена атрибутов LogRecord).
+        """
+        namespace: dict[str, Any] = {}
+        conditions = []
+        for i, (kind, key, value) in enumerate(self._ordered_specs()):
+            attr = f"log.{key}"
+            name = f"v{i}"
+            if kind == "range":
+                low, high = value
+                parts = [f"{attr} is not None"]
+                if low is not None:
+                    namespace[f"{name}_low"] = low
+                    parts.append(f"{name}_low <= {attr}")
+                if high is not None:
+                    namespace[f"{name}_high"] = high
+                    parts.append(f"{attr} <= {name}_high")
+                conditions.append(f"({' and '.join(parts)})")
+                continue
+            if kind == "in":
+                value = frozenset(value)
+            elif kind == "time_range":
+                value = TimeRangeCheck(*value)
+            elif kind == "regex":
+                value = re.compile(value).search
+            namespace[name] = value
+            expression = self._expressions[kind].format(a=attr, v=name)
+            conditions.append(f"({expression})")
+        source = "def predicate(log):\n    return " + " and ".join(conditions)
+        exec(source, namespace)
+        return namespace["predicate"]
 
     def apply(self, logs: Iterator[LogRecord]) -> Iterator[LogRecord]:
-        for f in self._filters:
-            logs = filter(f, logs)
-        yield from logs
+        if not self._specs:
+            yield from logs
+            return
+        if self._predicate is None:
+            self._predicate = self._compile()
+        yield from filter(self._predicate, logs)
+
+    def column_checks(self) -> list[tuple[str, Callable[[Any], bool]]]:
+        return [
+            (key, self._value_check(kind, value))
+            for kind, key, value in self._ordered_specs()
+        ]
+
+    def apply_batch(self, batch: LogBatch) -> LogBatch:
+        rows: Iterable[int] = range(len(batch))
+        for key, check in self.column_checks():
+            column = getattr(batch, key)
+            if isinstance(column, DictColumn):
+                passed = [check(attr) for attr in column.values]
+                codes = column.codes
+                rows = [i for i in rows if passed[codes[i]]]
+            else:
+                rows = [i for i in rows if check(column[i])]
+        if len(rows) == len(batch):
+            return batch
+        return batch.take(rows)
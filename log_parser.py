@@ -1,8 +1,16 @@
-import json
+import mmap
+import os
 import sys
+import time
 from typing import Iterator
 
+from decoders import Decoder, get_decoder
+from decompress import detect_compression, read_lines
 from models import LogRecord
+from readahead import ReadAhead
+from stats import SAMPLE_EVERY, FileStats, RunStats
+from time_index import TimeIndex
+from utils import parse_timestamp
 
 
 class LogParser:
@@ -15,40 +23,318 @@ class LogParser:
     При ошибке чтения файла (не существует, ошибка доступа и т.д.) игнорирует
     файл и пишет в std.err.
     Если все файлы проигнорированы - выходит из программы и пишет в std.err.
+    Метод parse_file умеет читать не весь файл, а диапазон байт
+    [start, end): строка относится к диапазону, если в нем лежит ее
+    первый байт. Это позволяет резать большие файлы на куски для
+    параллельной обработки (см. parallel.py).
+    Если переданы needles (см. FilterPipeline.raw_needles), строки, в
+    которых нет хотя бы одной из подстрок, пропускаются без декодирования.
+    Если use_mmap=True, файл отображается в память и строки вырезаются
+    из отображения по смещениям переводов строк: без буфера чтения,
+    а строки без needles не копируются вовсе.
+    Сжатые файлы (gzip, bz2, xz, zstd - определяется по сигнатуре файла)
+    распаковываются на лету в отдельном потоке (см. decompress.py),
+    диапазон байт для них - диапазон распакованных данных.
+    Строки декодируются декодером decoder (см. decoders.py), по умолчанию
+    самым быстрым из установленных.
+    Если передан time_limit (секунды от начала эпохи, см.
+    FilterPipeline.time_upper_bound), чтение файла прекращается, как
+    только встречается запись позже time_limit более чем на TIME_SLACK
+    секунд: файлы логов упорядочены по времени с точностью до небольших
+    перестановок соседних записей. Время проверяется у каждой
+    TIME_CHECK_EVERY-й записи.
+    Если передан time_start или time_limit и рядом с файлом есть
+    индекс времени (см. time_index.py), parse_file читает только
+    диапазон байт, где по индексу лежат записи из
+    [time_start, time_limit + TIME_SLACK) (метод file_range).
+    Если передан stats (см. stats.py), parse собирает по каждому файлу
+    счетчики строк и время чтения и декодирования, а parse_file - в
+    переданный ему FileStats. Без них обработка не замеряется вовсе.
+    Если read_ahead > 0, parse заранее читает начало стольких следующих
+    файлов, пока разбирается текущий (см. readahead.py).
     """
 
-    def __init__(self, paths: list[str]) -> None:
+    TIME_SLACK = 300
+    TIME_CHECK_EVERY = 64
+
+    def __init__(
+        self,
+        paths: list[str],
+        needles: tuple[bytes, ...] = (),
+        use_mmap: bool = False,
+        decoder: Decoder | None = None,
+        time_limit: float | None = None,
+        time_start: float | None = None,
+        stats: RunStats | None = None,
+        read_ahead: int = 0,
+    ) -> None:
         self.paths = paths
+        self.needles = needles
+        self.use_mmap = use_mmap
+        self.decoder = decoder if decoder is not None else get_decoder()
+        self.time_limit = time_limit
+        self.time_start = time_start
+        self.stats = stats
+        self.read_ahead = read_ahead
 
     def parse(self) -> Iterator[LogRecord]:
         ok_files: int = 0
 
-        for path in self.paths:
-            try:
-                yield from self._parse_file(path)
-                ok_files += 1
-            except Exception as e:
-                print(
-                    f"Файл {path} не удалось прочитать, ошибка {e!r}",
-                    file=sys.stderr,
-                )
+        with ReadAhead(self.paths, self.read_ahead) as read_ahead:
+            for i, path in enumerate(self.paths):
+                read_ahead.advance(i)
+                try:
+                    file_stats = None
+                    if self.stats is not None:
+                        file_stats = self.stats.file(path)
+                    yield from self.parse_file(path, stats=file_stats)
+                    ok_files += 1
+                except Exception as e:
+                    print(
+                        f"Файл {path} не удалось прочитать, ошибка {e!r}",
+                        file=sys.stderr,
+                    )
         if ok_files == 0:
             print("Все файлы не существуют либо не читаются", file=sys.stderr)
             sys.exit(1)
 
+    def parse_file(
+        self,
+        path: str,
+        start: int = 0,
+        end: int | None = None,
+        stats: FileStats | None = None,
+    ) -> Iterator[LogRecord]:
+        index_start, index_end = self.file_range(path)
+        start = max(start, index_start)
+        if index_end is not None:
+            end = index_end if end is None else min(end, index_end)
+        if end is not None and start >= end:
+            return
+        needles = self.needles
+        if stats is not None:
+            # Строки без needles отбрасываются в _decode_lines_stats,
+            # чтобы их посчитать
+            needles = ()
+        compression = detect_compression(path)
+        if compression is not None:
+            lines = self._read_lines_compressed(
+                path, compression, start, end, needles
+            )
+        elif self.use_mmap:
+            lines = self._read_lines_mmap(path, start, end, needles)
+        else:
+            lines = self._read_lines(path, start, end, needles)
+        stop_after = None
+        if self.time_limit is not None:
+            stop_after = self.time_limit + self.TIME_SLACK
+        if stats is not None:
+            yield from self._decode_lines_stats(lines, stop_after, stats)
+            return
+        decode = self.decoder.decode
+        errors = self.decoder.errors
+        countdown = self.TIME_CHECK_EVERY
+        for line in lines:
+            try:
+                log = decode(line)
+            except errors as e:
+                self._decode_error(line, e)
+                continue
+            if stop_after is not None:
+                countdown -= 1
+                if countdown == 0:
+                    countdown = self.TIME_CHECK_EVERY
+                    if self._past(log, stop_after):
+                        return
+            yield log
+
+    def _decode_lines_stats(
+        self,
+        lines: Iterator[bytes],
+        stop_after: float | None,
+        stats: FileStats,
+    ) -> Iterator[LogRecord]:
+        """Цикл parse_file, который считает строки и замеряет этапы.
+
+        Счетчики точные, а время замеряется у каждой SAMPLE_EVERY-й
+        записи (см. stats.py) и масштабируется на все записи: вызов
+        perf_counter сравним по цене с разбором короткой строки.
+        Время чтения - промежуток от возврата из yield предыдущей
+        записи до получения строки. Если у декодера есть loads, разбор
+        JSON и from_dict замеряются по отдельности.
+        """
+        clock = time.perf_counter
+        needles = self.needles
+        decode = self.decoder.decode
+        loads = self.decoder.loads
+        from_dict = LogRecord.from_dict
+        errors = self.decoder.errors
+        countdown = self.TIME_CHECK_EVERY
+        # Счетчики копятся в локальных переменных (это быстрее атрибутов)
+        # и переносятся в stats в конце, даже если чтение прервано
+        read = decode_time = from_dict_time = 0.0
+        lines_count = bytes_count = prefiltered = decode_errors = 0
+        records = sampled = 0
+        # Первая запись замеряется всегда
+        sample = 1
+        resumed = clock()
+        try:
+            for line in lines:
+                lines_count += 1
+                bytes_count += len(line) + 1
+                if needles and not all(n in line for n in needles):
+                    prefiltered += 1
+                    continue
+                sample -= 1
+                if sample:
+                    try:
+                        log = decode(line)
+                    except errors as e:
+                        decode_errors += 1
+                        self._decode_error(line, e)
+                        continue
+                else:
+                    sample = SAMPLE_EVERY
+                    started = clock()
+                    try:
+                        if loads is None:
+                            log = decode(line)
+                            decoded = finished = clock()
+                        else:
+                            data = loads(line)
+                            decoded = clock()
+                            log = from_dict(data)
+                            finished = clock()
+                    except errors as e:
+                        decode_errors += 1
+                        self._decode_error(line, e)
+                        # Замер переносится на следующую запись
+                        sample = 1
+                        resumed = clock()
+                        continue
+                    read += started - resumed
+                    decode_time += decoded - started
+                    from_dict_time += finished - decoded
+                    sampled += 1
+                records += 1
+                if stop_after is not None:
+                    countdown -= 1
+                    if countdown == 0:
+                        countdown = self.TIME_CHECK_EVERY
+                        if self._past(log, stop_after):
+                            return
+                yield log
+                if sample == 1:
+                    resumed = clock()
+        finally:
+            scale = records / sampled if sampled else 0.0
+            stats.read += read * scale
+            stats.decode += decode_time * scale
+            stats.from_dict += from_dict_time * scale
+            stats.lines += lines_count
+            stats.bytes += bytes_count
+            stats.prefiltered += prefiltered
+            stats.decode_errors += decode_errors
+            stats.records += records
+
     @staticmethod
-    def _parse_file(path: str) -> Iterator[LogRecord]:
-        with open(path, encoding="utf-8") as file:
+    def _decode_error(line: bytes, error: Exception) -> None:
+        print(
+            "Не удалось спарсить строку: "
+            f"'{line.decode('utf-8', 'replace')}'\n"
+            f"Ошибка: {error!r}",
+            file=sys.stderr,
+        )
+
+    @staticmethod
+    def _past(log: LogRecord, stop_after: float) -> bool:
+        timestamp = parse_timestamp(log.timestamp)
+        return timestamp is not None and timestamp > stop_after
+
+    def file_range(self, path: str) -> tuple[int, int | None]:
+        """Диапазон байт файла, где могут лежать записи из периода.
+
+        Без периода или без актуального индекса - весь файл (0, None).
+        """
+        if self.time_start is None and self.time_limit is None:
+            return 0, None
+        index = TimeIndex.load(path)
+        if index is None:
+            return 0, None
+        high = None
+        if self.time_limit is not None:
+            high = self.time_limit + self.TIME_SLACK
+        return index.byte_range(os.stat(path), self.time_start, high)
+
+    @staticmethod
+    def _read_lines(
+        path: str, start: int, end: int | None, needles: tuple[bytes, ...]
+    ) -> Iterator[bytes]:
+        with open(path, "rb") as file:
+            pos = start
+            if start > 0:
+                # Дочитываем строку, начавшуюся в предыдущем диапазоне
+                file.seek(start - 1)
+                pos += len(file.readline()) - 1
             for line in file:
-                line = line.strip()
-                if not line:
+                if end is not None and pos >= end:
+                    break
+                pos += len(line)
+                if needles and not all(n in line for n in needles):
                     continue
-                try:
-                    raw = json.loads(line)
-                    yield LogRecord.from_dict(raw)
-                except json.JSONDecodeError as e:
-                    print(
-                        f"Не удалось спарсить строку: '{line}'\n"
-                        f"Ошибка: {e!r}",
-                        file=sys.stderr,
-                    )
+                line = line.strip()
+                if line:
+                    yield line
+
+    @staticmethod
+    def _read_lines_compressed(
+        path: str,
+        compression: str,
+        start: int,
+        end: int | None,
+        needles: tuple[bytes, ...],
+    ) -> Iterator[bytes]:
+        # Сжатый файл нельзя читать с середины, поэтому строки до start
+        # распаковываются и пропускаются
+        pos = 0
+        for line in read_lines(path, compression):
+            line_start = pos
+            pos += len(line)
+            if line_start < start:
+                continue
+            if end is not None and line_start >= end:
+                break
+            if needles and not all(n in line for n in needles):
+                continue
+            line = line.strip()
+            if line:
+                yield line
+
+    @staticmethod
+    def _read_lines_mmap(
+        path: str, start: int, end: int | None, needles: tuple[bytes, ...]
+    ) -> Iterator[bytes]:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                # Пустой файл нельзя отобразить в память
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                pos = start
+                if start > 0:
+                    # Пропускаем строку, начавшуюся в предыдущем диапазоне
+                    newline = mm.find(b"\n", start - 1)
+                    pos = size if newline == -1 else newline + 1
+                stop = size if end is None else min(end, size)
+                while pos < stop:
+                    newline = mm.find(b"\n", pos)
+                    line_end = size if newline == -1 else newline
+                    if not needles or all(
+                        mm.find(n, pos, line_end) != -1 for n in needles
+                    ):
+                        line = mm[pos:line_end].strip()
+                        if line:
+                            yield line
+                    pos = line_end + 1
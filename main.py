@@ -1,9 +1,29 @@
 import argparse
+import cProfile
+import sys
+import time
 
+from cache import AggregateCache
+from checkpoint import Checkpoint
+from decoders import get_decoder
+from engines import Engine, get_engine
 from filters import FilterPipeline
 from log_parser import LogParser
-from reports.factory import report_factory
-from utils import validate_date
+from output import FORMATS, open_writer, validate_output
+from reports.base import Report
+from runner import build_report
+from stats import RunStats
+from time_index import BUCKET_SECONDS, TimeIndex
+from url_rules import DEFAULT_RULES
+from utils import (
+    date_window,
+    validate_date,
+    validate_datetime,
+    validate_duration,
+    validate_fraction,
+    validate_positive_int,
+    validate_regex,
+)
 
 
 def main():
@@ -11,7 +31,13 @@ def main():
 
     Парсит аргументы из CLI и валидирует их.
     Парсит логи, применяет фильтры и печатает отчет.
+    Первым аргументом можно указать команду: index - построить индексы
+    времени файлов логов (см. index_main).
     """
+    if sys.argv[1:2] == ["index"]:
+        index_main(sys.argv[2:])
+        return
+
     args_parser = argparse.ArgumentParser()
     # Добавляем аргументы, которые нужно спарсить из CLI.
     # Например, новые фильтры.
@@ -24,31 +50,348 @@ def main():
     args_parser.add_argument(
         "--report",
         required=True,
+        nargs="+",
         choices=[
             "average",
+            "latency",
+            "timeseries",
         ],
-        help="Название отчета, может быть одно из списка: [average,]",
+        help="Названия отчетов из списка: [average, latency, timeseries], "
+        "несколько отчетов строятся за один проход по файлам",
     )
     args_parser.add_argument(
         "--date", type=validate_date, help="Дата в формате ГГГГ-ММ-ДД"
     )
+    args_parser.add_argument(
+        "--from",
+        dest="time_from",
+        type=validate_datetime,
+        help="Начало периода (включительно) в формате ГГГГ-ММ-ДДTЧЧ:ММ, "
+        "без часового пояса - UTC",
+    )
+    args_parser.add_argument(
+        "--to",
+        dest="time_to",
+        type=validate_datetime,
+        help="Конец периода (не включительно) в формате ГГГГ-ММ-ДДTЧЧ:ММ, "
+        "без часового пояса - UTC",
+    )
+    args_parser.add_argument(
+        "--accuracy",
+        type=validate_fraction,
+        default=0.01,
+        help="Относительная точность перцентилей отчета latency "
+        "(по умолчанию 0.01)",
+    )
+    args_parser.add_argument(
+        "--bucket",
+        type=validate_duration,
+        default=60,
+        help="Ширина интервала отчета timeseries, например 30s, 5m, 1h "
+        "(по умолчанию 1m)",
+    )
+    args_parser.add_argument(
+        "--by-handler",
+        action="store_true",
+        help="Отчет timeseries по каждому url, а не по всем запросам",
+    )
+    args_parser.add_argument(
+        "--top",
+        type=validate_positive_int,
+        help="Вывести только K самых частых url, память ограничена "
+        "(алгоритм Space-Saving)",
+    )
+    args_parser.add_argument(
+        "--normalize-urls",
+        action="store_true",
+        help="Заменять в url числовые, UUID и hex сегменты шаблонами "
+        "{id}, {uuid}, {hash}",
+    )
+    args_parser.add_argument(
+        "--url-rule",
+        nargs=2,
+        action="append",
+        metavar=("REGEX", "TEMPLATE"),
+        help="Правило нормализации url: регулярное выражение и замена "
+        "(можно указать несколько раз, применяются до правил "
+        "--normalize-urls)",
+    )
+    args_parser.add_argument(
+        "--output-format",
+        default="table",
+        choices=FORMATS,
+        help="Формат вывода отчета (по умолчанию table - таблица, "
+        "arrow и parquet требуют pyarrow и --output)",
+    )
+    args_parser.add_argument(
+        "--output",
+        help="Файл для вывода отчета, по умолчанию std.out",
+    )
+    args_parser.add_argument(
+        "--workers",
+        type=validate_positive_int,
+        default=1,
+        help="Кол-во процессов для параллельного парсинга (по умолчанию 1)",
+    )
+    args_parser.add_argument(
+        "--cache-dir",
+        help="Директория кеша состояний отчетов по отдельным файлам",
+    )
+    args_parser.add_argument(
+        "--cache-max-mb",
+        type=validate_positive_int,
+        default=256,
+        help="Максимальный размер кеша в МБ (по умолчанию 256)",
+    )
+    args_parser.add_argument(
+        "--cache-hash",
+        action="store_true",
+        help="Добавлять в ключ кеша хеш содержимого файла",
+    )
+    args_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Читать файлы через отображение в память (mmap)",
+    )
+    args_parser.add_argument(
+        "--read-ahead",
+        type=validate_positive_int,
+        default=0,
+        metavar="FILES",
+        help="Заранее читать начало стольких следующих файлов, пока "
+        "разбирается текущий (по умолчанию выключено)",
+    )
+    args_parser.add_argument(
+        "--decoder",
+        default="auto",
+        choices=["auto", "json", "orjson", "msgspec"],
+        help="Декодер JSON, по умолчанию самый быстрый из установленных",
+    )
+    args_parser.add_argument(
+        "--engine",
+        default="python",
+        choices=["python", "numpy"],
+        help="Движок обработки записей (numpy - пачками на NumPy)",
+    )
+    args_parser.add_argument(
+        "--checkpoint",
+        help="Файл чекпоинта: каждый запуск дочитывает только новые строки "
+        "файлов и сливает их с сохраненным состоянием отчета",
+    )
+    args_parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Следить за дописываемыми файлами и обновлять отчет",
+    )
+    args_parser.add_argument(
+        "--interval",
+        type=validate_positive_int,
+        default=5,
+        help="Интервал обновления отчета в режиме --follow в секундах "
+        "(по умолчанию 5)",
+    )
+    args_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Напечатать в std.err статистику по файлам: строки, ошибки, "
+        "отфильтрованные записи, время этапов, пиковую память",
+    )
+    args_parser.add_argument(
+        "--stats-json",
+        help="Записать статистику (как у --stats) в JSON-файл",
+    )
+    args_parser.add_argument(
+        "--profile",
+        help="Выполнить под cProfile и сохранить профиль в файл .pstats",
+    )
     args = args_parser.parse_args()
+    validate_output(args.output_format, args.output)
+
+    stats = RunStats() if args.stats or args.stats_json else None
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        report = run(args, stats)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+    if stats is not None:
+        stats.finish(report, args.report[0])
+        if args.stats:
+            stats.print()
+        if args.stats_json:
+            stats.save(args.stats_json)
+
 
-    # Получаем итератор из записей в логах
-    parsed_logs = LogParser(args.file).parse()
+def run(args: argparse.Namespace, stats: RunStats | None) -> Report | None:
+    """Строит и печатает отчет по аргументам CLI, возвращает отчет.
+
+    Если передан stats, собирает в него статистику обработки.
+    """
+    # Повторы названий отчетов отбрасываем, порядок сохраняем
+    report_names = list(dict.fromkeys(args.report))
 
     # Собираем пайплайн из фильтров
     filter_pipeline = FilterPipeline()
     if args.date:
         filter_pipeline.add_contains("timestamp", args.date)
-    # Применяем пайплайн из фильтров к итератору логов
-    filtered_logs = filter_pipeline.apply(parsed_logs)
-
-    # Фабрика создает объект отчета, выбирая его в зависимости от
-    # переданного названия отчета.
-    report = report_factory(args.report, filtered_logs)
-    # Печатаем выбранный отчет
-    report.print()
+    if args.time_from is not None or args.time_to is not None:
+        filter_pipeline.add_time_range(args.time_from, args.time_to)
+
+    cache = None
+    if args.cache_dir:
+        cache = AggregateCache(
+            args.cache_dir, args.cache_max_mb * 1024 * 1024, args.cache_hash
+        )
+
+    # Период, за пределами которого записи точно не пройдут фильтры
+    time_start = filter_pipeline.time_lower_bound()
+    time_limit = filter_pipeline.time_upper_bound()
+    if args.date:
+        day_start, day_end = date_window(args.date)
+        time_start = max(time_start or day_start, day_start)
+        time_limit = min(time_limit or day_end, day_end)
+
+    # Парсер отбрасывает строки, которые точно не пройдут фильтры,
+    # еще до декодирования, читает по индексу времени только нужный
+    # диапазон файла и перестает читать файл после конца периода
+    parser = LogParser(
+        args.file,
+        filter_pipeline.raw_needles(),
+        use_mmap=args.mmap,
+        decoder=get_decoder(args.decoder),
+        time_limit=time_limit,
+        time_start=time_start,
+        stats=stats,
+        read_ahead=args.read_ahead,
+    )
+    engine = get_engine(args.engine)
+    url_rules = [tuple(rule) for rule in args.url_rule or ()]
+    if args.normalize_urls:
+        url_rules.extend(DEFAULT_RULES)
+    for pattern, _ in url_rules:
+        validate_regex(pattern)
+    report_options = {
+        "accuracy": args.accuracy,
+        "top": args.top,
+        "bucket": args.bucket,
+        "by_handler": args.by_handler,
+        "url_rules": url_rules or None,
+    }
+    if args.checkpoint or args.follow:
+        checkpoint = Checkpoint(
+            args.checkpoint, report_names, filter_pipeline, report_options
+        )
+        return follow(
+            checkpoint,
+            parser,
+            engine,
+            args.follow,
+            args.interval,
+            args.output_format,
+            args.output,
+        )
+
+    # Парсим логи, применяем пайплайн из фильтров и строим отчет,
+    # выбранный по переданному названию.
+    report = build_report(
+        parser,
+        report_names,
+        filter_pipeline,
+        args.workers,
+        cache,
+        engine,
+        report_options,
+    )
+    # Печатаем выбранный отчет в выбранном формате
+    with open_writer(args.output_format, args.output) as writer:
+        report.print(writer)
+    return report
+
+
+def follow(
+    checkpoint: Checkpoint,
+    parser: LogParser,
+    engine: Engine,
+    repeat: bool,
+    interval: int,
+    output_format: str = "table",
+    output: str | None = None,
+) -> Report | None:
+    """Дочитывает файлы через чекпоинт и печатает отчет.
+
+    Если repeat=True - повторяет это каждые interval секунд до
+    прерывания (Ctrl+C), каждый раз читая только новые строки.
+    Отчет пишется в формате output_format в std.out или в файл output
+    (файл каждый раз перезаписывается последним отчетом).
+    Возвращает последний напечатанный отчет.
+    """
+    checkpoint.load()
+    report = None
+    try:
+        while True:
+            report = checkpoint.update(parser, engine)
+            checkpoint.save()
+            with open_writer(output_format, output) as writer:
+                report.print(writer)
+            if not repeat:
+                return report
+            if output is None:
+                print()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return report
+
+
+def index_main(argv: list[str]) -> None:
+    """Команда index: строит или достраивает индексы времени файлов.
+
+    Для каждого файла пишет индекс в файл рядом с ним (см.
+    time_index.py). Индекс дописанного файла достраивается с места,
+    где остановился, индекс замененного файла строится заново.
+    Обработка недоступных файлов такая же, как в LogParser.parse.
+    """
+    args_parser = argparse.ArgumentParser(prog="main.py index")
+    args_parser.add_argument(
+        "--file",
+        nargs="+",
+        required=True,
+        help="Название файлов логов или относительные пути к файлам логов",
+    )
+    args_parser.add_argument(
+        "--bucket",
+        type=validate_positive_int,
+        default=BUCKET_SECONDS,
+        help="Размер интервала индекса в секундах "
+        f"(по умолчанию {BUCKET_SECONDS})",
+    )
+    args = args_parser.parse_args(argv)
+
+    ok_files = 0
+    for path in args.file:
+        index = TimeIndex.load(path)
+        if index is None or index.bucket != args.bucket:
+            index = TimeIndex(path, args.bucket)
+        try:
+            if index.update():
+                index.save()
+        except OSError as e:
+            print(
+                f"Файл {path} не удалось прочитать, ошибка {e!r}",
+                file=sys.stderr,
+            )
+            continue
+        ok_files += 1
+        print(
+            f"{index.index_path(path)}: {len(index.entries)} интервалов, "
+            f"проиндексировано {index.indexed_size} байт"
+        )
+    if ok_files == 0:
+        print("Все файлы не существуют либо не читаются", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
+from array import array
 from dataclasses import dataclass
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Iterable, Iterator
 
 from utils import float_or_none, int_or_none
 
 
-@dataclass
+@dataclass(slots=True)
 class LogRecord:
     """DTO для хранения информации об отдельной строке лога.
 
@@ -11,6 +15,8 @@ class LogRecord:
     игнорирую лишние поля. Если значение атрибута
     должно быть int или float, то, в случае ошибки
     преобразования типа, заменяет значение на None.
+    Экземпляры без __dict__ (slots), чтобы записи, которые
+    где-то буферизуются, занимали меньше памяти.
     """
 
     timestamp: str | None = None
@@ -30,3 +36,186 @@ class LogRecord:
             response_time=float_or_none(data.get("response_time")),
             http_user_agent=data.get("http_user_agent"),
         )
+
+
+class DictColumn:
+    """Колонка со словарным кодированием.
+
+    Каждое различное значение хранится один раз в списке values,
+    а для строк хранится только его номер в массиве codes (4 байта).
+    Номера выдаются в порядке первого появления значения.
+    """
+
+    __slots__ = ("values", "codes", "_index")
+
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self.codes = array("I")
+        self._index: dict[Any, int] = {}
+
+    def append(self, value: Any) -> None:
+        self.extend((value,))
+
+    def extend(self, values: Iterable[Any]) -> None:
+        index = self._index
+        known = self.values
+        codes = []
+        for value in values:
+            if value is None or type(value) is str:
+                key = value
+            else:
+                # Не-строки ключуются вместе с типом, чтобы не склеить
+                # 1 и True
+                key = (type(value), value)
+            code = index.get(key)
+            if code is None:
+                code = index[key] = len(known)
+                known.append(value)
+            codes.append(code)
+        self.codes.extend(codes)
+
+    def take(self, rows: Iterable[int]) -> "DictColumn":
+        # Словарь значений общий с исходной колонкой
+        column = DictColumn.__new__(DictColumn)
+        column.values = self.values
+        column._index = self._index
+        codes = self.codes
+        column.codes = array("I", (codes[i] for i in rows))
+        return column
+
+    def __getitem__(self, i: int) -> Any:
+        return self.values[self.codes[i]]
+
+    def __iter__(self) -> Iterator[Any]:
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class FloatColumn:
+    """Колонка float в массиве array('d') с маской заполненности.
+
+    Для None в values пишется 0.0, а в valid - 0.
+    """
+
+    __slots__ = ("values", "valid")
+
+    def __init__(self) -> None:
+        self.values = array("d")
+        self.valid = bytearray()
+
+    def append(self, value: float | None) -> None:
+        self.extend((value,))
+
+    def extend(self, values: Iterable[float | None]) -> None:
+        values = list(values)
+        self.values.extend(
+            [0.0 if value is None else value for value in values]
+        )
+        self.valid.extend([value is not None for value in values])
+
+    def take(self, rows: Iterable[int]) -> "FloatColumn":
+        rows = list(rows)
+        column = FloatColumn()
+        values, valid = self.values, self.valid
+        column.values = array("d", (values[i] for i in rows))
+        column.valid = bytearray(valid[i] for i in rows)
+        return column
+
+    def __getitem__(self, i: int) -> float | None:
+        return self.values[i] if self.valid[i] else None
+
+    def __iter__(self) -> Iterator[float | None]:
+        return (
+            value if ok else None for value, ok in zip(self.values, self.valid)
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class LogBatch:
+    """Колоночное представление пачки записей LogRecord.
+
+    Атрибуты с теми же названиями, что и у LogRecord, - колонки:
+    строки и status хранятся в DictColumn (повторяющиеся url, методы,
+    user-agent и т.д. хранятся один раз), response_time - в FloatColumn.
+    Пачку можно собрать из записей (from_records, append), получить
+    записи обратно (итерация, record) и выбрать подмножество строк
+    (take). Фильтры и отчеты умеют обрабатывать пачку целиком
+    (FilterPipeline.apply_batch, Report.accumulate_batch).
+    """
+
+    __slots__ = (
+        "timestamp",
+        "status",
+        "url",
+        "request_method",
+        "response_time",
+        "http_user_agent",
+    )
+
+    def __init__(self) -> None:
+        self.timestamp = DictColumn()
+        self.status = DictColumn()
+        self.url = DictColumn()
+        self.request_method = DictColumn()
+        self.response_time = FloatColumn()
+        self.http_user_agent = DictColumn()
+
+    @staticmethod
+    def from_records(
+        logs: Iterable[LogRecord], fields: Iterable[str] | None = None
+    ) -> "LogBatch":
+        """Собирает пачку из записей.
+
+        Если передан fields, заполняются только эти колонки - такая
+        неполная пачка годится только для чтения этих колонок.
+        """
+        logs = list(logs)
+        batch = LogBatch()
+        for field in LogBatch.__slots__ if fields is None else fields:
+            getattr(batch, field).extend(map(attrgetter(field), logs))
+        return batch
+
+    @staticmethod
+    def batches(
+        logs: Iterable[LogRecord],
+        size: int,
+        fields: Iterable[str] | None = None,
+    ) -> Iterator["LogBatch"]:
+        """Режет поток записей на пачки не больше size записей."""
+        logs = iter(logs)
+        while chunk := list(islice(logs, size)):
+            yield LogBatch.from_records(chunk, fields)
+
+    def append(self, log: LogRecord) -> None:
+        for field in self.__slots__:
+            getattr(self, field).append(getattr(log, field))
+
+    def take(self, rows: Iterable[int]) -> "LogBatch":
+        rows = list(rows)
+        batch = LogBatch.__new__(LogBatch)
+        for field in self.__slots__:
+            setattr(batch, field, getattr(self, field).take(rows))
+        return batch
+
+    def record(self, i: int) -> LogRecord:
+        return LogRecord(
+            timestamp=self.timestamp[i],
+            status=self.status[i],
+            url=self.url[i],
+            request_method=self.request_method[i],
+            response_time=self.response_time[i],
+            http_user_agent=self.http_user_agent[i],
+        )
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        columns = (getattr(self, field) for field in self.__slots__)
+        for values in zip(*columns):
+            yield LogRecord(*values)
+
+    def __len__(self) -> int:
+        return max(len(getattr(self, field)) for field in self.__slots__)
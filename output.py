@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, TextIO
+
+
+# Форматы вывода отчетов, arrow и parquet требуют pyarrow
+FORMATS = ("table", "jsonl", "csv", "arrow", "parquet")
+BINARY_FORMATS = ("arrow", "parquet")
+# Название столбца нумерации (в таблице у него пустой заголовок)
+INDEX_COLUMN = "index"
+
+
+def _columns(headers: tuple[str, ...], name: str | None) -> list[str]:
+    columns = [header or INDEX_COLUMN for header in headers]
+    if name is not None:
+        columns.insert(0, "report")
+    return columns
+
+
+def _rows(
+    rows: Iterable[tuple[Any, ...]], name: str | None
+) -> Iterable[tuple[Any, ...]]:
+    if name is None:
+        return rows
+    return ((name, *row) for row in rows)
+
+
+class ReportWriter(ABC):
+    """Абстрактный вывод строк отчета.
+
+    Метод write получает заголовки и строки отчета (и название отчета,
+    если отчетов несколько, см. MultiReport) и пишет их в свой формат.
+    Один writer может получить несколько отчетов подряд.
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        self.file = file
+        self._written = 0
+
+    def write(
+        self,
+        headers: tuple[str, ...],
+        rows: Iterable[tuple[Any, ...]],
+        name: str | None = None,
+    ) -> None:
+        self._write(headers, rows, name)
+        self._written += 1
+
+    @abstractmethod
+    def _write(
+        self,
+        headers: tuple[str, ...],
+        rows: Iterable[tuple[Any, ...]],
+        name: str | None,
+    ) -> None:
+        """Пишет один отчет."""
+
+
+class TableWriter(ReportWriter):
+    """Текстовая таблица tabulate (формат table).
+
+    tabulate импортируется только при выводе таблицы. Таблица строится
+    целиком в памяти, для больших отчетов лучше jsonl или csv.
+    Отчеты из MultiReport печатаются под своими названиями через
+    пустую строку.
+    """
+
+    def _write(
+        self,
+        headers: tuple[str, ...],
+        rows: Iterable[tuple[Any, ...]],
+        name: str | None,
+    ) -> None:
+        from tabulate import tabulate
+
+        if self._written:
+            print(file=self.file)
+        if name is not None:
+            print(f"Отчет {name}", file=self.file)
+        print(tabulate(rows, headers=headers), file=self.file)
+
+
+class JsonLinesWriter(ReportWriter):
+    """JSON Lines (формат jsonl): по объекту на строку отчета.
+
+    Ключи - заголовки отчета, столбец нумерации называется 'index'.
+    Для MultiReport в каждый объект первым добавляется ключ 'report'.
+    Строки пишутся по одной, без сборки всего вывода в памяти.
+    """
+
+    def _write(
+        self,
+        headers: tuple[str, ...],
+        rows: Iterable[tuple[Any, ...]],
+        name: str | None,
+    ) -> None:
+        columns = _columns(headers, name)
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        self.file.writelines(
+            encode(dict(zip(columns, row))) + "\n" for row in _rows(rows, name)
+        )
+
+
+class CsvWriter(ReportWriter):
+    """CSV (формат csv): строка заголовков, затем строки отчета.
+
+    None пишется пустым значением. Для MultiReport первым добавляется
+    столбец 'report', а отчеты с разными заголовками идут секциями
+    через пустую строку.
+    """
+
+    def _write(
+        self,
+        headers: tuple[str, ...],
+        rows: Iterable[tuple[Any, ...]],
+        name: str | None,
+    ) -> None:
+        if self._written:
+            self.file.write("\n")
+        writer = csv.writer(self.file, lineterminator="\n")
+        writer.writerow(_columns(headers, name))
+        writer.writerows(_rows(rows, name))
+
+
+class ArrowWriter(ReportWriter):
+    """Файл Arrow IPC или Parquet (форматы arrow и parquet).
+
+    Требует pyarrow, который импортируется только при записи. Пишет
+    в файл path, а не в поток; для MultiReport каждый отчет пишется
+    в отдельный файл, в название которого перед расширением
+    добавляется название отчета (out.parquet -> out.average.parquet).
+    """
+
+    def __init__(self, path: str, output_format: str) -> None:
+        super().__init__(None)
+        self.path = path
+        self.output_format = output_format
+
+    def _write(
+        self,
+        headers: tuple[str, ...],
+        rows: Iterable[tuple[Any, ...]],
+        name: str | None,
+    ) -> None:
+        import pyarrow as pa
+
+        rows = list(_rows(rows, name))
+        columns = _columns(headers, name)
+        table = pa.table(
+            {
+                column: [row[i] for row in rows]
+                for i, column in enumerate(columns)
+            }
+        )
+        path = self.path
+        if name is not None:
+            stem, ext = os.path.splitext(path)
+            path = f"{stem}.{name}{ext}"
+        if self.output_format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, path)
+        else:
+            with pa.ipc.new_file(path, table.schema) as writer:
+                writer.write_table(table)
+
+
+_writers = {
+    "table": TableWriter,
+    "jsonl": JsonLinesWriter,
+    "csv": CsvWriter,
+}
+
+
+def validate_output(output_format: str, path: str | None) -> None:
+    """Проверяет, что вывод в формат output_format возможен.
+
+    Для arrow и parquet нужен файл и установленный pyarrow. В случае
+    ошибки пишет сообщение в std.err и завершает работу.
+    """
+    if output_format not in BINARY_FORMATS:
+        return
+    if path is None:
+        print(
+            f"Для формата {output_format} нужно указать файл в --output",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print(
+            f"Для формата {output_format} нужно установить pyarrow",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+@contextmanager
+def open_writer(
+    output_format: str = "table", path: str | None = None
+) -> Iterator[ReportWriter]:
+    """Открывает вывод отчета в формате output_format.
+
+    Без path текстовые форматы пишутся в std.out. Файл path
+    перезаписывается.
+    """
+    if output_format in BINARY_FORMATS:
+        yield ArrowWriter(path, output_format)
+        return
+    writer_class = _writers[output_format]
+    if path is None:
+        yield writer_class(sys.stdout)
+        return
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        yield writer_class(file)
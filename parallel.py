@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from decompress import detect_compression
+from engines import Engine
+from filters import FilterPipeline
+from log_parser import LogParser
+from reports.factory import ReportName, report_factory
+from stats import FileStats
+
+
+# Файлы больше этого размера режутся на диапазоны байт
+CHUNK_SIZE = 64 * 1024 * 1024
+
+Task = tuple[str, int, int | None]
+# Состояние отчета, текст ошибки и статистика (если parser.stats задан)
+TaskResult = tuple[Any, str | None, FileStats | None]
+
+
+def plan_tasks(
+    files: list[tuple[str, int]], chunk_size: int = CHUNK_SIZE
+) -> list[tuple[int, Task]]:
+    """Разбивает файлы (путь, размер) на задачи для воркеров.
+
+    Каждая задача - это (путь, начало, конец) диапазона байт файла,
+    в паре с номером файла в списке files.
+    Границы диапазонов не обязаны попадать на переводы строк -
+    LogParser.parse_file сам выравнивает их по строкам.
+    Сжатые файлы не режутся: их нельзя читать с середины.
+    """
+    tasks: list[tuple[int, Task]] = []
+    for i, (path, size) in enumerate(files):
+        if size <= chunk_size or detect_compression(path) is not None:
+            tasks.append((i, (path, 0, None)))
+            continue
+        for start in range(0, size, chunk_size):
+            end = start + chunk_size
+            tasks.append((i, (path, start, end if end < size else None)))
+    return tasks
+
+
+def task_state(
+    task: Task,
+    parser: LogParser,
+    report_name: ReportName,
+    pipeline: FilterPipeline,
+    engine: Engine,
+    report_options: dict[str, Any] | None = None,
+) -> TaskResult:
+    """Считает состояние отчета по одной задаче (выполняется в воркере).
+
+    Читает свой диапазон файла, применяет фильтры и накапливает
+    состояние отчета движком engine. Возвращает состояние, текст ошибки
+    чтения файла (или None) и, если у parser задан stats, статистику
+    обработки задачи (иначе None).
+    """
+    path, start, end = task
+    report = report_factory(report_name, iter([]), report_options)
+    stats = FileStats() if parser.stats is not None else None
+    try:
+        logs = parser.parse_file(path, start, end, stats)
+        if stats is None:
+            engine.accumulate(report, pipeline, logs)
+        else:
+            stats.accumulate(engine, report, pipeline, logs)
+        return report.state, None, stats
+    except Exception as e:
+        error = f"Файл {path} не удалось прочитать, ошибка {e!r}"
+        return None, error, stats
+
+
+def parallel_file_states(
+    files: list[tuple[str, int]],
+    parser: LogParser,
+    report_name: ReportName,
+    pipeline: FilterPipeline,
+    engine: Engine,
+    workers: int,
+    chunk_size: int = CHUNK_SIZE,
+    report_options: dict[str, Any] | None = None,
+) -> list[TaskResult]:
+    """Считает состояния отчета по файлам в пуле из workers процессов.
+
+    Воркеры возвращают только небольшие состояния отчета (см. Report),
+    а не сами записи. Состояния кусков одного файла сливаются в порядке
+    задач, поэтому результат совпадает с последовательным режимом
+    (включая порядок строк с одинаковым кол-вом запросов).
+    Возвращает для каждого файла (в том же порядке) состояние, текст
+    ошибки (или None) и слитую статистику его задач (см. task_state).
+    """
+    tasks = plan_tasks(files, chunk_size)
+    reports = [
+        report_factory(report_name, iter([]), report_options) for _ in files
+    ]
+    errors: list[str | None] = [None] * len(files)
+    stats: list[FileStats | None] = [None] * len(files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            task_state,
+            [task for _, task in tasks],
+            [parser] * len(tasks),
+            [report_name] * len(tasks),
+            [pipeline] * len(tasks),
+            [engine] * len(tasks),
+            [report_options] * len(tasks),
+        )
+        for (i, _), (state, error, task_stats) in zip(tasks, results):
+            if task_stats is not None:
+                if stats[i] is None:
+                    stats[i] = task_stats
+                else:
+                    stats[i].merge(task_stats)
+            if errors[i] is not None:
+                continue
+            if error is not None:
+                errors[i] = error
+            else:
+                reports[i].merge(state)
+    return [
+        (None if error is not None else report.state, error, file_stats)
+        for report, error, file_stats in zip(reports, errors, stats)
+    ]
@@ -0,0 +1,91 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Сколько байт начала каждого следующего файла читается заранее
+READ_AHEAD_BYTES = 16 * 1024 * 1024
+# Размер блока чтения (и буфера каждого потока)
+BLOCK_SIZE = 1024 * 1024
+
+
+class ReadAhead:
+    """Заранее читает начало следующих файлов, пока разбирается текущий.
+
+    Пока парсер декодирует файл paths[i], пул из files потоков читает
+    первые limit байт файлов paths[i + 1] ... paths[i + files]:
+    просит ядро подгрузить их (posix_fadvise WILLNEED, где он есть) и
+    читает блоками через readinto в переиспользуемые буферы, чтобы
+    данные попали в кеш страниц и на файловых системах, где fadvise
+    ничего не делает (сетевые). Сами данные отбрасываются: парсер
+    читает файл как обычно, но уже из памяти.
+    Память процесса ограничена files буферами по BLOCK_SIZE байт,
+    кеш страниц - limit байтами на файл.
+    Ошибки чтения игнорируются: о недоступном файле сообщит сам парсер,
+    когда до него дойдет очередь. При files=0 ничего не делает.
+    """
+
+    def __init__(
+        self, paths: list[str], files: int = 2, limit: int = READ_AHEAD_BYTES
+    ) -> None:
+        self.paths = paths
+        self.files = files
+        self.limit = limit
+        self._submitted = 0
+        self._stop = threading.Event()
+        self._executor = None
+        self._buffers: queue.Queue = queue.Queue()
+        if files > 0 and len(paths) > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=files, thread_name_prefix="read-ahead"
+            )
+            for _ in range(files):
+                self._buffers.put(bytearray(BLOCK_SIZE))
+
+    def __enter__(self) -> "ReadAhead":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def advance(self, current: int) -> None:
+        """Сообщает, что начат разбор файла paths[current]."""
+        if self._executor is None:
+            return
+        start = max(self._submitted, current + 1)
+        stop = min(current + 1 + self.files, len(self.paths))
+        for i in range(start, stop):
+            self._executor.submit(self._prefetch, self.paths[i])
+        self._submitted = max(start, stop)
+
+    def close(self) -> None:
+        """Отменяет чтение еще не начатых файлов и ждет потоки."""
+        if self._executor is None:
+            return
+        self._stop.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def _prefetch(self, path: str) -> int:
+        """Читает начало файла path, возвращает кол-во прочитанных байт."""
+        done = 0
+        try:
+            with open(path, "rb", buffering=0) as file:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(
+                        file.fileno(), 0, self.limit, os.POSIX_FADV_WILLNEED
+                    )
+                buffer = self._buffers.get()
+                try:
+                    with memoryview(buffer) as view:
+                        while done < self.limit and not self._stop.is_set():
+                            size = file.readinto(view[: self.limit - done])
+                            if not size:
+                                break
+                            done += size
+                finally:
+                    self._buffers.put(buffer)
+        except OSError:
+            pass
+        return done
@@ -1,42 +1,145 @@
-from collections import defaultdict
-from typing import Any, Iterator
+from operator import add
+from typing import Any, Iterable, Iterator
 
-from models import LogRecord
+from models import LogBatch, LogRecord
 from reports.base import Report
+from sketch import SpaceSaving
+from url_rules import UrlNormalizer
+
+
+# Во сколько раз Space-Saving отслеживает больше url, чем выводится
+TOP_CAPACITY_FACTOR = 10
 
 
 class AverageReport(Report):
     """Отчет 'average'.
 
-    Переопределяет абстрактный метод _generate,
-    который генерирует отчет. Передает заголовки в инициализатор
-    родительского класса.
-    Класс реализует отчет 'average' (на данный момент
-    единственный). При обработке строк игнорируются строки с
+    Реализует шаги accumulate, merge и finalize родительского класса.
+    Передает заголовки в инициализатор родительского класса.
+    При обработке строк игнорируются строки с
     'None' значениями в атрибутах 'response_time' и 'url' LogRecord.
     Отчет average считает средне 'response_time' (в выводе 'avg_response_time')
     и кол-во запросов (в выводе 'total') по каждому 'url' (в выводе 'handler'),
     упорядочивает по кол-ву запросов и добавляет столбец с нумерацией с нуля.
+    Состояние отчета - словарь {url: [count, sum]}.
+    Если передан url_rules (список пар (регулярное выражение, замена)),
+    url перед группировкой приводятся к шаблонам (см. UrlNormalizer).
+    Если передан top, память ограничена: url отслеживаются алгоритмом
+    Space-Saving (см. sketch.py) в количестве top * TOP_CAPACITY_FACTOR,
+    а выводятся top самых частых. Тогда состояние - словарь
+    {url: [count, error, sum]}, 'total' - оценка сверху, завышенная
+    не больше чем на долю 1 / (top * TOP_CAPACITY_FACTOR) от всех
+    запросов, а среднее считается по запросам, пришедшим после того,
+    как url начал отслеживаться.
     """
 
-    def __init__(self, logs: Iterator[LogRecord]) -> None:
+    options = ("top", "url_rules")
+
+    def __init__(
+        self,
+        logs: Iterator[LogRecord],
+        top: int | None = None,
+        url_rules: list[tuple[str, str]] | None = None,
+    ) -> None:
+        self.top = top
+        self._normalize = UrlNormalizer(url_rules) if url_rules else None
+        self._summary: SpaceSaving | None = None
+        if top is not None:
+            self._summary = SpaceSaving(top * TOP_CAPACITY_FACTOR)
         headers = ("", "handler", "total", "avg_response_time")
         super().__init__(logs, headers)
 
-    def _generate(self) -> tuple[tuple[Any, ...], ...]:
-        groups = defaultdict(lambda: {"count": 0, "sum": 0.0})
-        for log in self._logs:
+    @property
+    def plain(self) -> bool:
+        """url не нормализуются и не ограничиваются top."""
+        return self._summary is None and self._normalize is None
+
+    def _new_state(self) -> dict[str, list[int | float]]:
+        if self._summary is not None:
+            return self._summary.entries
+        return {}
+
+    def accumulate(self, log: LogRecord) -> None:
+        self.accumulate_all((log,))
+
+    def accumulate_all(self, logs: Iterable[LogRecord]) -> None:
+        if self._summary is not None:
+            self._accumulate_top(logs)
+            return
+        groups = self._state
+        normalize = self._normalize
+        for log in logs:
             key = log.url
             value = log.response_time
             if key is None or value is None:
                 continue
-            groups[key]["count"] += 1
-            groups[key]["sum"] += value
-        report_data = sorted(
-            (
-                (k, v["count"], round(v["sum"] / v["count"], 3))
-                for k, v in groups.items()
-            ),
-            key=lambda x: -x[1],
-        )
+            if normalize is not None:
+                key = normalize(key)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, value]
+            else:
+                group[0] += 1
+                group[1] += value
+
+    def _accumulate_top(self, logs: Iterable[LogRecord]) -> None:
+        add_key = self._summary.add
+        normalize = self._normalize
+        for log in logs:
+            key = log.url
+            value = log.response_time
+            if key is None or value is None:
+                continue
+            if normalize is not None:
+                key = normalize(key)
+            add_key(key, float)[2] += value
+
+    def accumulate_batch(self, batch: LogBatch) -> None:
+        if not self.plain:
+            self.accumulate_all(batch)
+            return
+        groups = self._state
+        urls = batch.url.values
+        response_times = batch.response_time
+        for code, value, ok in zip(
+            batch.url.codes, response_times.values, response_times.valid
+        ):
+            key = urls[code]
+            if key is None or not ok:
+                continue
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, value]
+            else:
+                group[0] += 1
+                group[1] += value
+
+    def merge(self, other_state: dict[str, list[int | float]]) -> None:
+        if self._summary is not None:
+            self._summary.merge(other_state, add)
+            self._state = self._summary.entries
+            return
+        groups = self._state
+        for key, (count, total) in other_state.items():
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [count, total]
+            else:
+                group[0] += count
+                group[1] += total
+
+    def finalize(self) -> tuple[tuple[Any, ...], ...]:
+        if self._summary is not None:
+            rows = (
+                (k, count, round(total / (count - error), 3))
+                for k, (count, error, total) in self._state.items()
+            )
+        else:
+            rows = (
+                (k, count, round(total / count, 3))
+                for k, (count, total) in self._state.items()
+            )
+        report_data = sorted(rows, key=lambda x: -x[1])
+        if self.top is not None:
+            report_data = report_data[: self.top]
         return tuple((i, *items) for i, items in enumerate(report_data))
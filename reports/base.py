@@ -1,9 +1,9 @@
+import sys
 from abc import ABC, abstractmethod
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator
 
-from tabulate import tabulate
-
-from models import LogRecord
+from models import LogBatch, LogRecord
+from output import ReportWriter, TableWriter
 
 
 class Report(ABC):
@@ -12,23 +12,73 @@ class Report(ABC):
     Интерфейс классов отчетов.
     При инициализации экземпляра на вход принимается итератор из
     логов и заголовки отчета.
+    Отчет строится в три шага:
+    - accumulate(log) добавляет запись в состояние отчета;
+    - merge(other_state) сливает с состоянием отчета состояние,
+      посчитанное в другом месте (по другому файлу, куску файла,
+      в другом процессе и т.д.);
+    - finalize() строит строки отчета из состояния.
+    Состояние (атрибут state) - JSON-сериализуемая структура, его можно
+    сохранить на диск и слить с другими состояниями позже.
+    Методы accumulate_all и accumulate_batch добавляют в состояние все
+    записи итератора или пачки LogBatch, наследники могут переопределить
+    их для ускорения.
     Метод print лениво генерирует отчет при вызове и кеширует его
-    в атрибуте self._rows, а затем печатает отчет.
-    В наследниках класса необходимо переопределить _generate и
-    присвоить значение self._headers (например в методе __init__).
+    в атрибуте self._rows, а затем пишет отчет в writer (см. output.py),
+    по умолчанию - таблицей в std.out.
+    Атрибут options - названия параметров отчета (аргументов __init__),
+    которые передает report_factory.
+    В наследниках класса необходимо переопределить _new_state, accumulate,
+    merge, finalize и присвоить значение self._headers (например в
+    методе __init__).
     """
 
+    options: tuple[str, ...] = ()
+
     def __init__(
         self, logs: Iterator[LogRecord], headers: tuple[str, ...] = tuple()
     ) -> None:
         self._logs = logs
         self._headers = headers
         self._rows: tuple[tuple[Any, ...], ...] | None = None
+        self._state = self._new_state()
+
+    @property
+    def state(self) -> Any:
+        return self._state
+
+    @property
+    def size(self) -> int:
+        """Кол-во ключей (групп) в состоянии отчета."""
+        return len(self._state)
+
+    @abstractmethod
+    def _new_state(self) -> Any: ...  # noqa: E704
+
+    @abstractmethod
+    def accumulate(self, log: LogRecord) -> None: ...  # noqa: E704
+
+    @abstractmethod
+    def merge(self, other_state: Any) -> None: ...  # noqa: E704
 
     @abstractmethod
-    def _generate(self) -> tuple[tuple[Any, ...]]: ...  # noqa: E704
+    def finalize(self) -> tuple[tuple[Any, ...], ...]: ...  # noqa: E704
+
+    def accumulate_all(self, logs: Iterable[LogRecord]) -> None:
+        for log in logs:
+            self.accumulate(log)
+
+    def accumulate_batch(self, batch: LogBatch) -> None:
+        self.accumulate_all(batch)
+
+    def _generate(self) -> tuple[tuple[Any, ...], ...]:
+        self.accumulate_all(self._logs)
+        return self.finalize()
+
+    def print(self, writer: ReportWriter | None = None) -> None:
+        self._write(writer or TableWriter(sys.stdout))
 
-    def print(self) -> None:
+    def _write(self, writer: ReportWriter, name: str | None = None) -> None:
         if self._rows is None:
             self._rows = self._generate()
-        print(tabulate(self._rows, headers=self._headers))
+        writer.write(self._headers, self._rows, name)
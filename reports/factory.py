@@ -1,21 +1,71 @@
 import sys
-from typing import Iterator
+from typing import Any, Iterator
 
 from models import LogRecord
 from reports.average import AverageReport
 from reports.base import Report
+from reports.latency import LatencyReport
+from reports.multi import MultiReport
+from reports.timeseries import TimeseriesReport
 
 
-def report_factory(report_name: str, logs: Iterator[LogRecord]) -> Report:
+# Для добавления новых отчетов требуется расширить словарь reports
+reports: dict[str, type[Report]] = {
+    "average": AverageReport,
+    "latency": LatencyReport,
+    "timeseries": TimeseriesReport,
+}
+
+# Название отчета или список названий отчетов, строящихся за один проход
+ReportName = str | list[str]
+
+
+def accepted_options(
+    report_name: ReportName, options: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Параметры из options, которые принимает отчет report_name.
+
+    Параметры, которые принимает отчет, перечислены в атрибуте
+    options класса отчета. Для списка отчетов - параметры, которые
+    принимает хотя бы один из них.
+    """
+    names = [report_name] if isinstance(report_name, str) else report_name
+    accepted = {
+        option
+        for name in names
+        if name in reports
+        for option in reports[name].options
+    }
+    if not options:
+        return {}
+    return {key: value for key, value in options.items() if key in accepted}
+
+
+def report_factory(
+    report_name: ReportName,
+    logs: Iterator[LogRecord],
+    options: dict[str, Any] | None = None,
+) -> Report:
     """Фабрика отчетов.
 
     Возвращает экземпляр отчета в зависимости от имени отчета,
     которое передается в функцию вместе с итератором из логов.
+    Отчету передаются те параметры из options, которые он принимает
+    (см. accepted_options).
+    Если передан список из нескольких названий, возвращает MultiReport
+    из этих отчетов.
     Для добавления новых отчетов требуется расширить словарь reports.
     """
-    reports: dict[str, type[Report]] = {
-        "average": AverageReport,
-    }
+    if not isinstance(report_name, str):
+        if len(report_name) == 1:
+            return report_factory(report_name[0], logs, options)
+        return MultiReport(
+            {
+                name: report_factory(name, iter([]), options)
+                for name in report_name
+            },
+            logs,
+        )
     report_class = reports.get(report_name)
     if report_class is None:
         print(
@@ -23,4 +73,4 @@ def report_factory(report_name: str, logs: Iterator[LogRecord]) -> Report:
             file=sys.stderr,
         )
         sys.exit(1)
-    return report_class(logs)
+    return report_class(logs, **accepted_options(report_name, options))
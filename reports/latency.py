@@ -0,0 +1,134 @@
+from typing import Any, Iterable, Iterator
+
+from models import LogRecord
+from reports.average import TOP_CAPACITY_FACTOR
+from reports.base import Report
+from sketch import DDSketch, SpaceSaving
+from url_rules import UrlNormalizer
+
+
+class LatencyReport(Report):
+    """Отчет 'latency'.
+
+    Считает по каждому 'url' (в выводе 'handler') кол-во запросов
+    (в выводе 'total'), перцентили p50, p90, p95, p99 и максимум
+    'response_time', упорядочивает по кол-ву запросов и добавляет
+    столбец с нумерацией с нуля. Строки с 'None' значениями в 'url'
+    и 'response_time' игнорируются.
+    Перцентили оцениваются скетчем DDSketch (см. sketch.py)
+    с относительной точностью accuracy, поэтому память на каждый url
+    не зависит от кол-ва строк. Максимум точный.
+    Внутри отчет хранит скетчи {url: DDSketch}, а атрибут state
+    отдает их в JSON-сериализуемом виде {url: состояние скетча}.
+    Параметры url_rules и top - как у AverageReport. С top внутри
+    хранятся записи Space-Saving {url: [count, error, DDSketch]},
+    перцентили и максимум считаются по запросам, пришедшим после того,
+    как url начал отслеживаться.
+    """
+
+    options = ("accuracy", "top", "url_rules")
+    quantiles = (0.5, 0.9, 0.95, 0.99)
+
+    def __init__(
+        self,
+        logs: Iterator[LogRecord],
+        accuracy: float = 0.01,
+        top: int | None = None,
+        url_rules: list[tuple[str, str]] | None = None,
+    ) -> None:
+        self.accuracy = accuracy
+        self.top = top
+        self._normalize = UrlNormalizer(url_rules) if url_rules else None
+        self._summary: SpaceSaving | None = None
+        if top is not None:
+            self._summary = SpaceSaving(top * TOP_CAPACITY_FACTOR)
+        headers = ("", "handler", "total", "p50", "p90", "p95", "p99", "max")
+        super().__init__(logs, headers)
+
+    @property
+    def state(self) -> dict[str, Any]:
+        if self._summary is not None:
+            return {
+                url: [count, error, sketch.to_state()]
+                for url, (count, error, sketch) in self._state.items()
+            }
+        return {url: sketch.to_state() for url, sketch in self._state.items()}
+
+    def _new_state(self) -> dict[str, Any]:
+        if self._summary is not None:
+            return self._summary.entries
+        return {}
+
+    def _new_sketch(self) -> DDSketch:
+        return DDSketch(self.accuracy)
+
+    def accumulate(self, log: LogRecord) -> None:
+        self.accumulate_all((log,))
+
+    def accumulate_all(self, logs: Iterable[LogRecord]) -> None:
+        sketches = self._state
+        summary = self._summary
+        normalize = self._normalize
+        for log in logs:
+            key = log.url
+            value = log.response_time
+            if key is None or value is None:
+                continue
+            if normalize is not None:
+                key = normalize(key)
+            if summary is not None:
+                summary.add(key, self._new_sketch)[2].add(value)
+                continue
+            sketch = sketches.get(key)
+            if sketch is None:
+                sketch = sketches[key] = DDSketch(self.accuracy)
+            sketch.add(value)
+
+    def merge(self, other_state: dict[str, Any]) -> None:
+        if self._summary is not None:
+            entries = {
+                key: [count, error, DDSketch.from_state(state, self.accuracy)]
+                for key, (count, error, state) in other_state.items()
+            }
+            self._summary.merge(entries, self._merge_sketches)
+            self._state = self._summary.entries
+            return
+        sketches = self._state
+        for key, state in other_state.items():
+            other = DDSketch.from_state(state, self.accuracy)
+            sketch = sketches.get(key)
+            if sketch is None:
+                sketches[key] = other
+            else:
+                sketch.merge(other)
+
+    @staticmethod
+    def _merge_sketches(sketch: DDSketch, other: DDSketch) -> DDSketch:
+        sketch.merge(other)
+        return sketch
+
+    def finalize(self) -> tuple[tuple[Any, ...], ...]:
+        if self._summary is not None:
+            groups = (
+                (k, count, sketch)
+                for k, (count, _, sketch) in self._state.items()
+            )
+        else:
+            groups = (
+                (k, sketch.count, sketch) for k, sketch in self._state.items()
+            )
+        report_data = sorted(
+            (
+                (
+                    k,
+                    count,
+                    *(round(sketch.quantile(q), 3) for q in self.quantiles),
+                    round(sketch.max, 3),
+                )
+                for k, count, sketch in groups
+            ),
+            key=lambda x: -x[1],
+        )
+        if self.top is not None:
+            report_data = report_data[: self.top]
+        return tuple((i, *items) for i, items in enumerate(report_data))
@@ -0,0 +1,72 @@
+import sys
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from models import LogBatch, LogRecord
+from output import ReportWriter, TableWriter
+from reports.base import Report
+
+
+# По сколько записей поток раздается отчетам
+CHUNK_SIZE = 4096
+
+
+class MultiReport(Report):
+    """Несколько отчетов, построенных за один проход по записям.
+
+    Принимает словарь {название: отчет}. Поток записей режется на куски
+    по CHUNK_SIZE записей, и каждый кусок передается в accumulate_all
+    всех отчетов, поэтому записи декодируются и фильтруются один раз,
+    а отчеты сохраняют свои быстрые циклы накопления.
+    Состояние - список состояний отчетов в том же порядке.
+    Метод print пишет отчеты по очереди в один writer, передавая
+    их названия (в таблице каждый отчет печатается под своим названием).
+    """
+
+    def __init__(
+        self, reports: dict[str, Report], logs: Iterator[LogRecord]
+    ) -> None:
+        self.reports = reports
+        super().__init__(logs)
+
+    @property
+    def state(self) -> list[Any]:
+        return [report.state for report in self.reports.values()]
+
+    @property
+    def size(self) -> int:
+        return sum(report.size for report in self.reports.values())
+
+    def _new_state(self) -> None:
+        return None
+
+    def accumulate(self, log: LogRecord) -> None:
+        for report in self.reports.values():
+            report.accumulate(log)
+
+    def accumulate_all(self, logs: Iterable[LogRecord]) -> None:
+        reports = list(self.reports.values())
+        logs = iter(logs)
+        while chunk := list(islice(logs, CHUNK_SIZE)):
+            for report in reports:
+                report.accumulate_all(chunk)
+
+    def accumulate_batch(self, batch: LogBatch) -> None:
+        for report in self.reports.values():
+            report.accumulate_batch(batch)
+
+    def merge(self, other_state: list[Any]) -> None:
+        for report, state in zip(self.reports.values(), other_state):
+            report.merge(state)
+
+    def finalize(self) -> tuple[tuple[tuple[Any, ...], ...], ...]:
+        return tuple(report.finalize() for report in self.reports.values())
+
+    def print(self, writer: ReportWriter | None = None) -> None:
+        writer = writer or TableWriter(sys.stdout)
+        if self._rows is None:
+            # Строки каждый отчет строит и кеширует сам в своем _write
+            self.accumulate_all(self._logs)
+            self._rows = ()
+        for name, report in self.reports.items():
+            report._write(writer, name)
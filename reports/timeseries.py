@@ -0,0 +1,211 @@
+from array import array
+from typing import Any, Iterable, Iterator
+
+from models import LogBatch, LogRecord
+from reports.base import Report
+from url_rules import UrlNormalizer
+
+
+class TimeseriesReport(Report):
+    """Отчет 'timeseries'.
+
+    Делит записи на интервалы времени шириной bucket секунд (в выводе
+    'bucket' - начало интервала) и по каждому интервалу считает
+    кол-во запросов ('total'), запросов в минуту ('rpm'), среднее и
+    максимальное 'response_time'. Если by_handler=True - отдельно по
+    каждому 'url' (в выводе 'handler'), записи с 'None' в 'url' тогда
+    игнорируются. Записи без 'timestamp' игнорируются, записи без
+    'response_time' учитываются только в 'total' и 'rpm'. Строки
+    упорядочены по интервалам, интервалы без запросов не выводятся.
+    Интервал определяется срезом ISO-строки timestamp без разбора даты:
+    от строки берется префикс до часа, минуты или секунды (в
+    зависимости от bucket), и интервал вычисляется один раз на каждый
+    различный префикс. Поэтому интервалы берутся по времени, записанному
+    в строке, без учета часового пояса, а bucket должен делить сутки.
+    Счетчики интервалов хранятся в массивах array по номеру интервала,
+    состояние - словарь {"keys": интервалы (или пары [интервал, url]),
+    "count", "timed", "sum", "max": массивы в том же порядке}.
+    Параметр url_rules - как у AverageReport.
+    """
+
+    options = ("bucket", "by_handler", "url_rules")
+
+    def __init__(
+        self,
+        logs: Iterator[LogRecord],
+        bucket: int = 60,
+        by_handler: bool = False,
+        url_rules: list[tuple[str, str]] | None = None,
+    ) -> None:
+        self.bucket = bucket
+        self.by_handler = by_handler
+        self._normalize = UrlNormalizer(url_rules) if url_rules else None
+        # Длина префикса "ГГГГ-ММ-ДДTЧЧ", "...:ММ" или "...:СС"
+        if bucket % 3600 == 0:
+            self._prefix_size = 13
+        elif bucket % 60 == 0:
+            self._prefix_size = 16
+        else:
+            self._prefix_size = 19
+        # Интервал по префиксу timestamp, "" - timestamp не разобран
+        self._labels: dict[str, str] = {}
+        self._counts = array("q")
+        self._timed = array("q")
+        self._sums = array("d")
+        self._maxes = array("d")
+        headers = (
+            "",
+            "bucket",
+            *(("handler",) if by_handler else ()),
+            "total",
+            "rpm",
+            "avg_response_time",
+            "max_response_time",
+        )
+        super().__init__(logs, headers)
+
+    @property
+    def state(self) -> dict[str, list[Any]]:
+        return {
+            "keys": [
+                list(key) if self.by_handler else key for key in self._state
+            ],
+            "count": self._counts.tolist(),
+            "timed": self._timed.tolist(),
+            "sum": self._sums.tolist(),
+            "max": self._maxes.tolist(),
+        }
+
+    def _new_state(self) -> dict[Any, int]:
+        # Номер интервала (позиция в массивах) по ключу
+        return {}
+
+    def _label(self, prefix: str) -> str:
+        """Начало интервала, в который попадает префикс timestamp."""
+        label = ""
+        if len(prefix) == self._prefix_size and prefix[10] in "T ":
+            try:
+                seconds = int(prefix[11:13]) * 3600
+                if self._prefix_size > 13:
+                    seconds += int(prefix[14:16]) * 60
+                if self._prefix_size > 16:
+                    seconds += int(prefix[17:19])
+            except ValueError:
+                pass
+            else:
+                seconds -= seconds % self.bucket
+                label = (
+                    f"{prefix[:10]}T{seconds // 3600:02d}:"
+                    f"{seconds % 3600 // 60:02d}"
+                )
+                if self.bucket % 60:
+                    label += f":{seconds % 60:02d}"
+        self._labels[prefix] = label
+        return label
+
+    def _slot(self, key: Any) -> int:
+        slot = self._state[key] = len(self._counts)
+        self._counts.append(0)
+        self._timed.append(0)
+        self._sums.append(0.0)
+        self._maxes.append(0.0)
+        return slot
+
+    def accumulate(self, log: LogRecord) -> None:
+        self.accumulate_all((log,))
+
+    def accumulate_all(self, logs: Iterable[LogRecord]) -> None:
+        self._add_rows(
+            (log.timestamp, log.url, log.response_time) for log in logs
+        )
+
+    def accumulate_batch(self, batch: LogBatch) -> None:
+        self._add_rows(zip(batch.timestamp, batch.url, batch.response_time))
+
+    def _add_rows(
+        self, rows: Iterable[tuple[str | None, str | None, float | None]]
+    ) -> None:
+        slots = self._state
+        labels = self._labels
+        size = self._prefix_size
+        by_handler = self.by_handler
+        normalize = self._normalize
+        counts, timed, sums, maxes = (
+            self._counts,
+            self._timed,
+            self._sums,
+            self._maxes,
+        )
+        for timestamp, url, value in rows:
+            if timestamp is None:
+                continue
+            prefix = timestamp[:size]
+            label = labels.get(prefix)
+            if label is None:
+                label = self._label(prefix)
+            if not label:
+                continue
+            if by_handler:
+                if url is None:
+                    continue
+                if normalize is not None:
+                    url = normalize(url)
+                key = (label, url)
+            else:
+                key = label
+            slot = slots.get(key)
+            if slot is None:
+                slot = self._slot(key)
+            counts[slot] += 1
+            if value is not None:
+                timed[slot] += 1
+                sums[slot] += value
+                if value > maxes[slot]:
+                    maxes[slot] = value
+
+    def merge(self, other_state: dict[str, list[Any]]) -> None:
+        slots = self._state
+        counts, timed, sums, maxes = (
+            self._counts,
+            self._timed,
+            self._sums,
+            self._maxes,
+        )
+        for key, count, other_timed, total, peak in zip(
+            other_state["keys"],
+            other_state["count"],
+            other_state["timed"],
+            other_state["sum"],
+            other_state["max"],
+        ):
+            if self.by_handler:
+                key = tuple(key)
+            slot = slots.get(key)
+            if slot is None:
+                slot = self._slot(key)
+            counts[slot] += count
+            timed[slot] += other_timed
+            sums[slot] += total
+            if peak > maxes[slot]:
+                maxes[slot] = peak
+
+    def finalize(self) -> tuple[tuple[Any, ...], ...]:
+        minutes = self.bucket / 60
+        rows = []
+        for key, slot in self._state.items():
+            count = self._counts[slot]
+            timed = self._timed[slot]
+            rows.append(
+                (
+                    *(key if self.by_handler else (key,)),
+                    count,
+                    round(count / minutes, 3),
+                    round(self._sums[slot] / timed, 3) if timed else None,
+                    round(self._maxes[slot], 3) if timed else None,
+                )
+            )
+        if self.by_handler:
+            rows.sort(key=lambda x: (x[0], -x[2], x[1]))
+        else:
+            rows.sort()
+        return tuple((i, *items) for i, items in enumerate(rows))
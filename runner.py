@@ -0,0 +1,120 @@
+import os
+import sys
+from typing import Any
+
+from cache import AggregateCache
+from engines import Engine, PythonEngine
+from filters import FilterPipeline
+from log_parser import LogParser
+from parallel import parallel_file_states, task_state
+from readahead import ReadAhead
+from reports.base import Report
+from reports.factory import ReportName, report_factory
+
+
+def build_report(
+    parser: LogParser,
+    report_name: ReportName,
+    pipeline: FilterPipeline,
+    workers: int = 1,
+    cache: AggregateCache | None = None,
+    engine: Engine | None = None,
+    report_options: dict[str, Any] | None = None,
+) -> Report:
+    """Строит отчет по файлам логов parser.paths.
+
+    Без кеша, воркеров и с движком по умолчанию (PythonEngine) записи
+    всех файлов лениво передаются в отчет одним потоком. Иначе состояние отчета считается по каждому файлу
+    отдельно: неизмененные файлы берутся из кеша, остальные парсятся
+    (в пуле процессов, если workers > 1) и сохраняются в кеш. Состояния
+    файлов сливаются в порядке файлов, поэтому отчет совпадает с
+    построенным одним потоком.
+    Обработка недоступных файлов такая же, как в LogParser.parse.
+    report_options - параметры отчетов (см. report_factory).
+    Если у parser задан stats, файлы всегда обрабатываются по
+    отдельности, и статистика каждого файла (в том числе из воркеров)
+    сливается в parser.stats.
+    В одном процессе следующие файлы читаются заранее, если задан
+    parser.read_ahead (см. readahead.py).
+    """
+    if engine is None:
+        engine = PythonEngine()
+    if (
+        workers == 1
+        and cache is None
+        and isinstance(engine, PythonEngine)
+        and parser.stats is None
+    ):
+        logs = pipeline.apply(parser.parse())
+        return report_factory(report_name, logs, report_options)
+
+    paths = parser.paths
+    states: list[Any] = [None] * len(paths)
+    keys: list[str | None] = [None] * len(paths)
+    pending: list[tuple[int, str, int]] = []
+    for i, path in enumerate(paths):
+        try:
+            stat = os.stat(path)
+            if cache is not None:
+                keys[i] = cache.key(
+                    path, stat, report_name, pipeline, report_options
+                )
+                states[i] = cache.get(keys[i])
+                if states[i] is not None and parser.stats is not None:
+                    parser.stats.file(path).cached = True
+        except OSError as e:
+            print(
+                f"Файл {path} не удалось прочитать, ошибка {e!r}",
+                file=sys.stderr,
+            )
+            continue
+        if states[i] is None:
+            pending.append((i, path, stat.st_size))
+
+    files = [(path, size) for _, path, size in pending]
+    if workers > 1:
+        results = parallel_file_states(
+            files,
+            parser,
+            report_name,
+            pipeline,
+            engine,
+            workers,
+            report_options=report_options,
+        )
+    else:
+        results = []
+        paths = [path for path, _ in files]
+        with ReadAhead(paths, parser.read_ahead) as read_ahead:
+            for i, path in enumerate(paths):
+                read_ahead.advance(i)
+                results.append(
+                    task_state(
+                        (path, 0, None),
+                        parser,
+                        report_name,
+                        pipeline,
+                        engine,
+                        report_options,
+                    )
+                )
+    for (i, path, _), (state, error, file_stats) in zip(pending, results):
+        if file_stats is not None:
+            parser.stats.file(path).merge(file_stats)
+        if error is not None:
+            print(error, file=sys.stderr)
+            continue
+        states[i] = state
+        if cache is not None:
+            cache.put(keys[i], state)
+
+    report = report_factory(report_name, iter([]), report_options)
+    ok_files = 0
+    for state in states:
+        if state is not None:
+            report.merge(state)
+            ok_files += 1
+    if ok_files == 0:
+        print("Все файлы не существуют либо не читаются", file=sys.stderr)
+        sys.exit(1)
+    return report
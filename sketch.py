@@ -0,0 +1,218 @@
+import heapq
+import math
+from typing import Any, Callable
+
+
+# Значения не больше этого порога попадают в отдельный нулевой счетчик
+MIN_INDEXABLE = 1e-9
+
+
+class DDSketch:
+    """Скетч DDSketch для оценки квантилей с относительной точностью.
+
+    Значение v попадает в корзину с номером ceil(log(v) / log(gamma)),
+    где gamma = (1 + accuracy) / (1 - accuracy), а в корзине хранится
+    только счетчик. Оценка квантиля (середина корзины) отличается от
+    точного значения не больше чем в accuracy раз. Кол-во корзин не
+    зависит от кол-ва значений, только от их разброса (порядка
+    log(max / min) / accuracy), и ограничено max_bins: при превышении
+    самые младшие корзины сливаются, теряя точность только на самых
+    маленьких значениях. Максимум хранится точно.
+    Скетчи с одинаковой точностью сливаются (merge) без потери
+    точности. Методы to_state и from_state переводят скетч
+    в JSON-сериализуемое состояние и обратно.
+    """
+
+    __slots__ = (
+        "accuracy",
+        "max_bins",
+        "_gamma",
+        "_inv_log_gamma",
+        "bins",
+        "zero_count",
+        "count",
+        "max",
+    )
+
+    def __init__(self, accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        self.accuracy = accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._inv_log_gamma = 1 / math.log(self._gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.max: float | None = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if self.max is None or value > self.max:
+            self.max = value
+        if value <= MIN_INDEXABLE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) * self._inv_log_gamma)
+        bins = self.bins
+        if key in bins:
+            bins[key] += 1
+        else:
+            bins[key] = 1
+            if len(bins) > self.max_bins:
+                self._collapse()
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.zero_count += other.zero_count
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        bins = self.bins
+        for key, count in other.bins.items():
+            bins[key] = bins.get(key, 0) + count
+        if len(bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q: float) -> float | None:
+        """Оценка квантиля q (от 0 до 1), None для пустого скетча."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank >= self.count - 1:
+            return self.max
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                return min(value, self.max)
+        return self.max
+
+    def _collapse(self) -> None:
+        # Сливаем младшие корзины в одну, пока корзин не станет max_bins
+        keys = sorted(self.bins)
+        extra = keys[: len(keys) - self.max_bins]
+        target = keys[len(extra)]
+        self.bins[target] += sum(self.bins.pop(key) for key in extra)
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "zero_count": self.zero_count,
+            "max": self.max,
+            "bins": [[key, count] for key, count in self.bins.items()],
+        }
+
+    @staticmethod
+    def from_state(
+        state: dict[str, Any], accuracy: float = 0.01, max_bins: int = 2048
+    ) -> "DDSketch":
+        sketch = DDSketch(accuracy, max_bins)
+        sketch.count = state["count"]
+        sketch.zero_count = state["zero_count"]
+        sketch.max = state["max"]
+        sketch.bins = {key: count for key, count in state["bins"]}
+        return sketch
+
+
+class SpaceSaving:
+    """Алгоритм Space-Saving для поиска самых частых ключей.
+
+    Отслеживает не больше capacity ключей. Запись ключа - список
+    [count, error, payload]: count - оценка кол-ва появлений ключа
+    сверху, error - на сколько count может быть завышен, payload -
+    данные, накопленные с момента, когда ключ начал отслеживаться
+    (count - error появлений). Новый ключ при заполненной структуре
+    вытесняет ключ с наименьшим count и наследует его count как error.
+    Гарантии для N добавленных ключей:
+    - count - error <= истинное кол-во <= count, а error <= N / capacity;
+    - любой ключ, который встречается больше N / capacity раз,
+      отслеживается.
+    Структуры с одинаковым capacity сливаются (merge) с теми же
+    гарантиями. Записи (entries) JSON-сериализуемы, если сериализуем
+    payload.
+    """
+
+    __slots__ = ("capacity", "entries", "_heap")
+
+    def __init__(
+        self, capacity: int, entries: dict[Any, list] | None = None
+    ) -> None:
+        self.capacity = capacity
+        self.entries: dict[Any, list] = {} if entries is None else entries
+        self._heap: list[tuple[int, Any]] = []
+        self._rebuild_heap()
+
+    def add(self, key: Any, new_payload: Callable[[], Any]) -> list:
+        """Учитывает появление ключа и возвращает его запись."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[0] += 1
+            return entry
+        if len(self.entries) < self.capacity:
+            entry = self.entries[key] = [1, 0, new_payload()]
+            heapq.heappush(self._heap, (1, key))
+            return entry
+        count = self._pop_min()
+        entry = self.entries[key] = [count + 1, count, new_payload()]
+        heapq.heappush(self._heap, (count + 1, key))
+        return entry
+
+    def merge(
+        self,
+        other_entries: dict[Any, list],
+        merge_payload: Callable[[Any, Any], Any],
+    ) -> None:
+        """Сливает записи другой структуры с тем же capacity.
+
+        Ключ, которого нет в одной из структур, мог встречаться в ней
+        не больше ее минимального count (если она заполнена), поэтому
+        этот минимум добавляется к его count и error.
+        """
+        self_min = self._min_count(self.entries)
+        other_min = self._min_count(other_entries)
+        merged: dict[Any, list] = {}
+        for key, (count, error, payload) in self.entries.items():
+            other = other_entries.get(key)
+            if other is None:
+                merged[key] = [count + other_min, error + other_min, payload]
+            else:
+                merged[key] = [
+                    count + other[0],
+                    error + other[1],
+                    merge_payload(payload, other[2]),
+                ]
+        for key, (count, error, payload) in other_entries.items():
+            if key not in merged:
+                merged[key] = [count + self_min, error + self_min, payload]
+        if len(merged) > self.capacity:
+            kept = sorted(merged, key=lambda k: -merged[k][0])
+            merged = {key: merged[key] for key in kept[: self.capacity]}
+        self.entries = merged
+        self._rebuild_heap()
+
+    def _min_count(self, entries: dict[Any, list]) -> int:
+        if len(entries) < self.capacity:
+            return 0
+        return min(entry[0] for entry in entries.values())
+
+    def _pop_min(self) -> int:
+        # В куче лежит count на момент добавления, а count растет, поэтому
+        # устаревшие элементы обновляются, пока на вершине не окажется
+        # актуальный минимум
+        heap = self._heap
+        entries = self.entries
+        while True:
+            count, key = heap[0]
+            actual = entries[key][0]
+            if actual == count:
+                heapq.heappop(heap)
+                del entries[key]
+                return count
+            heapq.heapreplace(heap, (actual, key))
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(entry[0], key) for key, entry in self.entries.items()]
+        heapq.heapify(self._heap)
@@ -0,0 +1,234 @@
+import json
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Iterable, Iterator, TextIO
+
+from engines import Engine
+from filters import FilterPipeline
+from models import LogRecord
+from reports.base import Report
+from reports.multi import MultiReport
+
+
+# Время этапов замеряется у каждой SAMPLE_EVERY-й записи и
+# масштабируется на все записи, счетчики - точные
+SAMPLE_EVERY = 16
+
+
+def _timed(items: Iterable[Any], total: list) -> Iterator[Any]:
+    """Отдает элементы items, добавляя в total [секунды, кол-во]
+    оценку времени ожидания элементов (включая все вложенные этапы).
+
+    Замеряется ожидание каждого SAMPLE_EVERY-го элемента со сдвигом
+    на половину шага: записи, на которых LogParser сам замеряет этапы,
+    дороже остальных, и выборки не должны совпадать.
+    """
+    clock = time.perf_counter
+    next_item = iter(items).__next__
+    count = sampled = 0
+    seconds = 0.0
+    try:
+        while True:
+            if (count + SAMPLE_EVERY // 2) % SAMPLE_EVERY:
+                item = next_item()
+            else:
+                start = clock()
+                item = next_item()
+                seconds += clock() - start
+                sampled += 1
+            count += 1
+            yield item
+    except StopIteration:
+        return
+    finally:
+        total[0] += seconds * count / sampled if sampled else 0.0
+        total[1] += count
+
+
+class _TimedPipeline:
+    """Пайплайн фильтров, замеряющий время и кол-во записей apply.
+
+    Остальные атрибуты берутся у исходного пайплайна.
+    """
+
+    def __init__(self, pipeline: FilterPipeline) -> None:
+        self._pipeline = pipeline
+        self.total = [0.0, 0]
+        self.applied = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pipeline, name)
+
+    def apply(self, logs: Iterator[LogRecord]) -> Iterator[LogRecord]:
+        self.applied = True
+        return _timed(self._pipeline.apply(logs), self.total)
+
+
+@dataclass(slots=True)
+class FileStats:
+    """Счетчики и время этапов обработки одного файла (или его куска).
+
+    bytes и lines - прочитанные непустые строки (bytes с переводами
+    строк), prefiltered - строки, отброшенные по подстрокам фильтров
+    без декодирования, decode_errors - испорченные строки, records -
+    декодированные записи, passed - записи, прошедшие фильтры (None,
+    если фильтры применял движок numpy: тогда их время входит в
+    aggregate). Время этапов - в секундах, cached - состояние файла
+    взято из кеша, и файл не читался.
+    """
+
+    bytes: int = 0
+    lines: int = 0
+    prefiltered: int = 0
+    decode_errors: int = 0
+    records: int = 0
+    passed: int | None = None
+    read: float = 0.0
+    decode: float = 0.0
+    from_dict: float = 0.0
+    filter: float = 0.0
+    aggregate: float = 0.0
+    cached: bool = False
+
+    def merge(self, other: "FileStats") -> None:
+        for field in fields(self):
+            name = field.name
+            value, other_value = getattr(self, name), getattr(other, name)
+            if name == "cached":
+                value = value or other_value
+            elif value is None or other_value is None:
+                value = other_value if value is None else value
+            else:
+                value += other_value
+            setattr(self, name, value)
+
+    def accumulate(
+        self,
+        engine: Engine,
+        report: Report,
+        pipeline: FilterPipeline,
+        logs: Iterator[LogRecord],
+    ) -> None:
+        """engine.accumulate с замером фильтров и агрегации.
+
+        logs должны идти из LogParser.parse_file с этим же FileStats:
+        парсер сам замеряет чтение и декодирование. Время ожидания
+        записей от фильтров (filtered) включает парсинг, а все
+        накопление - фильтры, поэтому время фильтров - разность
+        filtered и времени парсинга, а агрегации - разность всего
+        накопления и filtered.
+        """
+        parsed = self._parse_time()
+        timed_pipeline = _TimedPipeline(pipeline)
+        start = time.perf_counter()
+        engine.accumulate(report, timed_pipeline, logs)
+        total = time.perf_counter() - start
+        parsed = self._parse_time() - parsed
+        # Время оценивается по выборке записей, поэтому разности
+        # ограничены снизу нулем
+        if timed_pipeline.applied:
+            filtered = timed_pipeline.total
+            self.filter += max(filtered[0] - parsed, 0.0)
+            self.aggregate += max(total - filtered[0], 0.0)
+            self.passed = (self.passed or 0) + filtered[1]
+        else:
+            self.aggregate += max(total - parsed, 0.0)
+
+    def _parse_time(self) -> float:
+        return self.read + self.decode + self.from_dict
+
+
+class RunStats:
+    """Статистика запуска (--stats): FileStats по каждому файлу,
+    общее время, пиковая память и кол-во ключей в состоянии отчета.
+
+    Сборщик передается в LogParser, без него обработка не замеряется
+    вовсе. Воркеры возвращают FileStats своих задач, и они сливаются
+    в files (см. runner.build_report).
+    """
+
+    def __init__(self) -> None:
+        self.files: dict[str, FileStats] = {}
+        self.started = time.perf_counter()
+        self.seconds: float | None = None
+        self.peak_rss_mb: float | None = None
+        self.workers_peak_rss_mb: float | None = None
+        self.distinct_keys: dict[str, int] = {}
+
+    def file(self, path: str) -> FileStats:
+        stats = self.files.get(path)
+        if stats is None:
+            stats = self.files[path] = FileStats()
+        return stats
+
+    def total(self) -> FileStats:
+        total = FileStats()
+        for stats in self.files.values():
+            total.merge(stats)
+        return total
+
+    def finish(self, report: Report | None = None, name: str = "") -> None:
+        """Фиксирует общее время, пиковую память и ключи отчета name."""
+        self.seconds = time.perf_counter() - self.started
+        self.peak_rss_mb = _peak_rss_mb(resource.RUSAGE_SELF)
+        self.workers_peak_rss_mb = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+        if report is None:
+            return
+        reports = (
+            report.reports
+            if isinstance(report, MultiReport)
+            else {name: report}
+        )
+        self.distinct_keys = {
+            name: sub_report.size for name, sub_report in reports.items()
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "seconds": self.seconds,
+            "peak_rss_mb": self.peak_rss_mb,
+            "workers_peak_rss_mb": self.workers_peak_rss_mb,
+            "distinct_keys": self.distinct_keys,
+            "total": asdict(self.total()),
+            "files": {
+                path: asdict(stats) for path, stats in self.files.items()
+            },
+        }
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def print(self, file: TextIO | None = None) -> None:
+        """Печатает статистику таблицей (по умолчанию в std.err)."""
+        from tabulate import tabulate
+
+        file = file or sys.stderr
+        headers = ["file", *(field.name for field in fields(FileStats))]
+        rows = [[path, *_row(stats)] for path, stats in self.files.items()]
+        if len(rows) > 1:
+            rows.append(["total", *_row(self.total())])
+        print(tabulate(rows, headers=headers), file=file)
+        print(
+            f"Время: {self.seconds:.3f} с, пиковая память: "
+            f"{self.peak_rss_mb:.1f} МБ (воркеры: "
+            f"{self.workers_peak_rss_mb:.1f} МБ)",
+            file=file,
+        )
+        for name, count in self.distinct_keys.items():
+            print(f"Ключей в отчете {name}: {count}", file=file)
+
+
+def _row(stats: FileStats) -> list[Any]:
+    return [
+        round(value, 3) if isinstance(value, float) else value
+        for value in (getattr(stats, field.name) for field in fields(stats))
+    ]
+
+
+def _peak_rss_mb(who: int) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss - в КБ на Linux и в байтах на macOS
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
@@ -9,3 +9,19 @@ def patch_sys_argv(monkeypatch):
         monkeypatch.setattr(sys, "argv", args)
 
     return _patch
+
+
+@pytest.fixture
+def log_files(tmp_path):
+    f1 = tmp_path / "f1.log"
+    f1.write_text(
+        "".join(
+            f'{{"@timestamp": "2025-06-2{i % 3}T00:00:00+00:00", '
+            f'"url": "/u{i % 7}", "response_time": {i % 5 * 0.25}}}\n'
+            for i in range(200)
+        )
+        + "INVALID\n"
+    )
+    f2 = tmp_path / "f2.log"
+    f2.write_text('{"url": "/z", "response_time": 1.0}\n')
+    return [str(f1), str(f2)]
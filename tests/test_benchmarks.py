@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from benchmarks import generate
+from benchmarks.generate import generate_lines, write_log
+from benchmarks.run import (
+    STAGES,
+    compare,
+    format_results,
+    main,
+    run_stage,
+)
+
+
+def test_generate_lines():
+    lines = list(generate_lines(1000, urls=10, malformed=0.1, days=2))
+    assert lines == list(generate_lines(1000, urls=10, malformed=0.1, days=2))
+    assert lines != list(generate_lines(1000, urls=10, malformed=0.1, seed=1))
+
+    records = []
+    for line in lines:
+        assert line.endswith("\n")
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    assert 50 < 1000 - len(records) < 150
+    assert len({record["url"] for record in records}) <= 10
+    assert records[0]["@timestamp"].startswith("2025-06-22T00:00")
+    assert records[-1]["@timestamp"].startswith("2025-06-23T23:")
+
+
+def test_generate_main(tmp_path, capsys):
+    path = tmp_path / "bench.log"
+    generate.main(["--lines", "10", "--output", str(path)])
+    assert path.read_text() == "".join(generate_lines(10, malformed=0.01))
+    with pytest.raises(SystemExit):
+        generate.main(["--malformed", "2", "--output", str(path)])
+    assert "Указана некорректная доля 2" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_run_stage(tmp_path, stage):
+    path = str(tmp_path / "bench.log")
+    write_log(path, 200, malformed=0.1)
+    params = {
+        "lines": 200,
+        "start": "2025-06-22",
+        "output_format": "jsonl",
+        "decoder": "json",
+    }
+    result = run_stage(stage, path, params, repeat=2)
+    assert result["seconds"] > 0
+    assert result["lines_per_sec"] > 0
+    assert result["peak_rss_mb"] > 0
+
+
+def test_compare():
+    baseline = {
+        "stages": {
+            "read": {"lines_per_sec": 1000},
+            "decode": {"lines_per_sec": 1000},
+        }
+    }
+    results = {
+        "stages": {
+            "read": {
+                "seconds": 1,
+                "lines_per_sec": 850,
+                "peak_rss_mb": 1,
+            },
+            "decode": {
+                "seconds": 1,
+                "lines_per_sec": 950,
+                "peak_rss_mb": 1,
+            },
+            "filter": {
+                "seconds": 1,
+                "lines_per_sec": 10,
+                "peak_rss_mb": 1,
+            },
+        }
+    }
+    regressions = compare(results, baseline, 0.1)
+    assert len(regressions) == 1 and regressions[0].startswith("read")
+    table = format_results(results, baseline)
+    assert "vs baseline" in table and "0.85" in table
+
+
+def test_main(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    argv = ["--lines", "500", "--stages", "read", "--repeat", "1"]
+    main([*argv, "--output", str(output)])
+    results = json.loads(output.read_text())
+    assert results["params"]["lines"] == 500
+    assert list(results["stages"]) == ["read"]
+    assert "lines/sec" in capsys.readouterr().out
+
+    results["stages"]["read"]["lines_per_sec"] *= 1000
+    output.write_text(json.dumps(results))
+    with pytest.raises(SystemExit):
+        main([*argv, "--baseline", str(output)])
+    assert "read" in capsys.readouterr().err
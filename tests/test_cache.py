@@ -0,0 +1,65 @@
+import os
+
+from cache import AggregateCache
+from filters import FilterPipeline
+
+
+def test_get_put(tmp_path):
+    log_path = tmp_path / "1.log"
+    log_path.write_text("{}\n")
+    cache = AggregateCache(str(tmp_path / "cache"), 1024)
+    key = cache.key(
+        str(log_path), os.stat(log_path), "average", FilterPipeline()
+    )
+    assert cache.get(key) is None
+    cache.put(key, {"/a": [1, 0.5]})
+    assert cache.get(key) == {"/a": [1, 0.5]}
+
+
+def test_key(tmp_path):
+    log_path = tmp_path / "1.log"
+    log_path.write_text("{}\n")
+    stat = os.stat(log_path)
+    cache = AggregateCache(str(tmp_path / "cache"), 1024, hash_content=True)
+    pipeline = FilterPipeline()
+    key = cache.key(str(log_path), stat, "average", pipeline)
+    assert key == cache.key(str(log_path), stat, "average", pipeline)
+
+    pipeline.add_contains("timestamp", "2025-06-22")
+    assert key != cache.key(str(log_path), stat, "average", pipeline)
+    assert key != cache.key(str(log_path), stat, "other", FilterPipeline())
+
+    latency_key = cache.key(
+        str(log_path), stat, "latency", pipeline, {"accuracy": 0.01}
+    )
+    assert latency_key != cache.key(
+        str(log_path), stat, "latency", pipeline, {"accuracy": 0.05}
+    )
+    # Параметры, которые отчет не принимает, в ключ не попадают
+    assert cache.key(
+        str(log_path), stat, "average", pipeline, {"accuracy": 0.05}
+    ) == cache.key(str(log_path), stat, "average", pipeline)
+
+    log_path.write_text("{}\n{}\n")
+    new_stat = os.stat(log_path)
+    assert key != cache.key(
+        str(log_path), new_stat, "average", FilterPipeline()
+    )
+
+
+def test_eviction(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = AggregateCache(str(cache_dir), 250)
+    for i in range(5):
+        cache.put(f"key{i}", {"/a": [i, 0.5] * 10})
+        os.utime(cache_dir / f"key{i}.json", ns=(i, i))
+    assert cache.get("key0") is None
+    assert cache.get("key4") is not None
+    assert sum(p.stat().st_size for p in cache_dir.iterdir()) <= 250
+
+
+def test_broken_entry(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = AggregateCache(str(cache_dir), 1024)
+    (cache_dir / "key.json").write_text("not json")
+    assert cache.get("key") is None
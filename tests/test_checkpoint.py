@@ -0,0 +1,174 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from checkpoint import Checkpoint
+from engines import PythonEngine
+from filters import FilterPipeline
+from log_parser import LogParser
+
+
+def log_line(url, response_time=1.0):
+    return f'{{"url": "{url}", "response_time": {response_time}}}\n'
+
+
+def update(checkpoint, path):
+    report = checkpoint.update(LogParser([str(path)]), PythonEngine())
+    return report.state
+
+
+def test_reads_only_appended_lines(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a") + log_line("/b"))
+    checkpoint = Checkpoint(None, "average", FilterPipeline())
+    assert update(checkpoint, path) == {"/a": [1, 1.0], "/b": [1, 1.0]}
+
+    with open(path, "a") as file:
+        file.write(log_line("/a", 2.0))
+        # Недописанная строка читается при следующем обновлении
+        file.write('{"url": "/c", "resp')
+    assert update(checkpoint, path) == {"/a": [2, 3.0], "/b": [1, 1.0]}
+
+    with open(path, "a") as file:
+        file.write('onse_time": 1.0}\n')
+    assert update(checkpoint, path) == {
+        "/a": [2, 3.0],
+        "/b": [1, 1.0],
+        "/c": [1, 1.0],
+    }
+    assert update(checkpoint, path)["/a"] == [2, 3.0]
+
+
+def test_truncated(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a") * 3)
+    checkpoint = Checkpoint(None, "average", FilterPipeline())
+    update(checkpoint, path)
+    path.write_text(log_line("/b"))
+    assert update(checkpoint, path) == {"/a": [3, 3.0], "/b": [1, 1.0]}
+
+
+def test_rewritten(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a"))
+    checkpoint = Checkpoint(None, "average", FilterPipeline())
+    update(checkpoint, path)
+    # Файл перезаписан другим содержимым большего размера
+    with open(path, "w") as file:
+        file.write(log_line("/b") * 3)
+    assert update(checkpoint, path) == {"/a": [1, 1.0], "/b": [3, 3.0]}
+
+
+def test_rotated(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a"))
+    checkpoint = Checkpoint(None, "average", FilterPipeline())
+    update(checkpoint, path)
+    # Строка дописана перед ротацией и еще не прочитана
+    with open(path, "a") as file:
+        file.write(log_line("/b"))
+    os.rename(path, tmp_path / "access.log.1")
+    path.write_text(log_line("/c"))
+    assert update(checkpoint, path) == {
+        "/a": [1, 1.0],
+        "/b": [1, 1.0],
+        "/c": [1, 1.0],
+    }
+
+
+def test_compressed(tmp_path):
+    path = tmp_path / "access.log.1.gz"
+    path.write_bytes(gzip.compress(log_line("/a").encode()))
+    checkpoint = Checkpoint(None, "average", FilterPipeline())
+    assert update(checkpoint, path) == {"/a": [1, 1.0]}
+    assert update(checkpoint, path) == {"/a": [1, 1.0]}
+
+
+def test_save_load(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a"))
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    pipeline = FilterPipeline()
+    pipeline.add_prefix("url", "/")
+    checkpoint = Checkpoint(checkpoint_path, "average", pipeline)
+    update(checkpoint, path)
+    checkpoint.save()
+
+    with open(path, "a") as file:
+        file.write(log_line("/a"))
+    checkpoint = Checkpoint(checkpoint_path, "average", pipeline)
+    checkpoint.load()
+    assert update(checkpoint, path) == {"/a": [2, 2.0]}
+
+
+def test_load_other_filters(tmp_path, capsys):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a"))
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(checkpoint_path, "average", FilterPipeline())
+    update(checkpoint, path)
+    checkpoint.save()
+
+    pipeline = FilterPipeline()
+    pipeline.add_prefix("url", "/b")
+    checkpoint = Checkpoint(checkpoint_path, "average", pipeline)
+    checkpoint.load()
+    assert checkpoint.files == {}
+    assert "построен для другого отчета или других фильтров" in (
+        capsys.readouterr().err
+    )
+
+
+def test_load_broken(tmp_path, capsys):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    checkpoint_path.write_text("{")
+    checkpoint = Checkpoint(str(checkpoint_path), "average", FilterPipeline())
+    checkpoint.load()
+    assert checkpoint.files == {}
+    assert f"Чекпоинт {checkpoint_path} не удалось прочитать" in (
+        capsys.readouterr().err
+    )
+
+
+def test_missing_files(tmp_path, capsys):
+    checkpoint = Checkpoint(None, "average", FilterPipeline())
+    with pytest.raises(SystemExit):
+        update(checkpoint, tmp_path / "no.log")
+    assert "Все файлы не существуют либо не читаются" in (
+        capsys.readouterr().err
+    )
+
+
+def test_saved_format(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a"))
+    checkpoint_path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(str(checkpoint_path), "average", FilterPipeline())
+    update(checkpoint, path)
+    checkpoint.save()
+    data = json.loads(checkpoint_path.read_text())
+    entry = data["files"][str(path)]
+    assert entry["offset"] == len(log_line("/a"))
+    assert entry["inode"] == os.stat(path).st_ino
+    assert entry["state"] == {"/a": [1, 1.0]}
+
+
+def test_load_other_report_options(tmp_path, capsys):
+    path = tmp_path / "access.log"
+    path.write_text(log_line("/a"))
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    pipeline = FilterPipeline()
+    checkpoint = Checkpoint(
+        checkpoint_path, "latency", pipeline, {"accuracy": 0.01}
+    )
+    update(checkpoint, path)
+    checkpoint.save()
+
+    checkpoint = Checkpoint(
+        checkpoint_path, "latency", pipeline, {"accuracy": 0.05}
+    )
+    checkpoint.load()
+    assert checkpoint.files == {}
+    assert "построен для другого отчета" in capsys.readouterr().err
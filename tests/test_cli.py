@@ -1,3 +1,7 @@
+import json
+import os
+import time
+
 import pytest
 
 from main import main
@@ -83,3 +87,319 @@ def test_invalid_report(patch_sys_argv, capsys):
         main()
     captured = capsys.readouterr()
     assert "argument --report: invalid choice: 'nothing'" in captured.err
+
+
+def test_workers(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text(
+        '{"url": "/a", "response_time": "0.1"}\n'
+        '{"url": "/a", "response_time": "0.3"}\n'
+    )
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "--workers",
+            "2",
+        ]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert {"/a", "2", "0.2"}.issubset(output.split())
+
+
+def test_mmap(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text('{"url": "/a", "response_time": "0.1"}\n')
+    patch_sys_argv(
+        ["main.py", "--file", str(log_path), "--report", "average", "--mmap"]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert {"/a", "1", "0.1"}.issubset(output.split())
+
+
+def test_time_range(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text(
+        '{"@timestamp": "2025-06-22T13:59:59+00:00", '
+        '"url": "/a", "response_time": "0.1"}\n'
+        '{"@timestamp": "2025-06-22T14:30:00+00:00", '
+        '"url": "/b", "response_time": "0.3"}\n'
+    )
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "--from",
+            "2025-06-22T14:00",
+            "--to",
+            "2025-06-22T15:00",
+        ]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert "/b" in output
+    assert "/a" not in output
+
+
+def test_index(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text(
+        '{"@timestamp": "2025-06-22T13:59:59+00:00", '
+        '"url": "/a", "response_time": "0.1"}\n'
+        '{"@timestamp": "2025-06-22T14:30:00+00:00", '
+        '"url": "/b", "response_time": "0.3"}\n'
+    )
+    patch_sys_argv(["main.py", "index", "--file", str(log_path)])
+    main()
+    assert "2 интервалов" in capsys.readouterr().out
+    assert os.path.exists(f"{log_path}.tidx")
+
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "--date",
+            "2025-06-22",
+            "--from",
+            "2025-06-22T14:00",
+        ]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert "/b" in output
+    assert "/a" not in output
+
+
+def test_index_missing_file(tmp_path, patch_sys_argv, capsys):
+    patch_sys_argv(["main.py", "index", "--file", str(tmp_path / "no.log")])
+    with pytest.raises(SystemExit):
+        main()
+    assert "Все файлы не существуют либо не читаются" in (
+        capsys.readouterr().err
+    )
+
+
+def test_checkpoint(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text('{"url": "/a", "response_time": "0.1"}\n')
+    argv = [
+        "main.py",
+        "--file",
+        str(log_path),
+        "--report",
+        "average",
+        "--checkpoint",
+        str(tmp_path / "checkpoint.json"),
+    ]
+    patch_sys_argv(argv)
+    main()
+    capsys.readouterr()
+    with open(log_path, "a") as file:
+        file.write('{"url": "/a", "response_time": "0.3"}\n')
+    main()
+    output = capsys.readouterr().out
+    assert "/a" in output
+    assert "      2" in output
+    assert "0.2" in output
+
+
+def test_follow(tmp_path, patch_sys_argv, capsys, monkeypatch):
+    log_path = tmp_path / "1.log"
+    log_path.write_text('{"url": "/a", "response_time": "0.1"}\n')
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise KeyboardInterrupt
+        with open(log_path, "a") as file:
+            file.write('{"url": "/b", "response_time": "0.3"}\n')
+
+    monkeypatch.setattr(time, "sleep", sleep)
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "--follow",
+            "--interval",
+            "2",
+        ]
+    )
+    main()
+    first, second, _ = capsys.readouterr().out.split("\n\n")
+    assert "/a" in first and "/b" not in first
+    assert "/b" in second
+    assert sleeps == [2, 2]
+
+
+def test_latency(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text(
+        "".join(
+            f'{{"url": "/a", "response_time": {i / 10}}}\n'
+            for i in range(1, 11)
+        )
+    )
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "latency",
+            "--accuracy",
+            "0.001",
+        ]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert "p99" in output
+    assert "0.5" in output
+
+
+def test_top_and_normalize_urls(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text(
+        "".join(
+            f'{{"url": "/api/homeworks/{i}/", "response_time": 0.5}}\n'
+            for i in range(20)
+        )
+        + '{"url": "/api/context", "response_time": 0.1}\n'
+    )
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "--top",
+            "1",
+            "--normalize-urls",
+            "--url-rule",
+            "^/api/",
+            "/",
+        ]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert "/homeworks/{id}/" in output
+    assert "context" not in output
+
+
+def test_multiple_reports(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text('{"url": "/a", "response_time": "0.1"}\n')
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "latency",
+            "average",
+        ]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert output.count("Отчет average") == 1
+    assert "Отчет latency" in output
+    assert "avg_response_time" in output and "p99" in output
+
+
+def test_timeseries_report(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text(
+        '{"@timestamp": "2025-06-22T13:57:32+00:00", "url": "/a", '
+        '"response_time": "0.1"}\n'
+        '{"@timestamp": "2025-06-22T14:07:32+00:00", "url": "/a", '
+        '"response_time": "0.3"}\n'
+    )
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "timeseries",
+            "--bucket",
+            "1h",
+        ]
+    )
+    main()
+    output = capsys.readouterr().out
+    assert "2025-06-22T13:00" in output and "2025-06-22T14:00" in output
+    assert "handler" not in output
+
+
+def test_output_format(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text('{"url": "/a", "response_time": "0.1"}\n')
+    output_path = tmp_path / "out.csv"
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "latency",
+            "--output-format",
+            "csv",
+            "--output",
+            str(output_path),
+        ]
+    )
+    main()
+    assert capsys.readouterr().out == ""
+    average, latency = output_path.read_text().split("\n\n")
+    assert average.splitlines() == [
+        "report,index,handler,total,avg_response_time",
+        "average,0,/a,1,0.1",
+    ]
+    assert latency.startswith("report,index,handler,total,p50")
+
+
+def test_stats_and_profile(tmp_path, patch_sys_argv, capsys):
+    log_path = tmp_path / "1.log"
+    log_path.write_text('{"url": "/a", "response_time": "0.1"}\nINVALID\n')
+    stats_path = tmp_path / "stats.json"
+    profile_path = tmp_path / "run.pstats"
+    patch_sys_argv(
+        [
+            "main.py",
+            "--file",
+            str(log_path),
+            "--report",
+            "average",
+            "--stats",
+            "--stats-json",
+            str(stats_path),
+            "--profile",
+            str(profile_path),
+        ]
+    )
+    main()
+    captured = capsys.readouterr()
+    assert "/a" in captured.out
+    assert "decode_errors" in captured.err
+    assert "Ключей в отчете average: 1" in captured.err
+    stats = json.loads(stats_path.read_text())
+    assert stats["total"]["records"] == 1
+    assert stats["total"]["decode_errors"] == 1
+    assert profile_path.stat().st_size > 0
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from decoders import JsonDecoder, MsgspecDecoder, OrjsonDecoder, get_decoder
+from models import LogRecord
+
+
+LINES = [
+    {
+        "@timestamp": "2025-06-22T00:00:00+00:00",
+        "status": 200,
+        "url": "/api",
+        "request_method": "GET",
+        "response_time": 0.024,
+        "http_user_agent": "Chrome/1.0",
+        "extra": [1, 2],
+    },
+    {"url": "/api", "status": "OK", "response_time": "too_much"},
+    {"url": "/api", "status": "404", "response_time": "1.5"},
+]
+
+
+def decoder_classes():
+    classes = [JsonDecoder]
+    for module, decoder_class in (
+        ("orjson", OrjsonDecoder),
+        ("msgspec", MsgspecDecoder),
+    ):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        classes.append(decoder_class)
+    return classes
+
+
+@pytest.mark.parametrize("decoder_class", decoder_classes())
+@pytest.mark.parametrize("data", LINES, ids=["full", "bad types", "strings"])
+def test_same_as_from_dict(decoder_class, data):
+    line = json.dumps(data).encode()
+    assert decoder_class().decode(line) == LogRecord.from_dict(data)
+
+
+@pytest.mark.parametrize("decoder_class", decoder_classes())
+@pytest.mark.parametrize("line", [b"INVALID", b"[1, 2]", b'{"url": "/a"'])
+def test_errors(decoder_class, line):
+    decoder = decoder_class()
+    with pytest.raises(decoder.errors):
+        decoder.decode(line)
+
+
+def test_get_decoder():
+    assert isinstance(get_decoder("json"), JsonDecoder)
+    assert get_decoder("auto").name == decoder_classes()[-1].name
+
+
+def test_get_decoder_unavailable(monkeypatch, capsys):
+    monkeypatch.setattr("decoders.orjson", None)
+    monkeypatch.setattr("decoders.msgspec", None)
+    assert isinstance(get_decoder("auto"), JsonDecoder)
+    with pytest.raises(SystemExit):
+        get_decoder("orjson")
+    assert "Декодер orjson недоступен" in capsys.readouterr().err
@@ -0,0 +1,66 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+import decompress
+from decompress import detect_compression, read_lines
+
+
+COMPRESSORS = {
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+}
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+def test_detect_compression(tmp_path, compression):
+    path = tmp_path / "log.json.1"
+    path.write_bytes(COMPRESSORS[compression](b'{"url": "/a"}\n'))
+    assert detect_compression(str(path)) == compression
+
+
+def test_detect_plain(tmp_path):
+    path = tmp_path / "log.json"
+    path.write_text('{"url": "/a"}\n')
+    assert detect_compression(str(path)) is None
+    assert detect_compression(str(tmp_path / "no.log")) is None
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+def test_read_lines(tmp_path, monkeypatch, compression):
+    # Маленькие блоки, чтобы строки разрезались между блоками
+    monkeypatch.setattr(decompress, "READ_SIZE", 7)
+    data = b"".join(b'{"url": "/u%d"}\n' % i for i in range(100)) + b"tail"
+    path = tmp_path / "log.json.1"
+    path.write_bytes(COMPRESSORS[compression](data))
+    lines = list(read_lines(str(path), compression))
+    assert lines == data.splitlines(keepends=True)
+
+
+def test_read_lines_stop_early(tmp_path, monkeypatch):
+    monkeypatch.setattr(decompress, "READ_SIZE", 16)
+    path = tmp_path / "log.json.gz"
+    path.write_bytes(gzip.compress(b'{"url": "/a"}\n' * 10000))
+    lines = read_lines(str(path), "gzip")
+    assert next(lines) == b'{"url": "/a"}\n'
+    # Поток распаковки останавливается при закрытии генератора
+    lines.close()
+
+
+def test_read_lines_broken(tmp_path):
+    path = tmp_path / "log.json.gz"
+    path.write_bytes(gzip.compress(b'{"url": "/a"}\n' * 100)[:-10])
+    with pytest.raises(EOFError):
+        list(read_lines(str(path), "gzip"))
+
+
+def test_zstd_unavailable(tmp_path, monkeypatch):
+    monkeypatch.setattr(decompress, "zstandard", None)
+    path = tmp_path / "log.json.zst"
+    path.write_bytes(b"\x28\xb5\x2f\xfd" + b"\x00" * 10)
+    assert detect_compression(str(path)) == "zstd"
+    with pytest.raises(OSError):
+        list(read_lines(str(path), "zstd"))
@@ -0,0 +1,106 @@
+import pytest
+
+from engines import NumpyEngine, PythonEngine, get_engine
+from filters import FilterPipeline
+from models import LogRecord
+from reports.base import Report
+from reports.factory import report_factory
+
+
+LOGS = [
+    LogRecord(url="/a", response_time=0.1, timestamp="2025-06-22T01"),
+    LogRecord(url="/b", response_time=0.2, timestamp="2025-06-22T02"),
+    LogRecord(url=None, response_time=0.3, timestamp="2025-06-22T03"),
+    LogRecord(url="/c", response_time=None, timestamp="2025-06-22T04"),
+    LogRecord(url="/b", response_time=0.7, timestamp="2025-06-21T05"),
+    LogRecord(url="/d", response_time=0.3, timestamp="2025-06-22T06"),
+    LogRecord(url="/a", response_time=0.2, timestamp="2025-06-22T07"),
+    LogRecord(url="/b", response_time=0.1, timestamp=None),
+] * 3
+
+
+class ListReport(Report):
+    def _new_state(self):
+        return []
+
+    def accumulate(self, log):
+        self._state.append(log)
+
+    def merge(self, other_state):
+        self._state.extend(other_state)
+
+    def finalize(self):
+        return ()
+
+
+@pytest.fixture(params=[[], [("contains", "timestamp", "2025-06-22")]])
+def pipeline(request):
+    pipeline = FilterPipeline()
+    for _, key, value in request.param:
+        pipeline.add_contains(key, value)
+    return pipeline
+
+
+def run(engine, report, pipeline):
+    # Первая часть накапливается отдельно, чтобы проверить
+    # слияние с уже накопленным состоянием
+    engine.accumulate(report, pipeline, iter(LOGS[:5]))
+    engine.accumulate(report, pipeline, iter(LOGS[5:]))
+    return report
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+def test_numpy_same_as_python(pipeline, batch_size):
+    pytest.importorskip("numpy")
+    expected = run(
+        PythonEngine(), report_factory("average", iter([])), pipeline
+    )
+    result = run(
+        NumpyEngine(batch_size), report_factory("average", iter([])), pipeline
+    )
+    assert result.state == expected.state
+    assert list(result.state) == list(expected.state)
+    assert result.finalize() == expected.finalize()
+
+
+@pytest.mark.parametrize(
+    "options", [{"top": 1}, {"url_rules": [("/[ab]", "/x")]}]
+)
+def test_numpy_average_options(pipeline, options):
+    pytest.importorskip("numpy")
+    expected = run(
+        PythonEngine(), report_factory("average", iter([]), options), pipeline
+    )
+    result = run(
+        NumpyEngine(4), report_factory("average", iter([]), options), pipeline
+    )
+    assert result.state == expected.state
+
+
+@pytest.mark.parametrize(
+    "options", [{}, {"top": 2}], ids=["vectorized", "record-wise"]
+)
+def test_numpy_multi_report(pipeline, options):
+    pytest.importorskip("numpy")
+    names = ["average", "latency"]
+    expected = run(
+        PythonEngine(), report_factory(names, iter([]), options), pipeline
+    )
+    result = run(
+        NumpyEngine(4), report_factory(names, iter([]), options), pipeline
+    )
+    assert result.state == expected.state
+
+
+def test_numpy_generic_report(pipeline):
+    pytest.importorskip("numpy")
+    expected = run(PythonEngine(), ListReport(iter([])), pipeline)
+    result = run(NumpyEngine(4), ListReport(iter([])), pipeline)
+    assert result.state == expected.state
+
+
+def test_get_engine(monkeypatch, capsys):
+    assert isinstance(get_engine("python"), PythonEngine)
+    monkeypatch.setattr("engines.np", None)
+    assert isinstance(get_engine("numpy"), PythonEngine)
+    assert "NumPy не установлен" in capsys.readouterr().err
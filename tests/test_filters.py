@@ -1,5 +1,9 @@
-from filters import FilterPipeline
-from models import LogRecord
+import pickle
+
+import pytest
+
+from filters import FilterPipeline, TimeRangeCheck
+from models import LogBatch, LogRecord
 
 
 def test_filter_pipeline():
@@ -19,3 +23,177 @@ def test_filter_pipeline():
     assert list(filtered_logs) == [
         LogRecord(url="/a", timestamp="2025-06-11T00:00:00+00:00")
     ]
+
+
+def test_describe():
+    pipeline = FilterPipeline()
+    pipeline.add_equal("url", "/a")
+    pipeline.add_contains("timestamp", "2025-06-11")
+    assert pipeline.describe() == [
+        ("equal", "url", "/a"),
+        ("contains", "timestamp", "2025-06-11"),
+    ]
+
+
+def test_raw_needles():
+    pipeline = FilterPipeline()
+    pipeline.add_contains("timestamp", "2025-06-11")
+    pipeline.add_equal("status", 200)
+    pipeline.add_equal("url", "/a")
+    pipeline.add_contains("http_user_agent", "Мобильный")
+    pipeline.add_contains("http_user_agent", "")
+    pipeline.add_prefix("request_method", "GE")
+    pipeline.add_regex("request_method", "GET")
+    assert pipeline.raw_needles() == (b"2025-06-11", b"GE")
+
+
+def test_apply_batch():
+    logs = [
+        LogRecord(url="/a", timestamp="2025-06-11T00:00:00+00:00"),
+        LogRecord(url="/a", timestamp="2025-06-22T00:00:00+00:00"),
+        LogRecord(url="/a", timestamp=None),
+        LogRecord(url="/b", timestamp="2025-06-11T00:00:00+00:00"),
+        LogRecord(url="/a", timestamp="2025-06-11T10:00:00+00:00"),
+    ]
+    pipeline = FilterPipeline()
+    pipeline.add_equal("url", "/a")
+    pipeline.add_contains("timestamp", "2025-06-11")
+    filtered = pipeline.apply_batch(LogBatch.from_records(logs))
+    assert list(filtered) == list(pipeline.apply(iter(logs)))
+
+
+def test_apply_batch_float_column():
+    logs = [LogRecord(response_time=1.0), LogRecord(response_time=None)]
+    batch = LogBatch.from_records(logs)
+    pipeline = FilterPipeline()
+    assert pipeline.apply_batch(batch) is batch
+    pipeline.add_equal("response_time", None)
+    assert list(pipeline.apply_batch(batch)) == [logs[1]]
+
+
+LOGS = [
+    LogRecord(url="/api/a", status=200, response_time=0.1, timestamp="t1"),
+    LogRecord(url="/api/b", status=404, response_time=0.5, timestamp="t2"),
+    LogRecord(url="/static/c", status=200, response_time=None),
+    LogRecord(url=None, status=None, response_time=2.0, timestamp="t3"),
+    LogRecord(url="/api/12/d", status=500, response_time=1.0),
+]
+
+
+@pytest.mark.parametrize(
+    "add, args, expected",
+    [
+        ("add_prefix", ("url", "/api"), [0, 1, 4]),
+        ("add_in", ("status", [200, 500]), [0, 2, 4]),
+        ("add_range", ("response_time", 0.5, 1.0), [1, 4]),
+        ("add_range", ("response_time", None, 0.5), [0, 1]),
+        ("add_range", ("response_time", 1.0), [3, 4]),
+        ("add_regex", ("url", r"/\d+/"), [4]),
+    ],
+)
+def test_typed_filters(add, args, expected):
+    pipeline = FilterPipeline()
+    getattr(pipeline, add)(*args)
+    assert list(pipeline.apply(iter(LOGS))) == [LOGS[i] for i in expected]
+    batch = LogBatch.from_records(LOGS)
+    assert list(pipeline.apply_batch(batch)) == [LOGS[i] for i in expected]
+
+
+def test_combined_filters_order():
+    pipeline = FilterPipeline()
+    pipeline.add_regex("url", "a|b")
+    pipeline.add_contains("url", "api")
+    pipeline.add_contains("url", "/api/")
+    pipeline.add_range("response_time", 0.1)
+    pipeline.add_equal("status", 200)
+    assert [kind for kind, _, _ in pipeline._ordered_specs()] == [
+        "equal",
+        "range",
+        "contains",
+        "contains",
+        "regex",
+    ]
+    assert pipeline._ordered_specs()[2][2] == "/api/"
+    assert list(pipeline.apply(iter(LOGS))) == [LOGS[0]]
+
+
+def test_empty_pipeline():
+    assert list(FilterPipeline().apply(iter(LOGS))) == LOGS
+
+
+def test_unknown_key():
+    with pytest.raises(ValueError):
+        FilterPipeline().add_equal("log.url or True", 1)
+
+
+def test_pickle():
+    pipeline = FilterPipeline()
+    pipeline.add_prefix("url", "/api")
+    list(pipeline.apply(iter(LOGS)))
+    restored = pickle.loads(pickle.dumps(pipeline))
+    assert restored.describe() == pipeline.describe()
+    assert list(restored.apply(iter(LOGS))) == [LOGS[0], LOGS[1], LOGS[4]]
+
+
+# 2025-06-22T14:00:00+00:00 и 2025-06-22T15:00:00+00:00
+HOUR_START, HOUR_END = 1750600800.0, 1750604400.0
+
+
+@pytest.mark.parametrize(
+    "value, expectation",
+    [
+        ("2025-06-22T14:00:00+00:00", True),
+        ("2025-06-22T14:59:59+00:00", True),
+        ("2025-06-22T15:00:00+00:00", False),
+        ("2025-06-22T13:59:59+00:00", False),
+        ("2025-06-22T17:30:00+03:00", True),
+        ("2025-06-22T09:30:00-05:00", True),
+        ("2025-06-22T14:30:00.123+00:00", True),
+        ("2025-06-22T14:30:00Z", True),
+        ("2025-06-22T14:30:00", True),
+        ("2025-06-22T14:30:00+99:99", False),
+        ("garbage", False),
+        (None, False),
+    ],
+)
+def test_time_range_check(value, expectation):
+    assert TimeRangeCheck(HOUR_START, HOUR_END)(value) is expectation
+
+
+def test_time_range_check_open_bounds():
+    assert TimeRangeCheck(None, HOUR_END)("2000-01-01T00:00:00+00:00")
+    assert TimeRangeCheck(HOUR_START + 0.5, None)("2025-06-22T14:00:01+00:00")
+    assert not TimeRangeCheck(HOUR_START + 0.5, None)(
+        "2025-06-22T14:00:00+00:00"
+    )
+
+
+def test_add_time_range():
+    logs = [
+        LogRecord(url="/a", timestamp="2025-06-22T13:59:59+00:00"),
+        LogRecord(url="/b", timestamp="2025-06-22T14:10:00+00:00"),
+        LogRecord(url="/c", timestamp=None),
+    ]
+    pipeline = FilterPipeline()
+    pipeline.add_time_range(HOUR_START, HOUR_END)
+    assert list(pipeline.apply(iter(logs))) == [logs[1]]
+    batch = LogBatch.from_records(logs)
+    assert list(pipeline.apply_batch(batch)) == [logs[1]]
+
+
+def test_time_upper_bound():
+    pipeline = FilterPipeline()
+    assert pipeline.time_upper_bound() is None
+    pipeline.add_time_range(HOUR_START)
+    assert pipeline.time_upper_bound() is None
+    pipeline.add_time_range(None, HOUR_END)
+    pipeline.add_time_range(None, HOUR_END + 10)
+    assert pipeline.time_upper_bound() == HOUR_END
+
+
+def test_time_lower_bound():
+    pipeline = FilterPipeline()
+    assert pipeline.time_lower_bound() is None
+    pipeline.add_time_range(HOUR_START, HOUR_END)
+    pipeline.add_time_range(HOUR_START + 10)
+    assert pipeline.time_lower_bound() == HOUR_START + 10
@@ -1,7 +1,11 @@
+import bz2
+import gzip
+
 import pytest
 
 from log_parser import LogParser
 from models import LogRecord
+from time_index import TimeIndex
 
 
 @pytest.mark.parametrize(
@@ -36,6 +40,14 @@ def test_invalid_line(tmp_path, capsys):
     assert "Не удалось спарсить строку: 'INVALID'" in captured.err
 
 
+def test_not_object_line(tmp_path, capsys):
+    log_path = tmp_path / "log.json"
+    log_path.write_text('[1, 2]\n{"url": "/home"}\n')
+    logs = list(LogParser([str(log_path)]).parse())
+    assert logs == [LogRecord(url="/home")]
+    assert "Не удалось спарсить строку: '[1, 2]'" in capsys.readouterr().err
+
+
 def test_no_file(capsys):
     with pytest.raises(SystemExit):
         parser = LogParser(["nonexistent_file.log"])
@@ -67,3 +79,122 @@ def test_one_bad_file(tmp_path, capsys):
     assert logs == [LogRecord(url="/a", response_time=0.1)]
     captured = capsys.readouterr()
     assert "Файл nonexistent.log не удалось прочитать" in captured.err
+
+
+def test_byte_range(tmp_path):
+    log_path = tmp_path / "log.json"
+    log_path.write_text('{"url": "/a"}\n{"url": "/b"}\n{"url": "/c"}\n')
+    # Диапазон начинается в середине первой строки и заканчивается
+    # в середине второй - в него попадает только вторая строка
+    logs = list(LogParser([]).parse_file(str(log_path), 5, 20))
+    assert logs == [LogRecord(url="/b")]
+
+
+def test_needles(tmp_path, capsys):
+    log_path = tmp_path / "log.json"
+    log_path.write_text(
+        '{"@timestamp": "2025-06-22T00:00:00+00:00", "url": "/a"}\n'
+        '{"@timestamp": "2025-06-21T00:00:00+00:00", "url": "/b"}\n'
+        "INVALID\n"
+    )
+    parser = LogParser([str(log_path)], needles=(b"2025-06-22",))
+    logs = list(parser.parse())
+    assert logs == [LogRecord(url="/a", timestamp="2025-06-22T00:00:00+00:00")]
+    # Строки без подстроки даже не декодируются
+    assert capsys.readouterr().err == ""
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [(0, None), (0, 14), (13, 15), (14, 40), (27, None), (100, None)],
+)
+@pytest.mark.parametrize("needles", [(), (b"/b",)])
+def test_mmap_same_as_buffered(tmp_path, start, end, needles):
+    log_path = tmp_path / "log.json"
+    log_path.write_bytes(
+        b'{"url": "/a"}\n\n{"url": "/b"}\r\n  \n{"url": "/b", "x": 1}'
+    )
+    buffered = LogParser([], needles).parse_file(str(log_path), start, end)
+    mapped = LogParser([], needles, use_mmap=True).parse_file(
+        str(log_path), start, end
+    )
+    assert list(mapped) == list(buffered)
+
+
+@pytest.mark.parametrize("start, end", [(0, None), (13, 15), (14, 40)])
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_compressed_same_as_plain(tmp_path, start, end, use_mmap):
+    data = b'{"url": "/a"}\n\n{"url": "/b"}\r\n  \n{"url": "/b", "x": 1}'
+    plain_path = tmp_path / "log.json"
+    plain_path.write_bytes(data)
+    gzip_path = tmp_path / "log.json.gz"
+    gzip_path.write_bytes(gzip.compress(data))
+    parser = LogParser([], use_mmap=use_mmap)
+    plain = parser.parse_file(str(plain_path), start, end)
+    compressed = parser.parse_file(str(gzip_path), start, end)
+    assert list(compressed) == list(plain)
+
+
+def test_compressed_invalid_line(tmp_path, capsys):
+    log_path = tmp_path / "log.json.bz2"
+    log_path.write_bytes(bz2.compress(b'INVALID\n{"url": "/a"}\n'))
+    assert list(LogParser([str(log_path)]).parse()) == [LogRecord(url="/a")]
+    assert "Не удалось спарсить строку: 'INVALID'" in capsys.readouterr().err
+
+
+def test_mmap_empty_file(tmp_path):
+    log_path = tmp_path / "log.json"
+    log_path.write_text("")
+    parser = LogParser([str(log_path)], use_mmap=True)
+    assert list(parser.parse()) == []
+
+
+def test_mmap_invalid_line(tmp_path, capsys):
+    log_path = tmp_path / "log.json"
+    log_path.write_text('{"url": "/home"}\nINVALID\n')
+    parser = LogParser([str(log_path)], use_mmap=True)
+    assert list(parser.parse()) == [LogRecord(url="/home")]
+    assert "Не удалось спарсить строку: 'INVALID'" in capsys.readouterr().err
+
+
+def test_time_limit(tmp_path, capsys):
+    log_path = tmp_path / "log.json"
+    lines = [
+        f'{{"@timestamp": "2025-06-22T14:{minute:02}:00+00:00"}}\n'
+        for minute in range(60)
+    ]
+    log_path.write_text("".join(lines) + "INVALID\n")
+    parser = LogParser([str(log_path)], time_limit=1750600800.0)
+    parser.TIME_SLACK = 600
+    parser.TIME_CHECK_EVERY = 4
+    logs = list(parser.parse())
+    # Каждая четвертая запись проверяется, первая проверенная позже
+    # 14:10 (14:11) останавливает чтение, до невалидной строки дело
+    # не доходит
+    assert logs[-1].timestamp == "2025-06-22T14:10:00+00:00"
+    assert capsys.readouterr().err == ""
+
+
+def test_time_index(tmp_path, capsys):
+    log_path = tmp_path / "log.json"
+    lines = [
+        f'{{"@timestamp": "2025-06-22T{hour:02}:00:00+00:00"}}\n'
+        for hour in range(24)
+    ]
+    # Невалидные строки до и после нужного периода не читаются
+    log_path.write_text("INVALID\n" + "".join(lines) + "INVALID\n")
+    index = TimeIndex(str(log_path))
+    index.update()
+    index.save()
+    # 10:00 и 12:00
+    parser = LogParser(
+        [str(log_path)], time_start=1750586400.0, time_limit=1750593600.0
+    )
+    parser.TIME_SLACK = 0
+    assert [log.timestamp for log in parser.parse()] == [
+        "2025-06-22T10:00:00+00:00",
+        "2025-06-22T11:00:00+00:00",
+    ]
+    assert capsys.readouterr().err == ""
+    # Кусок файла вне периода пустой
+    assert list(parser.parse_file(str(log_path), 0, 20)) == []
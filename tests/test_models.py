@@ -1,6 +1,6 @@
 import pytest
 
-from models import LogRecord
+from models import LogBatch, LogRecord
 
 
 @pytest.mark.parametrize(
@@ -66,3 +66,42 @@ from models import LogRecord
 )
 def test_from_dict(data, expectation):
     assert LogRecord.from_dict(data) == expectation
+
+
+LOGS = [
+    LogRecord(url="/a", status=200, response_time=0.5, timestamp="t1"),
+    LogRecord(url="/b", status=None, response_time=None),
+    LogRecord(url="/a", status=True, response_time=float("inf")),
+    LogRecord(url=1, status=1, response_time=0.0, request_method="GET"),
+]
+
+
+def test_log_record_slots():
+    assert not hasattr(LogRecord(), "__dict__")
+
+
+def test_log_batch_round_trip():
+    batch = LogBatch.from_records(LOGS)
+    assert len(batch) == 4
+    assert list(batch) == LOGS
+    assert [batch.record(i) for i in range(4)] == LOGS
+    # Повторяющиеся значения хранятся один раз, 1 и True не склеиваются
+    assert batch.url.values == ["/a", "/b", 1]
+    assert list(batch.url.codes) == [0, 1, 0, 2]
+    assert [type(status) for status in batch.status] == [
+        int,
+        type(None),
+        bool,
+        int,
+    ]
+
+
+def test_log_batch_take():
+    batch = LogBatch.from_records(LOGS)
+    assert list(batch.take([3, 1])) == [LOGS[3], LOGS[1]]
+
+
+def test_log_batch_batches():
+    batches = list(LogBatch.batches(iter(LOGS), 3))
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert [log for batch in batches for log in batch] == LOGS
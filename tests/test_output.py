@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import sys
+
+import pytest
+
+from output import (
+    CsvWriter,
+    JsonLinesWriter,
+    TableWriter,
+    open_writer,
+    validate_output,
+)
+
+
+HEADERS = ("", "handler", "total", "avg_response_time")
+ROWS = ((0, "/a", 2, 0.5), (1, "/б", 1, None))
+
+
+def test_table_writer():
+    file = io.StringIO()
+    writer = TableWriter(file)
+    writer.write(HEADERS, ROWS)
+    writer.write(("", "x"), ((0, 1),), "other")
+    first, second = file.getvalue().split("\n\n")
+    assert {"handler", "/a", "/б", "0.5"}.issubset(first.split())
+    assert second.startswith("Отчет other\n")
+
+
+def test_json_lines_writer():
+    file = io.StringIO()
+    writer = JsonLinesWriter(file)
+    writer.write(HEADERS, iter(ROWS))
+    writer.write(("", "x"), ((0, 1),), "other")
+    lines = file.getvalue().splitlines()
+    assert "/б" in lines[1]
+    assert [json.loads(line) for line in lines] == [
+        {"index": 0, "handler": "/a", "total": 2, "avg_response_time": 0.5},
+        {"index": 1, "handler": "/б", "total": 1, "avg_response_time": None},
+        {"report": "other", "index": 0, "x": 1},
+    ]
+
+
+def test_csv_writer():
+    file = io.StringIO()
+    writer = CsvWriter(file)
+    writer.write(HEADERS, iter(ROWS))
+    writer.write(("", "x"), ((0, 1),), "other")
+    first, second = file.getvalue().split("\n\n")
+    assert list(csv.reader(io.StringIO(first))) == [
+        ["index", "handler", "total", "avg_response_time"],
+        ["0", "/a", "2", "0.5"],
+        ["1", "/б", "1", ""],
+    ]
+    assert second == "report,index,x\nother,0,1\n"
+
+
+def test_open_writer(tmp_path, capsys):
+    with open_writer() as writer:
+        writer.write(HEADERS, ROWS)
+    assert "handler" in capsys.readouterr().out
+
+    path = tmp_path / "out.jsonl"
+    path.write_text("old\n")
+    with open_writer("jsonl", str(path)) as writer:
+        writer.write(HEADERS, ROWS)
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+@pytest.mark.parametrize("output_format", ["arrow", "parquet"])
+def test_arrow_writer(tmp_path, output_format):
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / f"out.{output_format}"
+    validate_output(output_format, str(path))
+    with open_writer(output_format, str(path)) as writer:
+        writer.write(HEADERS, ROWS)
+        writer.write(("", "x"), ((0, 1),), "other")
+    if output_format == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(str(path)).read_all()
+    assert table.column("avg_response_time").to_pylist() == [0.5, None]
+    assert (tmp_path / f"out.other.{output_format}").exists()
+
+
+def test_validate_output(capsys):
+    validate_output("csv", None)
+    with pytest.raises(SystemExit):
+        validate_output("parquet", None)
+    assert "--output" in capsys.readouterr().err
+
+
+def test_validate_output_without_pyarrow(monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(SystemExit):
+        validate_output("arrow", "out.arrow")
+    assert "pyarrow" in capsys.readouterr().err
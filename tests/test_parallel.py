@@ -0,0 +1,80 @@
+import gzip
+
+from engines import PythonEngine
+from filters import FilterPipeline
+from log_parser import LogParser
+from parallel import parallel_file_states, plan_tasks, task_state
+from stats import RunStats
+
+
+def test_plan_tasks():
+    tasks = plan_tasks([("a.log", 2500), ("b.log", 10)], 1000)
+    assert tasks == [
+        (0, ("a.log", 0, 1000)),
+        (0, ("a.log", 1000, 2000)),
+        (0, ("a.log", 2000, None)),
+        (1, ("b.log", 0, None)),
+    ]
+
+
+def test_plan_tasks_compressed(tmp_path):
+    path = tmp_path / "a.log.gz"
+    path.write_bytes(gzip.compress(b"x" * 5000))
+    assert plan_tasks([(str(path), 2500)], 1000) == [(0, (str(path), 0, None))]
+
+
+def test_ranges_cover_every_line_once(log_files):
+    files = [(path, len(open(path).read())) for path in log_files]
+    logs = [
+        log
+        for _, (path, start, end) in plan_tasks(files, 100)
+        for log in LogParser([]).parse_file(path, start, end)
+    ]
+    assert logs == list(LogParser(log_files).parse())
+
+
+def test_parallel_file_states_same_as_serial(log_files):
+    pipeline = FilterPipeline()
+    pipeline.add_contains("timestamp", "2025-06-21")
+    files = [(path, len(open(path).read())) for path in log_files]
+
+    results = parallel_file_states(
+        files, LogParser([]), "average", pipeline, PythonEngine(), 2, 500
+    )
+    assert results == [
+        task_state(
+            (path, 0, None), LogParser([]), "average", pipeline, PythonEngine()
+        )
+        for path in log_files
+    ]
+
+
+def test_task_state_error():
+    state, error, stats = task_state(
+        ("nonexistent.log", 0, None),
+        LogParser([]),
+        "average",
+        FilterPipeline(),
+        PythonEngine(),
+    )
+    assert state is None and stats is None
+    assert "Файл nonexistent.log не удалось прочитать" in error
+
+
+def test_parallel_file_states_stats(log_files):
+    pipeline = FilterPipeline()
+    pipeline.add_contains("timestamp", "2025-06-21")
+    files = [(path, len(open(path).read())) for path in log_files]
+    parser = LogParser([], pipeline.raw_needles(), stats=RunStats())
+
+    results = parallel_file_states(
+        files, parser, "average", pipeline, PythonEngine(), 2, 100
+    )
+    counters = ("bytes", "lines", "prefiltered", "records", "passed")
+    for path, (_, _, stats) in zip(log_files, results):
+        _, _, serial = task_state(
+            (path, 0, None), parser, "average", pipeline, PythonEngine()
+        )
+        for counter in counters:
+            assert getattr(stats, counter) == getattr(serial, counter)
+        assert stats.lines > 0
@@ -0,0 +1,46 @@
+import readahead
+from log_parser import LogParser
+from readahead import ReadAhead
+
+
+def test_prefetch_reads_limit(tmp_path):
+    path = tmp_path / "1.log"
+    path.write_bytes(b"x" * 3000)
+    paths = [str(path), str(path)]
+    with ReadAhead(paths, files=1, limit=1000) as read_ahead:
+        assert read_ahead._prefetch(str(path)) == 1000
+        assert read_ahead._prefetch(str(tmp_path / "missing.log")) == 0
+
+
+def test_advance_submits_next_files(tmp_path, monkeypatch):
+    paths = [str(tmp_path / f"{i}.log") for i in range(5)]
+    prefetched = []
+    monkeypatch.setattr(
+        ReadAhead, "_prefetch", lambda self, path: prefetched.append(path)
+    )
+    with ReadAhead(paths, files=2) as read_ahead:
+        read_ahead.advance(0)
+        read_ahead.advance(1)
+        read_ahead.advance(4)
+    assert prefetched == paths[1:]
+
+
+def test_disabled(tmp_path):
+    read_ahead = ReadAhead([str(tmp_path / "1.log"), "2.log"], files=0)
+    read_ahead.advance(0)
+    read_ahead.close()
+    assert read_ahead._executor is None
+
+
+def test_parse_with_read_ahead(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(readahead, "BLOCK_SIZE", 16)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"{i}.log"
+        path.write_text(f'{{"url": "/{i}", "response_time": 0.1}}\n' * 50)
+        paths.append(str(path))
+    paths.insert(1, str(tmp_path / "missing.log"))
+    parser = LogParser(paths, read_ahead=2)
+    urls = [log.url for log in parser.parse()]
+    assert urls == ["/0"] * 50 + ["/1"] * 50 + ["/2"] * 50
+    assert "missing.log" in capsys.readouterr().err
@@ -1,4 +1,6 @@
-from models import LogRecord
+import json
+
+from models import LogBatch, LogRecord
 from reports.average import AverageReport
 
 
@@ -18,3 +20,87 @@ def test_average_report_generate():
     assert len(result) == 2
     assert result[0] == (0, "/a", 2, 1.5)
     assert result[1] == (1, "/b", 1, 3.0)
+
+
+def test_average_report_merge():
+    report = AverageReport(iter([LogRecord(url="/a", response_time=1.0)]))
+    report.merge({"/b": [3, 3.0], "/a": [1, 2.0]})
+    assert report._generate() == ((0, "/b", 3, 1.0), (1, "/a", 2, 1.5))
+
+
+def test_average_report_state_is_mergeable():
+    logs = [
+        LogRecord(url="/a", response_time=1.0),
+        LogRecord(url="/b", response_time=2.0),
+        LogRecord(url="/a", response_time=3.0),
+    ]
+    whole = AverageReport(iter(logs))
+    whole.accumulate_all(whole._logs)
+
+    first = AverageReport(iter([]))
+    first.accumulate(logs[0])
+    second = AverageReport(iter([]))
+    second.accumulate_all(logs[1:])
+    # Состояние переживает сериализацию
+    second_state = json.loads(json.dumps(second.state))
+
+    merged = AverageReport(iter([]))
+    merged.merge(first.state)
+    merged.merge(second_state)
+    assert merged.finalize() == whole.finalize()
+
+
+def test_average_report_accumulate_batch():
+    logs = [
+        LogRecord(url="/a", response_time=1.0),
+        LogRecord(url="/b", response_time=None),
+        LogRecord(url=None, response_time=5.0),
+        LogRecord(url="/b", response_time=3.0),
+        LogRecord(url="/a", response_time=2.0),
+    ]
+    expected = AverageReport(iter(logs))
+    expected.accumulate_all(logs)
+    report = AverageReport(iter([]))
+    report.accumulate_batch(LogBatch.from_records(logs))
+    assert report.state == expected.state
+    assert list(report.state) == ["/a", "/b"]
+
+
+def test_average_report_url_rules():
+    logs = [
+        LogRecord(url="/a/1/", response_time=1.0),
+        LogRecord(url="/a/2/", response_time=2.0),
+        LogRecord(url="/b", response_time=4.0),
+    ]
+    report = AverageReport(iter(logs), url_rules=[(r"\d+", "{id}")])
+    assert report._generate() == ((0, "/a/{id}/", 2, 1.5), (1, "/b", 1, 4.0))
+    batch_report = AverageReport(iter([]), url_rules=[(r"\d+", "{id}")])
+    batch_report.accumulate_batch(LogBatch.from_records(logs))
+    assert batch_report.state == report.state
+
+
+def test_average_report_top():
+    logs = [LogRecord(url="/a", response_time=1.0)] * 50
+    logs += [LogRecord(url="/b", response_time=3.0)] * 30
+    logs += [LogRecord(url=f"/r{i}", response_time=9.0) for i in range(40)]
+    report = AverageReport(iter(logs), top=2)
+    result = report._generate()
+    assert len(report.state) == 20
+    assert result[0] == (0, "/a", 50, 1.0)
+    assert result[1][:2] == (1, "/b")
+    assert 30 <= result[1][2] <= 30 + len(logs) / 20
+    assert result[1][3] == 3.0
+
+
+def test_average_report_top_merge():
+    logs = [LogRecord(url="/a", response_time=1.0)] * 10
+    logs += [LogRecord(url=f"/r{i}", response_time=2.0) for i in range(30)]
+    first = AverageReport(iter([]), top=1)
+    first.accumulate_all(logs[::2])
+    second = AverageReport(iter([]), top=1)
+    second.accumulate_all(logs[1::2])
+    merged = AverageReport(iter([]), top=1)
+    merged.merge(json.loads(json.dumps(first.state)))
+    merged.merge(json.loads(json.dumps(second.state)))
+    assert len(merged.state) == 10
+    assert merged.finalize() == ((0, "/a", 10, 1.0),)
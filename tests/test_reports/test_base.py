@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+from models import LogBatch, LogRecord
 from reports.base import Report
 
 
@@ -7,8 +8,17 @@ class DummyReport(Report):
     def __init__(self, logs):
         super().__init__(logs, headers=("h1", "h2"))
 
-    def _generate(self):
-        return (1, 2), (3, 4)
+    def _new_state(self):
+        return []
+
+    def accumulate(self, log):
+        self._state.append(log)
+
+    def merge(self, other_state):
+        self._state.extend(other_state)
+
+    def finalize(self):
+        return tuple((i, log) for i, log in enumerate(self._state))
 
 
 def test_report(capsys):
@@ -27,3 +37,16 @@ def test_report(capsys):
     out2 = capsys.readouterr().out
     assert out2 == out1
     mock_generate.assert_called_once()
+
+
+def test_report_accumulate_batch():
+    logs = [LogRecord(url="/a"), LogRecord(url="/b")]
+    report = DummyReport(iter([]))
+    report.accumulate_batch(LogBatch.from_records(logs))
+    assert report.state == logs
+
+
+def test_report_generate():
+    report = DummyReport(iter(["a", "b"]))
+    report.merge(["c"])
+    assert report._generate() == ((0, "c"), (1, "a"), (2, "b"))
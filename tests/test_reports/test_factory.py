@@ -1,7 +1,9 @@
 import pytest
 
 from reports.average import AverageReport
-from reports.factory import report_factory
+from reports.factory import accepted_options, report_factory
+from reports.latency import LatencyReport
+from reports.multi import MultiReport
 
 
 def test_report_factory_success():
@@ -13,3 +15,39 @@ def test_report_factory_fail(capsys):
         report_factory("unknown", iter([]))
     err = capsys.readouterr().err
     assert "Неизвестный тип отчета: unknown" in err
+
+
+def test_report_factory_options():
+    report = report_factory("latency", iter([]), {"accuracy": 0.05})
+    assert isinstance(report, LatencyReport)
+    assert report.accuracy == 0.05
+    # Параметры, которые отчет не принимает, не передаются
+    assert isinstance(
+        report_factory("average", iter([]), {"accuracy": 0.05}),
+        AverageReport,
+    )
+
+
+def test_accepted_options():
+    options = {"accuracy": 0.05, "other": 1}
+    assert accepted_options("latency", options) == {"accuracy": 0.05}
+    assert accepted_options("average", options) == {}
+    assert accepted_options("unknown", options) == {}
+    assert accepted_options("latency") == {}
+
+
+def test_report_factory_list():
+    assert isinstance(report_factory(["average"], iter([])), AverageReport)
+    report = report_factory(
+        ["average", "latency"], iter([]), {"accuracy": 0.05, "top": 3}
+    )
+    assert isinstance(report, MultiReport)
+    assert list(report.reports) == ["average", "latency"]
+    assert report.reports["latency"].accuracy == 0.05
+    assert report.reports["average"].top == 3
+
+
+def test_accepted_options_list():
+    options = {"accuracy": 0.05, "top": 3}
+    assert accepted_options(["average", "latency"], options) == options
+    assert accepted_options(["average"], options) == {"top": 3}
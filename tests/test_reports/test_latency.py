@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from models import LogBatch, LogRecord
+from reports.latency import LatencyReport
+
+
+def test_latency_report_generate():
+    logs = [LogRecord(url="/a", response_time=i / 100) for i in range(1, 101)]
+    logs += [
+        LogRecord(url="/b", response_time=2.0),
+        LogRecord(url=None, response_time=5.0),
+        LogRecord(url="/c", response_time=None),
+    ]
+    report = LatencyReport(iter(logs))
+    result = report._generate()
+    assert report._headers == (
+        "",
+        "handler",
+        "total",
+        "p50",
+        "p90",
+        "p95",
+        "p99",
+        "max",
+    )
+    assert len(result) == 2
+    index, url, total, p50, p90, p95, p99, maximum = result[0]
+    assert (index, url, total, maximum) == (0, "/a", 100, 1.0)
+    for value, expected in ((p50, 0.5), (p90, 0.9), (p95, 0.95), (p99, 0.99)):
+        assert value == pytest.approx(expected, rel=0.02)
+    assert result[1] == (1, "/b", 1, *(pytest.approx(2.0, rel=0.01),) * 4, 2.0)
+
+
+def test_latency_report_accuracy():
+    logs = [LogRecord(url="/a", response_time=1.0)]
+    coarse = LatencyReport(iter(logs), accuracy=0.1)
+    assert coarse._generate()[0][3] == pytest.approx(1.0, rel=0.1)
+    assert coarse._generate()[0][3] != LatencyReport(iter(logs))._generate()
+
+
+def test_latency_report_state_is_mergeable():
+    logs = [
+        LogRecord(url=f"/u{i % 3}", response_time=i * 0.01) for i in range(300)
+    ]
+    whole = LatencyReport(iter([]))
+    whole.accumulate_all(logs)
+
+    first = LatencyReport(iter([]))
+    first.accumulate_all(logs[:100])
+    second = LatencyReport(iter([]))
+    second.accumulate_all(logs[100:])
+    merged = LatencyReport(iter([]))
+    merged.merge(json.loads(json.dumps(first.state)))
+    merged.merge(json.loads(json.dumps(second.state)))
+    assert merged.finalize() == whole.finalize()
+    assert merged.state == whole.state
+
+
+def test_latency_report_accumulate_batch():
+    logs = [
+        LogRecord(url="/a", response_time=1.0),
+        LogRecord(url="/b", response_time=None),
+        LogRecord(url="/a", response_time=3.0),
+    ]
+    expected = LatencyReport(iter([]))
+    expected.accumulate_all(logs)
+    report = LatencyReport(iter([]))
+    report.accumulate_batch(LogBatch.from_records(logs))
+    assert report.state == expected.state
+
+
+def test_latency_report_top_and_url_rules():
+    logs = [LogRecord(url=f"/a/{i}", response_time=1.0) for i in range(30)]
+    logs += [LogRecord(url=f"/r{i}x", response_time=5.0) for i in range(40)]
+    report = LatencyReport(iter([]), top=1, url_rules=[(r"/\d+", "/{id}")])
+    report.accumulate_all(logs)
+    assert len(report._state) == 10
+    ((index, url, total, *quantiles, maximum),) = report.finalize()
+    assert (index, url, total, maximum) == (0, "/a/{id}", 30, 1.0)
+    assert quantiles == [pytest.approx(1.0, rel=0.02)] * 4
+
+    merged = LatencyReport(iter([]), top=1)
+    merged.merge(json.loads(json.dumps(report.state)))
+    merged.merge(json.loads(json.dumps(report.state)))
+    assert merged.finalize()[0][:3] == (0, "/a/{id}", 60)
@@ -0,0 +1,70 @@
+import json
+
+from models import LogBatch, LogRecord
+from reports import multi
+from reports.average import AverageReport
+from reports.latency import LatencyReport
+from reports.multi import MultiReport
+
+
+LOGS = [
+    LogRecord(url="/a", response_time=1.0),
+    LogRecord(url="/b", response_time=2.0),
+    LogRecord(url="/a", response_time=3.0),
+    LogRecord(url=None, response_time=4.0),
+]
+
+
+def new_multi(logs=()):
+    return MultiReport(
+        {
+            "average": AverageReport(iter([])),
+            "latency": LatencyReport(iter([])),
+        },
+        iter(logs),
+    )
+
+
+def test_multi_report_single_pass(monkeypatch):
+    monkeypatch.setattr(multi, "CHUNK_SIZE", 3)
+    consumed = []
+
+    def logs():
+        for log in LOGS:
+            consumed.append(log)
+            yield log
+
+    report = new_multi(logs())
+    report.accumulate_all(report._logs)
+    assert consumed == LOGS
+    average = AverageReport(iter(LOGS))
+    latency = LatencyReport(iter(LOGS))
+    assert report.finalize() == (average._generate(), latency._generate())
+
+
+def test_multi_report_state_is_mergeable():
+    first = new_multi()
+    first.accumulate_all(LOGS[:2])
+    second = new_multi()
+    second.accumulate(LOGS[2])
+    second.accumulate_batch(LogBatch.from_records(LOGS[3:]))
+    merged = new_multi()
+    merged.merge(json.loads(json.dumps(first.state)))
+    merged.merge(json.loads(json.dumps(second.state)))
+
+    whole = new_multi()
+    whole.accumulate_all(LOGS)
+    assert merged.state == whole.state
+
+
+def test_multi_report_print(capsys):
+    report = new_multi(LOGS)
+    report.print()
+    first = capsys.readouterr().out
+    average, latency = first.split("\n\n")
+    assert average.startswith("Отчет average\n")
+    assert "avg_response_time" in average
+    assert latency.startswith("Отчет latency\n")
+    assert "p99" in latency
+    report.print()
+    assert capsys.readouterr().out == first
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from models import LogBatch, LogRecord
+from reports.timeseries import TimeseriesReport
+
+
+LOGS = [
+    LogRecord(
+        timestamp="2025-06-22T13:57:32+00:00", url="/a", response_time=1.0
+    ),
+    LogRecord(
+        timestamp="2025-06-22T13:59:59+00:00", url="/b", response_time=3.0
+    ),
+    LogRecord(timestamp="2025-06-22T14:00:00+00:00", url="/a"),
+    LogRecord(
+        timestamp="2025-06-22T14:04:10+00:00", url="/a", response_time=2.0
+    ),
+    LogRecord(timestamp=None, url="/a", response_time=1.0),
+    LogRecord(timestamp="broken", url="/a", response_time=1.0),
+    LogRecord(timestamp="2025-06-22Txx:00:00", url="/a", response_time=1.0),
+]
+
+
+def test_timeseries_report_generate():
+    report = TimeseriesReport(iter(LOGS), bucket=300)
+    assert report._headers == (
+        "",
+        "bucket",
+        "total",
+        "rpm",
+        "avg_response_time",
+        "max_response_time",
+    )
+    assert report._generate() == (
+        (0, "2025-06-22T13:55", 2, 0.4, 2.0, 3.0),
+        (1, "2025-06-22T14:00", 2, 0.4, 2.0, 2.0),
+    )
+
+
+def test_timeseries_report_by_handler():
+    report = TimeseriesReport(
+        iter(LOGS + [LogRecord(timestamp="2025-06-22T14:01:00", url=None)]),
+        bucket=3600,
+        by_handler=True,
+    )
+    assert report._headers[1:3] == ("bucket", "handler")
+    assert report._generate() == (
+        (0, "2025-06-22T13:00", "/a", 1, 0.017, 1.0, 1.0),
+        (1, "2025-06-22T13:00", "/b", 1, 0.017, 3.0, 3.0),
+        (2, "2025-06-22T14:00", "/a", 2, 0.033, 2.0, 2.0),
+    )
+
+
+@pytest.mark.parametrize(
+    "bucket, timestamp, expected",
+    [
+        (30, "2025-06-22T13:57:32Z", "2025-06-22T13:57:30"),
+        (60, "2025-06-22T13:57:32Z", "2025-06-22T13:57"),
+        (900, "2025-06-22 13:57:32", "2025-06-22T13:45"),
+        (7200, "2025-06-22T13:57:32", "2025-06-22T12:00"),
+        (86400, "2025-06-22T13:57:32", "2025-06-22T00:00"),
+    ],
+)
+def test_timeseries_report_bucket(bucket, timestamp, expected):
+    report = TimeseriesReport(
+        iter([LogRecord(timestamp=timestamp)]), bucket=bucket
+    )
+    assert report._generate() == (
+        (0, expected, 1, round(60 / bucket, 3), None, None),
+    )
+
+
+def test_timeseries_report_merge_and_batch():
+    first = TimeseriesReport(iter([]), bucket=300, by_handler=True)
+    first.accumulate_all(LOGS[:2])
+    second = TimeseriesReport(iter([]), bucket=300, by_handler=True)
+    second.accumulate_batch(LogBatch.from_records(LOGS[2:]))
+    merged = TimeseriesReport(iter([]), bucket=300, by_handler=True)
+    merged.merge(json.loads(json.dumps(first.state)))
+    merged.merge(json.loads(json.dumps(second.state)))
+
+    whole = TimeseriesReport(iter(LOGS), bucket=300, by_handler=True)
+    assert merged.finalize() == whole._generate()
+    assert merged.state == whole.state
+
+
+def test_timeseries_report_url_rules():
+    logs = [
+        LogRecord(timestamp="2025-06-22T13:57:32", url=f"/users/{i}")
+        for i in range(3)
+    ]
+    report = TimeseriesReport(
+        iter(logs), by_handler=True, url_rules=[(r"\d+", "{id}")]
+    )
+    assert report._generate() == (
+        (0, "2025-06-22T13:57", "/users/{id}", 3, 3.0, None, None),
+    )
@@ -0,0 +1,132 @@
+import pytest
+
+from cache import AggregateCache
+from engines import NumpyEngine
+from filters import FilterPipeline
+from log_parser import LogParser
+from reports.factory import report_factory
+from runner import build_report
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = FilterPipeline()
+    pipeline.add_contains("timestamp", "2025-06-21")
+    return pipeline
+
+
+@pytest.fixture
+def expected(log_files, pipeline):
+    logs = pipeline.apply(LogParser(log_files).parse())
+    return report_factory("average", logs)._generate()
+
+
+def test_build_report_serial(log_files, pipeline, expected):
+    report = build_report(LogParser(log_files), "average", pipeline)
+    assert report._generate() == expected
+
+
+def test_build_report_workers(log_files, pipeline, expected):
+    report = build_report(LogParser(log_files), "average", pipeline, workers=2)
+    assert report._generate() == expected
+
+
+def test_build_report_cache(
+    tmp_path, monkeypatch, log_files, pipeline, expected
+):
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    report = build_report(
+        LogParser(log_files), "average", pipeline, cache=cache
+    )
+    assert report._generate() == expected
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+    # Файлы не читаются повторно, все берется из кеша
+    monkeypatch.setattr("runner.task_state", None)
+    report = build_report(
+        LogParser(log_files), "average", pipeline, cache=cache
+    )
+    assert report._generate() == expected
+
+
+def test_build_report_cache_changed_file(tmp_path, log_files, pipeline):
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    build_report(LogParser(log_files), "average", pipeline, cache=cache)
+    with open(log_files[1], "a") as file:
+        file.write(
+            '{"@timestamp": "2025-06-21T00:00:00+00:00", '
+            '"url": "/new", "response_time": 1.0}\n'
+        )
+    report = build_report(
+        LogParser(log_files), "average", pipeline, cache=cache
+    )
+    assert "/new" in {row[1] for row in report._generate()}
+
+
+def test_build_report_bad_files(tmp_path, log_files, pipeline, capsys):
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    report = build_report(
+        LogParser([log_files[1], "nonexistent.log"]),
+        "average",
+        pipeline,
+        cache=cache,
+    )
+    assert report._generate() == ()
+    assert (
+        "Файл nonexistent.log не удалось прочитать" in capsys.readouterr().err
+    )
+
+    with pytest.raises(SystemExit):
+        build_report(
+            LogParser(["nonexistent.log"]), "average", pipeline, cache=cache
+        )
+    assert (
+        "Все файлы не существуют либо не читаются" in capsys.readouterr().err
+    )
+
+
+def test_build_report_read_ahead(tmp_path, log_files, pipeline, expected):
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    parser = LogParser(log_files, read_ahead=2)
+    report = build_report(parser, "average", pipeline)
+    assert report._generate() == expected
+    report = build_report(parser, "average", pipeline, cache=cache)
+    assert report._generate() == expected
+
+
+def test_build_report_numpy_engine(log_files, pipeline, expected):
+    pytest.importorskip("numpy")
+    report = build_report(
+        LogParser(log_files), "average", pipeline, engine=NumpyEngine()
+    )
+    assert report._generate() == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_report_latency(tmp_path, log_files, pipeline, workers):
+    options = {"accuracy": 0.05}
+    logs = pipeline.apply(LogParser(log_files).parse())
+    expected = report_factory("latency", logs, options)._generate()
+    report = build_report(
+        LogParser(log_files),
+        "latency",
+        pipeline,
+        workers,
+        AggregateCache(str(tmp_path / "cache"), 1024 * 1024),
+        report_options=options,
+    )
+    assert report._generate() == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_report_multi(tmp_path, log_files, pipeline, workers):
+    names = ["average", "latency"]
+    logs = pipeline.apply(LogParser(log_files).parse())
+    expected = report_factory(names, logs)
+    expected.accumulate_all(expected._logs)
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    for _ in range(2):
+        report = build_report(
+            LogParser(log_files), names, pipeline, workers, cache
+        )
+        assert report.finalize() == expected.finalize()
@@ -0,0 +1,118 @@
+import json
+import operator
+import random
+
+import pytest
+
+from sketch import DDSketch, SpaceSaving
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_quantiles_within_accuracy(accuracy):
+    rng = random.Random(1)
+    values = [rng.lognormvariate(-2, 1.5) for _ in range(20000)]
+    sketch = DDSketch(accuracy)
+    for value in values:
+        sketch.add(value)
+    values.sort()
+    for q in (0.5, 0.9, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= accuracy * exact
+    assert sketch.quantile(1) == sketch.max == values[-1]
+    assert sketch.count == len(values)
+
+
+def test_zero_and_empty():
+    sketch = DDSketch()
+    assert sketch.quantile(0.5) is None
+    for value in (0.0, 0.0, 0.0, 1.0):
+        sketch.add(value)
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1) == 1.0
+
+
+def test_merge_same_as_single():
+    rng = random.Random(2)
+    values = [rng.expovariate(5) for _ in range(5000)]
+    single = DDSketch()
+    first, second = DDSketch(), DDSketch()
+    for i, value in enumerate(values):
+        single.add(value)
+        (first if i % 3 else second).add(value)
+    # Состояние переживает сериализацию
+    state = json.loads(json.dumps(second.to_state()))
+    first.merge(DDSketch.from_state(state))
+    first.merge(DDSketch())
+    assert first.bins == single.bins
+    assert first.count == single.count
+    assert first.max == single.max
+
+
+def test_bounded_bins():
+    sketch = DDSketch(0.01, max_bins=50)
+    for i in range(1, 10000):
+        sketch.add(i * 0.001)
+    assert len(sketch.bins) == 50
+    assert sketch.count == 9999
+    # Старшие квантили не теряют точность
+    assert sketch.quantile(0.99) == pytest.approx(9.9, rel=0.01)
+
+    other = DDSketch(0.01, max_bins=50)
+    other.add(1e-6)
+    sketch.merge(other)
+    assert len(sketch.bins) == 50
+
+
+def test_space_saving_exact_when_not_full():
+    summary = SpaceSaving(10)
+    for key in "abacabad":
+        summary.add(key, list)[2].append(key)
+    assert summary.entries == {
+        "a": [4, 0, ["a"] * 4],
+        "b": [2, 0, ["b"] * 2],
+        "c": [1, 0, ["c"]],
+        "d": [1, 0, ["d"]],
+    }
+
+
+def test_space_saving_guarantees():
+    rng = random.Random(3)
+    capacity = 50
+    keys = [f"/heavy{i}" for i in range(5)] * 400 + [
+        f"/rare{rng.randrange(10**6)}" for _ in range(8000)
+    ]
+    rng.shuffle(keys)
+    summary = SpaceSaving(capacity)
+    for key in keys:
+        summary.add(key, int)
+    assert len(summary.entries) == capacity
+    bound = len(keys) / capacity
+    for key, (count, error, _) in summary.entries.items():
+        true_count = keys.count(key)
+        assert count - error <= true_count <= count
+        assert error <= bound
+    # Ключи чаще N / capacity раз всегда отслеживаются
+    for i in range(5):
+        assert f"/heavy{i}" in summary.entries
+
+
+def test_space_saving_merge():
+    rng = random.Random(4)
+    keys = [f"/k{int(rng.paretovariate(1.2))}" for _ in range(5000)]
+    first, second = SpaceSaving(20), SpaceSaving(20)
+    for i, key in enumerate(keys):
+        (first if i % 2 else second).add(key, int)[2] += 1
+    first.merge(json.loads(json.dumps(second.entries)), operator.add)
+    assert len(first.entries) == 20
+    bound = len(keys) / 20
+    for key, (count, error, observed) in first.entries.items():
+        true_count = keys.count(key)
+        assert count - error <= true_count <= count
+        assert observed == count - error
+        assert error <= 2 * bound
+    # Самый частый ключ на первом месте
+    top_key = max(set(keys), key=keys.count)
+    assert max(first.entries, key=lambda k: first.entries[k][0]) == top_key
+    # После слияния структура продолжает работать
+    first.add("/new", int)
+    assert len(first.entries) == 20
@@ -0,0 +1,133 @@
+import io
+import json
+
+import pytest
+
+from decoders import get_decoder
+from engines import NumpyEngine, PythonEngine
+from filters import FilterPipeline
+from log_parser import LogParser
+from reports.average import AverageReport
+from reports.factory import report_factory
+from runner import build_report
+from stats import FileStats, RunStats
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = FilterPipeline()
+    pipeline.add_contains("timestamp", "2025-06-21")
+    pipeline.add_equal("url", "/u1")
+    return pipeline
+
+
+@pytest.mark.parametrize("decoder", ["json", "auto"])
+def test_file_stats_counters(log_files, pipeline, decoder):
+    parser = LogParser(
+        [], pipeline.raw_needles(), decoder=get_decoder(decoder)
+    )
+    stats = FileStats()
+    report = AverageReport(iter([]))
+    stats.accumulate(
+        PythonEngine(),
+        report,
+        pipeline,
+        parser.parse_file(log_files[0], stats=stats),
+    )
+    assert report.state == {"/u1": [10, 5.0]}
+    # 200 записей по трем датам и испорченная строка без подстрок
+    assert stats.lines == 201
+    assert stats.bytes == len(open(log_files[0], "rb").read())
+    assert stats.prefiltered == 201 - 67
+    assert (stats.records, stats.decode_errors) == (67, 0)
+    assert stats.passed == 10
+    for stage in ("read", "decode", "filter", "aggregate"):
+        assert getattr(stats, stage) >= 0
+    if get_decoder(decoder).loads is not None:
+        assert stats.from_dict > 0
+
+
+def test_parse_file_stats_sampling(tmp_path):
+    path = tmp_path / "1.log"
+    path.write_text(
+        "INVALID\n"
+        + '{"url": "/a", "response_time": 1.0}\n' * 40
+        + "INVALID\n"
+    )
+    stats = FileStats()
+    logs = list(LogParser([]).parse_file(str(path), stats=stats))
+    assert len(logs) == 40
+    assert (stats.lines, stats.records, stats.decode_errors) == (42, 40, 2)
+    assert stats.read > 0 and stats.decode > 0
+
+
+def test_file_stats_numpy(log_files, pipeline):
+    pytest.importorskip("numpy")
+    stats = FileStats()
+    report = AverageReport(iter([]))
+    stats.accumulate(
+        NumpyEngine(),
+        report,
+        pipeline,
+        LogParser([]).parse_file(log_files[0], stats=stats),
+    )
+    assert report.state == {"/u1": [10, 5.0]}
+    assert stats.passed is None
+    assert stats.records == 200
+
+
+def test_file_stats_merge():
+    first = FileStats(lines=2, read=1.0, passed=None)
+    first.merge(FileStats(lines=3, read=0.5, passed=4, cached=True))
+    assert (first.lines, first.read, first.passed) == (5, 1.5, 4)
+    assert first.cached
+
+
+def test_parse_collects_stats(log_files):
+    stats = RunStats()
+    logs = list(LogParser(log_files, stats=stats).parse())
+    assert len(logs) == 201
+    assert set(stats.files) == set(log_files)
+    assert stats.total().records == 201
+    assert stats.total().decode_errors == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_report_stats(tmp_path, log_files, pipeline, workers):
+    from cache import AggregateCache
+
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    expected = report_factory("average", iter([]))
+    expected.accumulate_all(pipeline.apply(LogParser(log_files).parse()))
+
+    parser = LogParser(log_files, pipeline.raw_needles(), stats=RunStats())
+    report = build_report(parser, "average", pipeline, workers, cache)
+    assert report.state == expected.state
+    assert parser.stats.files[log_files[0]].passed == 10
+    assert not parser.stats.files[log_files[0]].cached
+
+    parser = LogParser(log_files, pipeline.raw_needles(), stats=RunStats())
+    build_report(parser, "average", pipeline, workers, cache)
+    assert parser.stats.files[log_files[0]].cached
+    assert parser.stats.files[log_files[0]].lines == 0
+
+
+def test_run_stats_output(tmp_path, log_files):
+    stats = RunStats()
+    report = report_factory(["average", "latency"], iter([]))
+    report.accumulate_all(LogParser(log_files, stats=stats).parse())
+    stats.finish(report)
+    assert stats.distinct_keys == {"average": 8, "latency": 8}
+    assert stats.peak_rss_mb > 0
+
+    file = io.StringIO()
+    stats.print(file)
+    output = file.getvalue()
+    assert "decode_errors" in output and "total" in output
+    assert "Ключей в отчете latency: 8" in output
+
+    path = tmp_path / "stats.json"
+    stats.save(str(path))
+    data = json.loads(path.read_text())
+    assert data["total"]["lines"] == 202
+    assert set(data["files"]) == set(log_files)
@@ -0,0 +1,140 @@
+import gzip
+import os
+
+import pytest
+
+from time_index import TimeIndex
+
+
+# 2025-06-22T00:00:00+00:00
+DAY_START = 1750550400
+
+
+def log_line(minute, second=0, url="/a"):
+    return (
+        f'{{"@timestamp": "2025-06-22T{minute // 60:02}:{minute % 60:02}:'
+        f'{second:02}+00:00", "url": "{url}", "response_time": 0.5}}\n'
+    )
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "log.json"
+    # По две записи на минуту, одна запись без времени
+    path.write_text(
+        "".join(log_line(m) + log_line(m, 30) for m in range(10))
+        + '{"url": "/no-time"}\n'
+    )
+    return str(path)
+
+
+def test_update(log_path):
+    index = TimeIndex(log_path)
+    assert index.update() is True
+    line_size = len(log_line(0))
+    assert index.entries == [
+        (DAY_START + m * 60, 2 * m * line_size) for m in range(10)
+    ]
+    assert index.indexed_size == os.path.getsize(log_path)
+    assert index.update() is False
+
+
+def test_save_load(log_path):
+    index = TimeIndex(log_path)
+    index.update()
+    index.save()
+    loaded = TimeIndex.load(log_path)
+    assert loaded.entries == index.entries
+    assert loaded.status(os.stat(log_path)) == "fresh"
+
+
+def test_load_missing(log_path):
+    assert TimeIndex.load(log_path) is None
+
+
+def test_byte_range(log_path):
+    index = TimeIndex(log_path)
+    index.update()
+    line_size = len(log_line(0))
+    stat = os.stat(log_path)
+    assert index.byte_range(stat, None, None) == (0, None)
+    assert index.byte_range(stat, DAY_START + 150, DAY_START + 300) == (
+        4 * line_size,
+        10 * line_size,
+    )
+    assert index.byte_range(stat, DAY_START + 3600, None) == (
+        index.indexed_size,
+        None,
+    )
+
+
+def test_out_of_order_lines(tmp_path):
+    path = tmp_path / "log.json"
+    path.write_text(log_line(0) + log_line(2) + log_line(1) + log_line(3))
+    index = TimeIndex(str(path))
+    index.update()
+    line_size = len(log_line(0))
+    assert index.entries == [
+        (DAY_START, 0),
+        (DAY_START + 120, line_size),
+        (DAY_START + 180, 3 * line_size),
+    ]
+    # Запись за первую минуту лежит после записи за вторую
+    assert index.byte_range(os.stat(path), DAY_START + 60, None) == (
+        line_size,
+        None,
+    )
+
+
+def test_appended(log_path):
+    index = TimeIndex(log_path)
+    index.update()
+    entries = list(index.entries)
+    indexed_size = index.indexed_size
+    with open(log_path, "a") as file:
+        file.write(log_line(20))
+        # Недописанная строка не индексируется
+        file.write(log_line(21).rstrip("\n"))
+    assert index.status(os.stat(log_path)) == "appended"
+    assert index.update() is True
+    assert index.entries == [*entries, (DAY_START + 1200, indexed_size)]
+    assert index.indexed_size == indexed_size + len(log_line(20))
+
+
+def test_rewritten(log_path):
+    index = TimeIndex(log_path)
+    index.update()
+    with open(log_path, "w") as file:
+        file.write(log_line(5) * 30)
+    assert index.status(os.stat(log_path)) == "stale"
+    assert index.byte_range(os.stat(log_path), DAY_START + 600, None) == (
+        0,
+        None,
+    )
+    index.update()
+    assert index.entries == [(DAY_START + 300, 0)]
+
+
+def test_bucket(log_path):
+    index = TimeIndex(log_path, bucket=300)
+    index.update()
+    line_size = len(log_line(0))
+    assert index.entries == [(DAY_START, 0), (DAY_START + 300, 10 * line_size)]
+
+
+def test_compressed(tmp_path):
+    data = "".join(log_line(m) for m in range(5)).encode()
+    path = tmp_path / "log.json.gz"
+    path.write_bytes(gzip.compress(data))
+    index = TimeIndex(str(path))
+    index.update()
+    line_size = len(log_line(0))
+    assert index.compression == "gzip"
+    assert index.indexed_size == len(data)
+    assert index.entries == [
+        (DAY_START + m * 60, m * line_size) for m in range(5)
+    ]
+    assert index.byte_range(os.stat(path), DAY_START + 120, None) == (
+        2 * line_size,
+        None,
+    )
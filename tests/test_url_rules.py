@@ -0,0 +1,37 @@
+import pytest
+
+from url_rules import DEFAULT_RULES, UrlNormalizer
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("/api/homeworks/123/", "/api/homeworks/{id}/"),
+        ("/api/homeworks/123", "/api/homeworks/{id}"),
+        ("/api/users/42/posts/7?page=2", "/api/users/{id}/posts/{id}?page=2"),
+        (
+            "/files/3f2b6c1e-8a4d-4c2e-9b1a-0d5e6f7a8b9c/",
+            "/files/{uuid}/",
+        ),
+        ("/blobs/0123456789abcdef0123", "/blobs/{hash}"),
+        ("/api/v2/context", "/api/v2/context"),
+        ("/api/abc123/", "/api/abc123/"),
+    ],
+)
+def test_default_rules(url, expected):
+    assert UrlNormalizer(DEFAULT_RULES)(url) == expected
+
+
+def test_custom_rules():
+    normalize = UrlNormalizer(
+        [(r"^/users/[^/]+", "/users/{name}"), (r"\?.*$", "")]
+    )
+    assert normalize("/users/alex/profile?tab=1") == "/users/{name}/profile"
+
+
+def test_cache():
+    normalize = UrlNormalizer(DEFAULT_RULES)
+    for _ in range(3):
+        normalize("/api/1/")
+    info = normalize._cached.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
@@ -1,6 +1,17 @@
 import pytest
 
-from utils import float_or_none, int_or_none, validate_date
+from utils import (
+    date_window,
+    float_or_none,
+    int_or_none,
+    parse_timestamp,
+    validate_date,
+    validate_datetime,
+    validate_duration,
+    validate_fraction,
+    validate_positive_int,
+    validate_regex,
+)
 
 
 def test_validate_date__valid_date():
@@ -35,3 +46,85 @@ def test_int_or_none(value, expectation):
 )
 def test_float_or_none(value, expectation):
     assert float_or_none(value) == expectation
+
+
+def test_validate_positive_int__valid():
+    assert validate_positive_int("4") == 4
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "two"])
+def test_validate_positive_int__invalid(value, capsys):
+    with pytest.raises(SystemExit):
+        validate_positive_int(value)
+    captured = capsys.readouterr()
+    assert f"Указано некорректное число {value}" in captured.err
+
+
+@pytest.mark.parametrize(
+    "value, expectation",
+    [
+        ("2025-06-22T14:10:11+00:00", 1750601411.0),
+        ("2025-06-22T17:10:11+03:00", 1750601411.0),
+        ("2025-06-22T14:10:11.5Z", 1750601411.5),
+        ("2025-06-22T14:10:11", 1750601411.0),
+        ("2025-06-22", 1750550400.0),
+        ("not a date", None),
+        (None, None),
+    ],
+)
+def test_parse_timestamp(value, expectation):
+    assert parse_timestamp(value) == expectation
+
+
+def test_validate_datetime():
+    assert validate_datetime("2025-06-22T14:10") == 1750601400.0
+
+
+def test_validate_datetime__invalid(capsys):
+    with pytest.raises(SystemExit):
+        validate_datetime("22.06.2025")
+    assert "Указаны некорректные дата и время 22.06.2025" in (
+        capsys.readouterr().err
+    )
+
+
+def test_date_window():
+    assert date_window("2025-06-22") == (
+        1750550400.0 - 14 * 3600,
+        1750636800.0 + 14 * 3600,
+    )
+
+
+def test_validate_fraction():
+    assert validate_fraction("0.05") == 0.05
+
+
+@pytest.mark.parametrize("value", ["0", "1", "-0.1", "abc"])
+def test_validate_fraction__invalid(value, capsys):
+    with pytest.raises(SystemExit):
+        validate_fraction(value)
+    assert f"Указано некорректное число {value}" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "value, expectation",
+    [("30s", 30), ("45", 45), ("5m", 300), ("1h", 3600), ("1d", 86400)],
+)
+def test_validate_duration(value, expectation):
+    assert validate_duration(value) == expectation
+
+
+@pytest.mark.parametrize("value", ["0m", "7m", "2d", "m", "", "1w"])
+def test_validate_duration__invalid(value, capsys):
+    with pytest.raises(SystemExit):
+        validate_duration(value)
+    assert "Указана некорректная длительность" in capsys.readouterr().err
+
+
+def test_validate_regex(capsys):
+    assert validate_regex(r"/\d+") == r"/\d+"
+    with pytest.raises(SystemExit):
+        validate_regex("(")
+    assert "Указано некорректное регулярное выражение (" in (
+        capsys.readouterr().err
+    )
@@ -0,0 +1,218 @@
+import json
+import os
+import re
+from bisect import bisect_left
+from typing import Iterator
+
+from decompress import detect_compression, read_lines
+from utils import file_tail_hash, parse_timestamp
+
+
+# Меняется при несовместимом изменении формата индекса
+INDEX_VERSION = 1
+# Суффикс файла индекса рядом с файлом лога
+INDEX_SUFFIX = ".tidx"
+# Размер корзины времени по умолчанию, секунды
+BUCKET_SECONDS = 60
+
+_TIMESTAMP = re.compile(rb'"@timestamp"\s*:\s*"([^"\\]*)"')
+
+
+class TimeIndex:
+    """Индекс времени файла лога (сайдкар-файл рядом с логом).
+
+    Индекс - список пар (начало корзины времени, смещение строки):
+    смещение первой строки файла, время которой попало в корзину позже
+    всех предыдущих строк. Корзина - интервал в bucket секунд. Поэтому
+    все записи со временем не раньше low лежат не раньше первой пары
+    с корзиной не раньше корзины low, даже если соседние записи в файле
+    немного перемешаны по времени (метод byte_range).
+    Индексируются только полные строки (с переводом строки в конце),
+    проиндексированная часть файла - первые indexed_size байт.
+    Для сжатых файлов смещения - смещения в распакованных данных.
+    Индекс привязан к inode, размеру и mtime файла (метод status):
+    - fresh - файл не менялся, индекс покрывает весь файл;
+    - appended - файл только дописывался (inode тот же, файл не меньше
+      проиндексированной части и ее последние байты не изменились,
+      см. utils.file_tail_hash), индекс верен для проиндексированной
+      части (только для несжатых файлов);
+    - stale - файл заменен или перезаписан, индекс не используется.
+    Метод update достраивает индекс дописанного файла с места, где
+    остановился, а устаревший индекс строит заново. Методы load и save
+    читают и пишут индекс в файл path + INDEX_SUFFIX.
+    """
+
+    def __init__(self, path: str, bucket: int = BUCKET_SECONDS) -> None:
+        self.path = path
+        self.bucket = bucket
+        self.inode: int | None = None
+        self.size = 0
+        self.mtime_ns = 0
+        self.indexed_size = 0
+        self.tail_hash = ""
+        self.compression: str | None = None
+        self.entries: list[tuple[int, int]] = []
+
+    @staticmethod
+    def index_path(path: str) -> str:
+        return f"{path}{INDEX_SUFFIX}"
+
+    @staticmethod
+    def load(path: str) -> "TimeIndex | None":
+        """Читает индекс файла path, если он есть и читается."""
+        try:
+            with open(TimeIndex.index_path(path), encoding="utf-8") as file:
+                data = json.load(file)
+            if data["version"] != INDEX_VERSION:
+                return None
+            index = TimeIndex(path, data["bucket"])
+            index.inode = data["inode"]
+            index.size = data["size"]
+            index.mtime_ns = data["mtime_ns"]
+            index.indexed_size = data["indexed_size"]
+            index.tail_hash = data["tail_hash"]
+            index.compression = data["compression"]
+            index.entries = [tuple(entry) for entry in data["entries"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return index
+
+    def save(self) -> None:
+        index_path = self.index_path(self.path)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        data = {
+            "version": INDEX_VERSION,
+            "bucket": self.bucket,
+            "inode": self.inode,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "indexed_size": self.indexed_size,
+            "tail_hash": self.tail_hash,
+            "compression": self.compression,
+            "entries": self.entries,
+        }
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, index_path)
+
+    def status(self, stat: os.stat_result) -> str:
+        if self.inode != stat.st_ino:
+            return "stale"
+        if self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns:
+            return "fresh"
+        if (
+            self.compression is None
+            and stat.st_size >= self.indexed_size
+            and self._tail_hash() == self.tail_hash
+        ):
+            return "appended"
+        return "stale"
+
+    def update(self) -> bool:
+        """Строит или достраивает индекс по текущему файлу.
+
+        Возвращает False, если индекс уже актуален.
+        """
+        stat = os.stat(self.path)
+        status = self.status(stat)
+        if status == "fresh":
+            return False
+        if status == "stale":
+            self.indexed_size = 0
+            self.entries = []
+            self.compression = detect_compression(self.path)
+        last_bucket = self.entries[-1][0] if self.entries else None
+        for offset, bucket in self._scan(self.indexed_size, stat.st_size):
+            if last_bucket is None or bucket > last_bucket:
+                self.entries.append((bucket, offset))
+                last_bucket = bucket
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.tail_hash = self._tail_hash()
+        return True
+
+    def byte_range(
+        self,
+        stat: os.stat_result,
+        low: float | None,
+        high: float | None,
+    ) -> tuple[int, int | None]:
+        """Диапазон байт [start, end) файла, где лежат записи из [low, high).
+
+        Без верхней границы (или если она за проиндексированной частью)
+        end - None. Для устаревшего индекса - весь файл (0, None).
+        """
+        if self.status(stat) == "stale":
+            return 0, None
+        buckets = [bucket for bucket, _ in self.entries]
+        start = 0
+        if low is not None:
+            i = bisect_left(buckets, low // self.bucket * self.bucket)
+            if i < len(self.entries):
+                start = self.entries[i][1]
+            else:
+                start = self.indexed_size
+        end = None
+        if high is not None:
+            i = bisect_left(buckets, high)
+            if i < len(self.entries):
+                end = self.entries[i][1]
+        return start, end
+
+    def _scan(self, start: int, size: int) -> Iterator[tuple[int, int]]:
+        """Возвращает пары (смещение строки, корзина) полных строк.
+
+        Строки без времени пропускаются. Сдвигает indexed_size до конца
+        последней полной строки.
+        """
+        search = _TIMESTAMP.search
+        bucket_size = self.bucket
+        # Время в одном формате до минуты с тем же смещением попадает
+        # в ту же корзину (если корзина кратна минуте), поэтому разбираем
+        # время только при смене минуты
+        by_minute = bucket_size % 60 == 0
+        last_key = last_bucket = None
+        pos = start
+        for line in self._lines(start, size):
+            if not line.endswith(b"\n"):
+                break
+            offset = pos
+            pos += len(line)
+            self.indexed_size = pos
+            match = search(line)
+            if match is None:
+                continue
+            value = match.group(1)
+            if by_minute and len(value) == 25 and value[10:11] == b"T":
+                key = value[:16] + value[19:]
+                if key == last_key:
+                    yield offset, last_bucket
+                    continue
+            else:
+                key = None
+            timestamp = parse_timestamp(value.decode("ascii", "replace"))
+            if timestamp is None:
+                continue
+            bucket = int(timestamp // bucket_size * bucket_size)
+            last_key, last_bucket = key, bucket
+            yield offset, bucket
+
+    def _lines(self, start: int, size: int) -> Iterator[bytes]:
+        """Строки файла с позиции start до размера файла size."""
+        if self.compression is not None:
+            yield from read_lines(self.path, self.compression)
+            return
+        with open(self.path, "rb") as file:
+            file.seek(start)
+            remaining = size - start
+            for line in file:
+                remaining -= len(line)
+                if remaining < 0:
+                    return
+                yield line
+
+    def _tail_hash(self) -> str:
+        if self.compression is not None:
+            return ""
+        return file_tail_hash(self.path, self.indexed_size)
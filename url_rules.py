@@ -0,0 +1,43 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+
+# Правила по умолчанию: сегменты пути с идентификаторами заменяются
+# шаблонами, чтобы запросы к одному обработчику группировались вместе
+DEFAULT_RULES = (
+    (
+        r"(?<=/)[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+        r"[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|\?|$)",
+        "{uuid}",
+    ),
+    (r"(?<=/)\d+(?=/|\?|$)", "{id}"),
+    (r"(?<=/)[0-9a-fA-F]{16,}(?=/|\?|$)", "{hash}"),
+)
+# Сколько различных исходных url помнит кеш нормализации
+CACHE_SIZE = 65536
+
+
+class UrlNormalizer:
+    """Приводит url к шаблону по правилам (регулярное выражение, замена).
+
+    Правила применяются по очереди через re.sub, замена может ссылаться
+    на группы выражения (\\1). Выражения компилируются один раз при
+    создании, а результат для каждого различного url кешируется
+    (последние CACHE_SIZE url), поэтому повторяющиеся url
+    нормализуются одним поиском в словаре.
+    """
+
+    def __init__(self, rules: Iterable[tuple[str, str]]) -> None:
+        self.rules = [
+            (re.compile(pattern), template) for pattern, template in rules
+        ]
+        self._cached = lru_cache(maxsize=CACHE_SIZE)(self._normalize)
+
+    def __call__(self, url: str) -> str:
+        return self._cached(url)
+
+    def _normalize(self, url: str) -> str:
+        for pattern, template in self.rules:
+            url = pattern.sub(template, url)
+        return url
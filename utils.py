@@ -1,5 +1,11 @@
+import hashlib
+import re
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+
+
+# Самое большое смещение часового пояса от UTC, секунды
+MAX_UTC_OFFSET = 14 * 3600
 
 
 def validate_date(date: str | None) -> str | None:
@@ -17,6 +23,48 @@ def validate_date(date: str | None) -> str | None:
     return date
 
 
+def validate_datetime(value: str) -> float:
+    """Валидирует дату и время при вводе в CLI.
+
+    Принимает ISO формат (ГГГГ-ММ-ДД, ГГГГ-ММ-ДДTЧЧ:ММ[:СС][+ЧЧ:ММ]),
+    время без часового пояса считается временем в UTC.
+    Возвращает время в секундах от начала эпохи.
+    """
+    timestamp = parse_timestamp(value)
+    if timestamp is None:
+        print(
+            f"Указаны некорректные дата и время {value}, "
+            "допустимый формат ГГГГ-ММ-ДДTЧЧ:ММ[:СС][+ЧЧ:ММ]",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return timestamp
+
+
+def parse_timestamp(value: str | None) -> float | None:
+    """Преобразует время из лога в секунды от начала эпохи.
+
+    Время без часового пояса считается временем в UTC.
+    В случае ошибки возвращает None.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def date_window(date: str) -> tuple[float, float]:
+    """Период (секунды от начала эпохи), в который попадает все время
+    с датой date в любом часовом поясе.
+    """
+    start = datetime.fromisoformat(date).replace(tzinfo=timezone.utc)
+    day_start = start.timestamp()
+    return day_start - MAX_UTC_OFFSET, day_start + 86400 + MAX_UTC_OFFSET
+
+
 def int_or_none(value: str) -> int | None:
     """Преобразует str к int, в случае ошибки возвращает None"""
     try:
@@ -31,3 +79,77 @@ def float_or_none(value: str) -> float | None:
         return float(value)
     except (TypeError, ValueError):
         return None
+
+
+def validate_positive_int(value: str) -> int:
+    """Валидирует целое положительное число при вводе в CLI"""
+    number = int_or_none(value)
+    if number is None or number < 1:
+        print(
+            f"Указано некорректное число {value}, "
+            "ожидается целое число больше 0",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return number
+
+
+def validate_fraction(value: str) -> float:
+    """Валидирует число из интервала (0, 1) при вводе в CLI"""
+    number = float_or_none(value)
+    if number is None or not 0 < number < 1:
+        print(
+            f"Указано некорректное число {value}, "
+            "ожидается число больше 0 и меньше 1",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return number
+
+
+def validate_duration(value: str) -> int:
+    """Валидирует длительность вида 30s, 5m, 1h, 1d при вводе в CLI.
+
+    Возвращает кол-во секунд. Число без единицы - секунды.
+    Длительность должна делить сутки.
+    """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    number = int_or_none(value[:-1] if value[-1:] in units else value)
+    seconds = None
+    if number is not None and number > 0:
+        seconds = number * units.get(value[-1:], 1)
+    if seconds is None or 86400 % seconds:
+        print(
+            f"Указана некорректная длительность {value}, ожидается "
+            "число с единицей s, m, h или d (например 5m), "
+            "делящее сутки",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return seconds
+
+
+def validate_regex(pattern: str) -> str:
+    """Валидирует регулярное выражение при вводе в CLI"""
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        print(
+            f"Указано некорректное регулярное выражение {pattern}: {e}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return pattern
+
+
+def file_tail_hash(path: str, end: int, size: int = 4096) -> str:
+    """Хеш последних size байт файла перед позицией end.
+
+    Позволяет отличить дописанный файл от перезаписанного: у дописанного
+    файла байты перед прежним концом не меняются.
+    """
+    start = max(0, end - size)
+    with open(path, "rb") as file:
+        file.seek(start)
+        tail = file.read(end - start)
+    return hashlib.blake2b(tail, digest_size=16).hexdigest()